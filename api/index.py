@@ -1,51 +1,53 @@
-from flask import Flask, request, jsonify
-from supabase import create_client, Client
+from flask import Flask, Response, request, jsonify, stream_with_context
 import os
 from dotenv import load_dotenv
-from api.utils.resume_parser import parse_resume_pdf
-from api.utils.gemini import call_gemini_with_retry
-from api.utils.learning_path import get_roadmap_for_role, find_resources, generate_capstone_project, get_roadmapsh_id, fetch_roadmapsh_raw
-from google import genai
-import io
+from api.utils.supabase_client import get_supabase
+from api.utils.storage import get_storage
+from api.utils.deadline import Deadline, DeadlineExceeded
+from api.utils.admission import admission_controlled, too_many_requests
+from api.utils.llm_usage import set_usage_context
 import json
 
 load_dotenv(dotenv_path=".env.local")
 
 app = Flask(__name__)
+# Hard cap on any request body (the batch route's zips are the largest); Werkzeug answers 413 past it
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("API_MAX_REQUEST_BYTES", str(512 * 1024 * 1024)))
 
-url: str = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+# Route dependencies (Gemini, PyMuPDF, roadmap tables, the Supabase client) are loaded on
+# first use inside each handler so a cold start only pays for what the request needs.
 
-if not url or not key:
-    print(f"Warning: Supabase credentials not found. URL: {url}, Key: {key}")
-
-# Initialize Supabase client
-supabase: Client = create_client(url, key) if url and key else None
+@app.before_request
+def tag_llm_usage():
+    """Attributes this request's Gemini calls to its route and user in the usage ledger."""
+    body = request.get_json(silent=True) if request.is_json else None
+    user_id = request.args.get('user_id') or (body.get('user_id') if isinstance(body, dict) else None)
+    set_usage_context(request.url_rule.rule if request.url_rule else request.path, user_id)
 
 @app.route('/api/learning-path', methods=['GET'])
+@admission_controlled
 def get_learning_path():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     
+    deadline = Deadline.for_request()
     user_id = request.args.get('user_id')
     print(f"Fetching learning path for user: {user_id}")
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
 
     try:
+        from api.utils.learning_path import find_resources_batch
+        from api.utils.learning_path_cache import get_or_build_learning_path
+
         # 1. Fetch latest assessment to get target_role and missing_skills
-        res = supabase.table('user_assessments')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
+        assessment = storage.latest_assessment(user_id)
         
-        if not res.data:
+        if not assessment:
             print("No career assessment found.")
             return jsonify({"error": "No career assessment found. Please upload a resume first."}), 404
         
-        assessment = res.data[0]
         feedback = assessment.get('feedback') or {}
         target_role = assessment.get('target_role')
         keywords = feedback.get('keywords') or {}
@@ -54,20 +56,18 @@ def get_learning_path():
         print(f"Target Role: {target_role}, Missing Skills: {missing_skills}")
 
         # 2. Fetch user's learning progress
-        progress_res = supabase.table('user_learning_progress')\
-            .select('milestone_title, completed')\
-            .eq('user_id', user_id)\
-            .execute()
+        progress = storage.learning_progress(user_id)
         
-        completed_milestones = [p['milestone_title'] for p in (progress_res.data or []) if p.get('completed')]
+        completed_milestones = [p['milestone_title'] for p in progress if p.get('completed')]
         print(f"Completed milestones: {len(completed_milestones)}")
 
-        # 3. Generate Roadmap
-        print("Generating roadmap...")
-        roadmap = generate_roadmap(target_role, missing_skills)
-        if not isinstance(roadmap, list):
-            print(f"Warning: roadmap is not a list: {roadmap}")
-            roadmap = []
+        # 3. Roadmap + capstone (shared cache, usually filled ahead of time by the prefetch worker)
+        print("Generating roadmap and capstone...")
+        path, cache_hit = get_or_build_learning_path(
+            target_role, missing_skills, keywords.get('present', []), deadline
+        )
+        roadmap = path["roadmap"]
+        capstone = path["capstone"]
         
         # Enrich roadmap with completion status
         for milestone in roadmap:
@@ -76,13 +76,9 @@ def get_learning_path():
 
         # 4. Find Resources for each missing skill (pass target_role for roadmap.sh links)
         print("Finding resources...")
-        resources = {skill: find_resources(skill, target_role) for skill in missing_skills}
-
-        # 5. Generate Capstone Project
-        print("Generating capstone...")
-        capstone = generate_capstone_project(missing_skills)
+        resources = find_resources_batch(missing_skills, target_role)
 
-        print("Learning path generated successfully.")
+        print(f"Learning path generated successfully (cache {'hit' if cache_hit else 'miss'}).")
         return jsonify({
             "target_role": target_role,
             "missing_skills": missing_skills,
@@ -99,7 +95,8 @@ def get_learning_path():
 
 @app.route('/api/progress', methods=['POST'])
 def update_progress():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     
     data = request.json
@@ -111,18 +108,7 @@ def update_progress():
         return jsonify({"error": "user_id and milestone_title are required"}), 400
 
     try:
-        if completed:
-            res = supabase.table('user_learning_progress').upsert({
-                "user_id": user_id,
-                "milestone_title": milestone_title,
-                "completed": True
-            }).execute()
-        else:
-            res = supabase.table('user_learning_progress')\
-                .delete()\
-                .eq('user_id', user_id)\
-                .eq('milestone_title', milestone_title)\
-                .execute()
+        storage.set_milestone(user_id, milestone_title, bool(completed))
         
         return jsonify({"success": True}), 200
     except Exception as e:
@@ -130,7 +116,8 @@ def update_progress():
 
 @app.route('/api/sync-profile', methods=['POST'])
 def sync_profile():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Server misconfiguration: Supabase client not initialized"}), 500
 
     data = request.json
@@ -160,38 +147,12 @@ def sync_profile():
             "updated_at": "now()"
         }
         
-        # Check if profile exists to determine insert vs update (or just use upsert)
         # Using upsert with ON CONFLICT on user_id
-        res = supabase.table('profiles').upsert(profile_update).execute()
-
-        # 2. Handle Skills
-        # First, ensure all skills exist in the 'skills' table
-        skill_ids = []
-        for skill_name in skills_list:
-            # Normalize skill name
-            skill_name = skill_name.strip()
-            
-            # Try to find existing skill
-            existing = supabase.table('skills').select('id').eq('name', skill_name).execute()
-            
-            if existing.data:
-                skill_ids.append(existing.data[0]['id'])
-            else:
-                # Create new skill
-                new_skill = supabase.table('skills').insert({"name": skill_name}).execute()
-                if new_skill.data:
-                    skill_ids.append(new_skill.data[0]['id'])
-
-        # 3. Update User Skills (Junction Table)
-        # For simplicity, we can delete existing user skills and re-insert (full sync)
-        
-        supabase.table('user_skills').delete().eq('user_id', user_id).execute()
-        
-        # Use simple integer for proficiency (e.g., 3) if not provided
-        user_skills_data = [{"user_id": user_id, "skill_id": sid, "proficiency": 3} for sid in skill_ids]
-        
-        if user_skills_data:
-            supabase.table('user_skills').insert(user_skills_data).execute()
+        storage.upsert_profile(profile_update)
+
+        # 2. Handle Skills: ensure each exists in the 'skills' table, then full-sync the junction table
+        skill_names = [skill_name.strip() for skill_name in skills_list if skill_name and skill_name.strip()]
+        storage.replace_user_skills(user_id, list(dict.fromkeys(skill_names)))
 
         return jsonify({"success": True, "message": "Profile synced successfully"}), 200
 
@@ -200,88 +161,86 @@ def sync_profile():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/career-assessment', methods=['POST'])
+@admission_controlled
 def career_assessment():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Server misconfiguration: Supabase client not initialized"}), 500
 
+    deadline = Deadline.for_request()
     data = request.json
     user_id = data.get('user_id')
     target_role = data.get('target_role')
     resume_text = data.get('resume_text')
 
-    if not all([user_id, target_role, resume_text]):
+    # Several roles may be scored at once ("target_roles": [...]); the resume is sent to Gemini once.
+    target_roles = data.get('target_roles') or target_role
+    if isinstance(target_roles, str):
+        target_roles = [target_roles]
+    if not isinstance(target_roles, list):
+        target_roles = []
+    target_roles = list(dict.fromkeys(str(r).strip() for r in target_roles if r and str(r).strip()))
+
+    if not all([user_id, target_roles, resume_text]):
         return jsonify({"error": "user_id, target_role, and resume_text are required"}), 400
 
+    from api.utils.assessment import MAX_ROLES_PER_REQUEST, assess_resume
+    if len(target_roles) > MAX_ROLES_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_ROLES_PER_REQUEST} target roles per request"}), 400
+
     # Configure Gemini
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return jsonify({"error": "GEMINI_API_KEY not configured"}), 500
-    
-    prompt = f"""
-        Analyze the match between this resume and the target role.
-        Target Role: {target_role}
-        Resume Text: {resume_text}
-
-        Generate a detailed assessment and return it as a valid JSON object with the following structure:
-        {{
-          "score": integer (0-100, the match percentage),
-          "verdict": "A 2-sentence executive summary highlighting key strengths and the biggest gap.",
-          "keywords": {{
-            "present": ["list", "of", "keywords", "from", "the", "role", "found", "in", "resume"],
-            "missing": ["list", "of", "keywords", "from", "the", "role", "NOT", "found", "in", "resume"]
-          }},
-          "skill_gaps": [
-            {{ "skill": "Skill Name", "gap_score": integer (1-10, how weak they are), "impact": "High Impact" or "Medium Impact" or "Low Impact" }}
-          ],
-          "pivot_careers": {{
-            "alternatives": [
-              {{ "role": "Role Name", "match": integer (0-100) }}
-            ],
-            "trending": [
-              {{ "role": "Role Name", "description": "Why this is trending for them" }}
-            ]
-          }}
-        }}
-
-        Return ONLY the JSON object, no markdown formatting.
-        """
 
     try:
-        content = call_gemini_with_retry(prompt)
+        assessments = assess_resume(target_roles, resume_text, deadline)
         
         # Handle potential error return from call_gemini_with_retry
-        if isinstance(content, dict) and "error" in content:
-            return jsonify(content), 500
-        
-        # Clean up potential markdown code blocks
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.strip().endswith("```"):
-            content = content.strip()[:-3]
-        
-        assessment_data = json.loads(content.strip())
-
-        # Save to user_assessments table
-        upsert_data = {
+        if isinstance(assessments.get("error"), str):
+            if assessments.get("type") in ("budget", "rate_limit"):
+                return too_many_requests(assessments)
+            return jsonify(assessments), 500
+        if not assessments:
+            return jsonify({"error": "Failed to parse AI response as JSON", "details": "No assessment for the requested roles"}), 500
+
+        # Save one user_assessments row per role, with the skill names the aggregates count
+        from api.utils.cohort_analytics import record_assessment, with_skill_keys
+        rows = [{
             "user_id": user_id,
-            "target_role": target_role,
+            "target_role": role,
             "resume_text": resume_text,
             "score": assessment_data.get('score'),
-            "feedback": assessment_data,
+            "feedback": with_skill_keys(assessment_data),
             "created_at": "now()"
-        }
+        } for role, assessment_data in assessments.items()]
 
         # We keep multiple assessments (history) or just upsert the latest one?
         # User requested "assessment to be done on the resume and target role input"
         # Let's insert as a new record to keep history, or update if user prefers.
         # Given the existing page.tsx selects the latest one, insert is fine.
-        res = supabase.table('user_assessments').insert(upsert_data).execute()
+        storage.insert_assessments(rows)
+
+        # Aggregates are maintained by a DB trigger; keep this worker's in-memory index in step too
+        for role, assessment_data in assessments.items():
+            record_assessment(role, assessment_data)
 
-        return jsonify(assessment_data), 200
+        if data.get('target_roles') is None and len(target_roles) == 1:
+            return jsonify(assessments[target_roles[0]]), 200
+        return jsonify({
+            "assessments": assessments,
+            "failed_roles": [r for r in target_roles if r not in assessments],
+        }), 200
     except json.JSONDecodeError as je:
         print(f"JSON Decode Error: {je}")
-        print(f"Raw content from Gemini: {content}")
-        return jsonify({"error": "Failed to parse AI response as JSON", "details": str(je), "raw": content}), 500
+        print(f"Raw content from Gemini: {je.doc}")
+        return jsonify({"error": "Failed to parse AI response as JSON", "details": str(je), "raw": je.doc}), 500
+    except DeadlineExceeded as de:
+        print(f"Assessment deadline: {de}")
+        return jsonify({
+            "error": "Assessment is taking longer than expected. Please try again shortly.",
+            "type": "deadline"
+        }), 503
     except Exception as e:
         error_msg = str(e)
         print(f"Assessment error: {error_msg}")
@@ -298,27 +257,25 @@ def career_assessment():
 @app.route('/api/roadmap', methods=['GET'])
 def get_roadmap():
     """Returns roadmap for a target role. Uses assessment if user_id provided, else target_role + missing_skills."""
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     user_id = request.args.get('user_id')
     target_role = request.args.get('target_role')
     missing_skills_raw = request.args.get('missing_skills', '[]')
 
     try:
+        from api.utils.learning_path import get_roadmap_for_role, get_roadmapsh_id
+
         missing_skills = []
         if user_id:
-            res = supabase.table('user_assessments')\
-                .select('*')\
-                .eq('user_id', user_id)\
-                .order('created_at', desc=True)\
-                .limit(1)\
-                .execute()
-            if res.data:
-                feedback = res.data[0].get('feedback') or {}
+            assessment = storage.latest_assessment(user_id)
+            if assessment:
+                feedback = assessment.get('feedback') or {}
                 keywords = feedback.get('keywords') or {}
                 missing_skills = keywords.get('missing', [])
                 if not target_role:
-                    target_role = res.data[0].get('target_role')
+                    target_role = assessment.get('target_role')
         else:
             try:
                 missing_skills = json.loads(missing_skills_raw) if missing_skills_raw else []
@@ -332,48 +289,94 @@ def get_roadmap():
         roadmap = get_roadmap_for_role(target_role)
 
         if user_id:
-            progress_res = supabase.table('user_learning_progress')\
-                .select('milestone_title, completed')\
-                .eq('user_id', user_id)\
-                .execute()
-            completed = [p['milestone_title'] for p in (progress_res.data or []) if p.get('completed')]
+            completed = [p['milestone_title'] for p in storage.learning_progress(user_id) if p.get('completed')]
             for m in roadmap:
                 if isinstance(m, dict):
                     m['completed'] = m.get('title') in completed
 
         roadmap_id = get_roadmapsh_id(target_role)
-        roadmap_sh_raw = fetch_roadmapsh_raw(roadmap_id) if roadmap_id else None
 
+        # The roadmap.sh flowchart itself is served (compact, cacheable) by /api/roadmap-graph/<id>
         return jsonify({
             "target_role": target_role,
             "roadmap": roadmap,
             "roadmap_sh_url": f"https://roadmap.sh/{roadmap_id}" if roadmap_id else None,
             "roadmap_sh_id": roadmap_id,
-            "roadmap_sh_raw": roadmap_sh_raw,
+            "roadmap_sh_graph_url": f"/api/roadmap-graph/{roadmap_id}" if roadmap_id else None,
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/roadmap-graph/<roadmap_id>', methods=['GET'])
+def get_roadmap_graph_route(roadmap_id):
+    """Compact roadmap.sh flowchart (see api/utils/roadmap_graph.py), with ETag revalidation and gzip."""
+    from api.utils.roadmap_graph import get_roadmap_graph
+
+    graph = get_roadmap_graph(roadmap_id, Deadline.for_request())
+    if graph is None:
+        return jsonify({"error": f"Roadmap graph not available for '{roadmap_id}'"}), 404
+
+    use_gzip = 'gzip' in request.accept_encodings
+    etag = graph.gzip_etag if use_gzip else graph.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(graph.gzipped if use_gzip else graph.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@app.route('/api/analytics/skill-gaps', methods=['GET'])
+def skill_gap_analytics():
+    """Top missing skills and gap_score histograms for a target role's cohort (all roles if omitted)."""
+    supabase = get_supabase()
+    if not supabase:
+        return jsonify({"error": "Supabase not initialized"}), 500
+    target_role = request.args.get('target_role')
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        from api.utils.cohort_analytics import get_skill_gap_index
+        return jsonify(get_skill_gap_index(supabase).top_missing_skills(target_role, limit)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/job-applications', methods=['GET'])
 def get_job_applications():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Supabase not initialized"}), 500
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+    try:
+        return jsonify(storage.job_applications(user_id)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/job-applications/summary', methods=['GET'])
+def get_job_application_summary():
+    """Per-status counts, follow-ups due and response times, aggregated in the database."""
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     user_id = request.args.get('user_id')
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
     try:
-        res = supabase.table('job_applications')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .order('applied_at', desc=True)\
-            .execute()
-        return jsonify(res.data or []), 200
+        return jsonify(storage.job_application_summary(user_id)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/job-applications', methods=['POST'])
 def create_job_application():
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     data = request.json
     user_id = data.get('user_id')
@@ -406,14 +409,14 @@ def create_job_application():
             "job_url": data.get('job_url'),
             "recruiter_email": data.get('recruiter_email'),
         }
-        res = supabase.table('job_applications').insert(insert_data).execute()
-        return jsonify(res.data[0] if res.data else insert_data), 201
+        return jsonify(storage.create_job_application(insert_data)), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/job-applications/<application_id>', methods=['PATCH'])
 def update_job_application(application_id):
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     data = request.json
     user_id = data.get('user_id')
@@ -426,40 +429,37 @@ def update_job_application(application_id):
                 update_fields[k] = data[k]
         if not update_fields:
             return jsonify({"error": "No fields to update"}), 400
-        res = supabase.table('job_applications')\
-            .update(update_fields)\
-            .eq('id', application_id)\
-            .eq('user_id', user_id)\
-            .execute()
-        if not res.data:
+        updated = storage.update_job_application(user_id, application_id, update_fields)
+        if not updated:
             return jsonify({"error": "Application not found"}), 404
-        return jsonify(res.data[0]), 200
+        return jsonify(updated), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/job-applications/<application_id>', methods=['DELETE'])
 def delete_job_application(application_id):
-    if not supabase:
+    storage = get_storage()
+    if not storage:
         return jsonify({"error": "Supabase not initialized"}), 500
     user_id = request.args.get('user_id')
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
     try:
-        supabase.table('job_applications')\
-            .delete()\
-            .eq('id', application_id)\
-            .eq('user_id', user_id)\
-            .execute()
+        storage.delete_job_application(user_id, application_id)
         return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/job-openings', methods=['POST'])
+@admission_controlled
 def job_openings():
     """
     Crew-style job discovery: LinkedIn / Naukri / Glassdoor via search index (SerpAPI or Google CSE),
     ranked by user skills. Requires SERPAPI_KEY or GOOGLE_SEARCH_API_KEY + GOOGLE_SEARCH_CX.
+    Optional "mode": "auto" (default, reuse recent stored results), "live", "deep" (live, several result
+    pages and role-synonym queries per portal), or "index" (stored listings only).
     """
+    deadline = Deadline.for_request()
     data = request.json or {}
     target_role = data.get('target_role')
     skills = data.get('skills') or []
@@ -468,10 +468,13 @@ def job_openings():
     if not isinstance(skills, list):
         skills = []
     skills = [str(s).strip() for s in skills if s and str(s).strip()]
+    mode = data.get('mode') or 'auto'
+    if mode not in ('auto', 'live', 'deep', 'index'):
+        return jsonify({"error": "mode must be one of auto, live, deep, index"}), 400
 
     try:
         from api.utils.job_search_crew import run_job_search_with_crew
-        result = run_job_search_with_crew(str(target_role).strip(), skills)
+        result = run_job_search_with_crew(str(target_role).strip(), skills, deadline, mode)
         return jsonify(result), 200
     except Exception as e:
         import traceback
@@ -480,7 +483,9 @@ def job_openings():
 
 
 @app.route('/api/parse-resume', methods=['POST'])
+@admission_controlled
 def parse_resume():
+    deadline = Deadline.for_request()
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
     
@@ -489,14 +494,65 @@ def parse_resume():
         return jsonify({"error": "No selected file"}), 400
 
     if file:
+        from api.utils.resume_parser import ResumeTooLargeError, parse_resume_pdf, spool_upload
+
+        path = None
         try:
-            # Read file into buffer
-            file_buffer = file.read()
-            # Parse
-            extracted_data = parse_resume_pdf(file_buffer)
+            # Spool to disk in chunks instead of reading the whole upload into memory
+            path = spool_upload(file.stream)
+            # The resume text is echoed back only for clients that store or assess it next
+            include_text = request.args.get('include_text') == '1'
+            extracted_data = parse_resume_pdf(path, deadline, include_text=include_text)
             return jsonify(extracted_data), 200
+        except ResumeTooLargeError as e:
+            return jsonify({"error": str(e), "type": "too_large"}), 413
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+        finally:
+            if path:
+                os.unlink(path)
+
+@app.route('/api/parse-resumes/batch', methods=['POST'])
+@admission_controlled
+def parse_resumes_batch():
+    """
+    Cohort ingestion: multipart "files" (PDFs and/or zips of PDFs). Streams one NDJSON line per
+    resume as it completes ({index, filename, status, data|error}), then a final summary line.
+    """
+    uploads = [(f.filename or f"upload-{i}", f.stream) for i, f in enumerate(request.files.getlist('files'))]
+    if not uploads:
+        return jsonify({"error": "No files uploaded (use the 'files' field)"}), 400
+
+    import shutil
+    import tempfile
+    from api.utils.admission import admitted_user
+    from api.utils.resume_batch import BatchInputError, expand_uploads, ingest_resumes
+    # The stream runs after this view returns, so the admitted user is handed over explicitly
+    user = admitted_user()
+    workdir = tempfile.mkdtemp(prefix="resume-batch-")
+    try:
+        items = expand_uploads(uploads, workdir)
+    except BatchInputError as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        return jsonify({"error": str(e)}), 400
+    if not items:
+        shutil.rmtree(workdir, ignore_errors=True)
+        return jsonify({"error": "No PDF files found in upload"}), 400
+
+    def generate():
+        ok = 0
+        for result in ingest_resumes(items, user):
+            ok += result["status"] == "ok"
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"summary": {"total": len(items), "succeeded": ok, "failed": len(items) - ok}}) + "\n"
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.call_on_close(lambda: shutil.rmtree(workdir, ignore_errors=True))
+    return response
+
+# Opt-in (PREFETCH_IN_PROCESS=1) for long-running deployments; serverless should run `python -m api.utils.prefetch`
+from api.utils.prefetch import start_background_prefetch
+start_background_prefetch()
 
 if __name__ == '__main__':
     app.run(port=5328, debug=True)
@@ -0,0 +1,285 @@
+"""
+Admission control for the Gemini-backed routes.
+
+All users share one pool of Gemini keys. Each request to an @admission_controlled route spends a
+token from its client's bucket (ADMISSION_USER_RATE_PER_MINUTE, bursts of ADMISSION_USER_BURST) or
+gets an immediate 429 with Retry-After. Clients are keyed by address: the peer address, or the hop
+added by the last of ADMISSION_TRUSTED_PROXY_HOPS proxies, never anything the client can set itself. The request's Gemini calls then each take one of
+key_pool_capacity() global slots for the length of the call only (gemini_slot, used by
+call_gemini_with_retry), so storage reads, scraping and response building never hold a slot. When
+every slot is busy the call waits in its user's queue, and freed slots are handed to waiting users
+round-robin so one user's burst can't starve everyone else. Waits are bounded by
+ADMISSION_MAX_WAIT_SECONDS; past that the call returns an error dict of type "rate_limit" instead of
+holding a worker in call_gemini_with_retry's backoff loop.
+"""
+import functools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from flask import jsonify, request
+
+from api.utils.deadline import Deadline
+from api.utils.gemini import key_pool_capacity
+
+ENABLED = os.getenv("ADMISSION_ENABLED", "1") != "0"
+USER_RATE_PER_MIN = float(os.getenv("ADMISSION_USER_RATE_PER_MINUTE", "6"))
+USER_BURST = float(os.getenv("ADMISSION_USER_BURST", "3"))
+MAX_WAIT_S = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "8"))
+# Proxies in front of the app that append the client address to X-Forwarded-For (1 on Vercel)
+TRUSTED_PROXY_HOPS = int(os.getenv("ADMISSION_TRUSTED_PROXY_HOPS", "0"))
+MAX_QUEUED_PER_USER = 2
+MAX_QUEUED = 64
+_MAX_BUCKETS = 10000
+# Deadline-bound waits (gemini_slot) re-queue at least this often after a busy rejection
+_BUSY_POLL_S = 1.0
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+
+
+class _Waiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        capacity: int,
+        rate_per_s: float,
+        burst: float,
+        max_wait_s: float = MAX_WAIT_S,
+        max_queued_per_user: int = MAX_QUEUED_PER_USER,
+        max_queued: int = MAX_QUEUED,
+    ):
+        self.capacity = max(1, capacity)
+        self.rate_per_s = rate_per_s
+        self.burst = max(1.0, burst)
+        self.max_wait_s = max_wait_s
+        self.max_queued_per_user = max_queued_per_user
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._hold_s = 5.0  # moving average of how long a request keeps its slot
+        self._buckets: dict[str, _Bucket] = {}
+        # Users with waiting requests, in the order they'll next be served
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take_token(self, user: str, now: float) -> float:
+        """Spends one token; returns 0, or the seconds until the user's next token."""
+        bucket = self._buckets.get(user)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_BUCKETS:
+                # Buckets that have refilled completely carry no state worth keeping
+                full_after = self.burst / self.rate_per_s if self.rate_per_s > 0 else math.inf
+                self._buckets = {u: b for u, b in self._buckets.items() if now - b.updated < full_after}
+            bucket = self._buckets[user] = _Bucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate_per_s)
+            bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / self.rate_per_s if self.rate_per_s > 0 else 60.0
+
+    def _busy_retry_after(self) -> float:
+        return self._hold_s * (self.queued + 1) / self.capacity
+
+    def charge(self, user: str) -> None:
+        """Spends one of user's tokens; raises Rejected when the bucket is empty."""
+        with self._lock:
+            wait_s = self._take_token(user, time.monotonic())
+            if wait_s:
+                self.rejected += 1
+                raise Rejected("rate", wait_s)
+
+    def acquire(self, user: str) -> None:
+        """Takes a slot for user, waiting fairly up to max_wait_s; raises Rejected otherwise."""
+        with self._lock:
+            if self.in_flight < self.capacity and not self._queues:
+                self.in_flight += 1
+                return
+            user_queue = self._queues.get(user)
+            if self.queued >= self.max_queued or (user_queue and len(user_queue) >= self.max_queued_per_user):
+                self.rejected += 1
+                raise Rejected("busy", self._busy_retry_after())
+            waiter = _Waiter()
+            if user_queue is None:
+                user_queue = self._queues[user] = deque()
+            user_queue.append(waiter)
+            self.queued += 1
+
+        waiter.event.wait(self.max_wait_s)
+
+        with self._lock:
+            if waiter.granted:
+                return
+            user_queue = self._queues.get(user)
+            if user_queue is not None:
+                user_queue.remove(waiter)
+                if not user_queue:
+                    del self._queues[user]
+            self.queued -= 1
+            self.rejected += 1
+            raise Rejected("busy", self._busy_retry_after())
+
+    def release(self, held_s: float) -> None:
+        """Frees a slot, handing it straight to the next waiting user if there is one."""
+        with self._lock:
+            self._hold_s += 0.2 * (held_s - self._hold_s)
+            if not self._queues:
+                self.in_flight -= 1
+                return
+            user, user_queue = self._queues.popitem(last=False)
+            waiter = user_queue.popleft()
+            if user_queue:
+                self._queues[user] = user_queue  # back of the line behind the other users
+            self.queued -= 1
+            waiter.granted = True
+            waiter.event.set()
+
+    @contextmanager
+    def slot(self, user: str) -> Iterator[None]:
+        self.acquire(user)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "waiting_users": len(self._queues),
+                "rejected": self.rejected,
+                "avg_hold_s": round(self._hold_s, 2),
+            }
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+# Client key of the admitted request whose Gemini calls take slots; unset outside admitted requests
+_admitted_user: ContextVar[str | None] = ContextVar("admission_user", default=None)
+_holding_slot: ContextVar[bool] = ContextVar("admission_holding_slot", default=False)
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(key_pool_capacity(), USER_RATE_PER_MIN / 60, USER_BURST)
+        return _controller
+
+
+def _client_key() -> str:
+    """
+    The client address as seen by the outermost trusted proxy. The user_id a request names and the
+    hops a client writes into X-Forwarded-For itself are not authenticated, so neither is used: a
+    caller could rotate them to get a fresh bucket on every request.
+    """
+    hops = [h.strip() for h in request.headers.get("X-Forwarded-For", "").split(",") if h.strip()]
+    if TRUSTED_PROXY_HOPS and len(hops) >= TRUSTED_PROXY_HOPS:
+        return f"ip:{hops[-TRUSTED_PROXY_HOPS]}"
+    return f"ip:{request.remote_addr}"
+
+
+def admitted_user() -> str | None:
+    """Client key of the admitted request running in this context, if any."""
+    return _admitted_user.get()
+
+
+@contextmanager
+def gemini_slot(user: str | None = None, deadline: Deadline | None = None) -> Iterator[None]:
+    """
+    Holds an admission slot for user (default: the admitted request's) around Gemini work. Without a
+    deadline a busy pool raises Rejected after the controller's fair wait; with one, busy rejections
+    are retried until it runs out. Work outside an admitted request (prefetch, CLI) and calls nested
+    inside an outer slot run without taking one.
+    """
+    user = user or _admitted_user.get()
+    if not ENABLED or user is None or _holding_slot.get():
+        yield
+        return
+    controller = get_admission_controller()
+    while True:
+        try:
+            controller.acquire(user)
+            break
+        except Rejected as e:
+            if deadline is None or deadline.expired():
+                raise
+            time.sleep(min(e.retry_after, _BUSY_POLL_S, deadline.remaining()))
+    start = time.monotonic()
+    token = _holding_slot.set(True)
+    try:
+        yield
+    finally:
+        _holding_slot.reset(token)
+        controller.release(time.monotonic() - start)
+
+
+def busy_error(e: Rejected) -> dict:
+    """The error dict a Gemini call answers with when it could not get a slot."""
+    return {
+        "error": "The AI service is busy right now. Please try again shortly.",
+        "type": "rate_limit",
+        "retry_after": e.retry_after,
+    }
+
+
+def too_many_requests(error: dict):
+    """A 429 for a "rate_limit" or "budget" error dict, with its retry_after as Retry-After."""
+    response = jsonify(error)
+    response.status_code = 429
+    if error.get("retry_after"):
+        response.headers["Retry-After"] = str(error["retry_after"])
+    return response
+
+
+def admission_controlled(view):
+    """
+    Route decorator: charges the user's token bucket (429 with Retry-After when empty) and runs the view
+    as an admitted request, so its Gemini calls take slots under the user's fair queue.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return view(*args, **kwargs)
+        user = _client_key()
+        try:
+            get_admission_controller().charge(user)
+        except Rejected as e:
+            message = "Too many requests. Please wait a moment and try again."
+            return too_many_requests({"error": message, "type": "rate_limit", "retry_after": e.retry_after})
+        token = _admitted_user.set(user)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _admitted_user.reset(token)
+    return wrapper
@@ -0,0 +1,194 @@
+"""
+Resume-vs-role assessment prompts for /api/career-assessment.
+
+Several target roles are scored in one Gemini call: the resume is sent once and the model returns one
+assessment object per role, each with the same structure a single-role assessment has.
+"""
+import json
+from typing import Any
+
+from api.utils.deadline import Deadline
+from api.utils.gemini import PromptTemplate, SplitPrompt, call_gemini_with_retry, parses_as_json
+from api.utils.keyword_engine import keyword_split
+from api.utils.role_graph import get_role_graph
+
+MAX_ROLES_PER_REQUEST = 5
+
+_KEYWORDS = """
+          "keywords": {{
+            "present": ["list", "of", "keywords", "from", "the", "role", "found", "in", "resume"],
+            "missing": ["list", "of", "keywords", "from", "the", "role", "NOT", "found", "in", "resume"]
+          }},"""
+
+_PIVOT_ALTERNATIVES = """
+            "alternatives": [
+              {{ "role": "Role Name", "match": integer (0-100) }}
+            ],"""
+
+_SCHEMA = """{{
+          "score": integer (0-100, the match percentage),
+          "verdict": "A 2-sentence executive summary highlighting key strengths and the biggest gap.",{keywords}
+          "skill_gaps": [
+            {{ "skill": "Skill Name", "gap_score": integer (1-10, how weak they are), "impact": "High Impact" or "Medium Impact" or "Low Impact" }}
+          ],
+          "pivot_careers": {{{alternatives}
+            "trending": [
+              {{ "role": "Role Name", "description": "Why this is trending for them" }}
+            ]
+          }}
+        }}"""
+
+# Keywords present / missing are computed locally (keyword_engine.py) when every role has a roadmap.sh
+# vocabulary; pivot alternatives come from the role-similarity graph (role_graph.py) once it is built
+_LOCAL_KEYWORDS_NOTE = """
+        Each target role comes with its keywords already matched against the resume: those found in it
+        and those missing from it. Base the score, verdict and skill_gaps on these lists.
+"""
+
+
+def _schema(local_keywords: bool, local_pivots: bool) -> str:
+    return _SCHEMA.format(
+        keywords="" if local_keywords else _KEYWORDS.format(),
+        alternatives="" if local_pivots else _PIVOT_ALTERNATIVES.format(),
+    )
+
+
+ASSESSMENT_SCHEMA = _schema(local_keywords=False, local_pivots=False)
+
+
+def _prompt_pair(name: str, schema: str, note: str = "") -> tuple[PromptTemplate, PromptTemplate]:
+    """(single-role, multi-role) templates. Static instructions + schema come first so Gemini can
+    serve them from its context cache (gemini.py)."""
+    single = PromptTemplate(
+        name,
+        f"""
+        Analyze the match between the resume and the target role given at the end.
+{note}
+        Generate a detailed assessment and return it as a valid JSON object with the following structure:
+        {schema}
+
+        Return ONLY the JSON object, no markdown formatting.
+        """,
+        """
+        Target Role: {role}
+{role_keywords}        Resume Text: {resume_text}
+        """,
+    )
+    multi = PromptTemplate(
+        f"{name}-multi",
+        f"""
+        Analyze the match between the resume and EACH of the target roles given at the end, independently.
+{note}
+        For each target role, generate a detailed assessment as a JSON object with the following structure:
+        {schema}
+
+        Return ONLY a valid JSON object whose keys are the target roles exactly as written and whose
+        values are the assessment objects, no markdown formatting.
+        """,
+        """
+        Target Roles:
+{roles_list}
+        Resume Text: {resume_text}
+        """,
+    )
+    return single, multi
+
+
+# (local_keywords, local_pivots) -> (single-role, multi-role) templates
+_PROMPTS = {
+    (kw, pv): _prompt_pair(
+        "assessment" + ("-local-keywords" if kw else "") + ("-local-pivots" if pv else ""),
+        _schema(kw, pv),
+        _LOCAL_KEYWORDS_NOTE if kw else "",
+    )
+    for kw in (False, True)
+    for pv in (False, True)
+}
+SINGLE_ROLE_PROMPT, MULTI_ROLE_PROMPT = _PROMPTS[(False, False)]
+
+
+def _keyword_lines(keywords: dict[str, list[str]], indent: str) -> str:
+    return (
+        f"{indent}Keywords found in resume: {', '.join(keywords['present']) or 'none'}\n"
+        f"{indent}Keywords missing from resume: {', '.join(keywords['missing']) or 'none'}\n"
+    )
+
+
+def build_assessment_prompt(
+    target_roles: list[str],
+    resume_text: str,
+    local_pivots: bool = False,
+    keywords: dict[str, dict[str, list[str]]] | None = None,
+) -> SplitPrompt:
+    """`keywords` ({role: {"present", "missing"}} for every role) replaces the model's keyword lists."""
+    single, multi = _PROMPTS[(keywords is not None, local_pivots)]
+    if len(target_roles) == 1:
+        role = target_roles[0]
+        role_keywords = _keyword_lines(keywords[role], "        ") if keywords else ""
+        return single.render(role=role, role_keywords=role_keywords, resume_text=resume_text)
+    roles_list = "\n".join(
+        f"        - {r}" + ("\n" + _keyword_lines(keywords[r], "          ").rstrip("\n") if keywords else "")
+        for r in target_roles
+    )
+    return multi.render(roles_list=roles_list, resume_text=resume_text)
+
+
+def strip_json_fences(content: str) -> str:
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    elif content.startswith("```"):
+        content = content[3:]
+    if content.strip().endswith("```"):
+        content = content.strip()[:-3]
+    return content.strip()
+
+
+def _split_by_role(parsed: Any, target_roles: list[str]) -> dict[str, dict[str, Any]]:
+    if len(target_roles) == 1 and isinstance(parsed, dict) and "score" in parsed:
+        return {target_roles[0]: parsed}
+    by_key: dict[str, Any] = {}
+    if isinstance(parsed, dict):
+        by_key = {str(k).strip().lower(): v for k, v in parsed.items()}
+    elif isinstance(parsed, list):
+        by_key = {str(v.get("target_role", "")).strip().lower(): v for v in parsed if isinstance(v, dict)}
+    out: dict[str, dict[str, Any]] = {}
+    for role in target_roles:
+        data = by_key.get(role.strip().lower())
+        if isinstance(data, dict):
+            data.pop("target_role", None)
+            out[role] = data
+    return out
+
+
+def assess_resume(target_roles: list[str], resume_text: str, deadline: Deadline | None = None) -> dict[str, Any]:
+    """
+    One Gemini round trip for all roles. Returns {role: assessment} for the roles the model answered,
+    or the error dict from call_gemini_with_retry. Keywords present / missing are computed locally
+    when every role has a roadmap.sh vocabulary, and pivot alternatives come from the role graph when
+    it has been built. Raises json.JSONDecodeError on unparseable output.
+    """
+    graph = get_role_graph()
+    keywords = {role: keyword_split(role, resume_text, deadline) for role in target_roles}
+    local_keywords = all(keywords.values())
+    content = call_gemini_with_retry(
+        build_assessment_prompt(
+            target_roles, resume_text, local_pivots=graph is not None, keywords=keywords if local_keywords else None
+        ),
+        deadline=deadline,
+        validate=parses_as_json,
+        caller="assessment.assess_resume",
+    )
+    if isinstance(content, dict) and "error" in content:
+        return content
+    assessments = _split_by_role(json.loads(strip_json_fences(content)), target_roles)
+    if local_keywords:
+        for role, assessment in assessments.items():
+            assessment["keywords"] = keywords[role]
+    if graph is not None:
+        for role, assessment in assessments.items():
+            pivots = assessment.get("pivot_careers")
+            if not isinstance(pivots, dict):
+                pivots = assessment["pivot_careers"] = {"trending": []}
+            pivots["alternatives"] = graph.suggest_pivots(role, resume_text)
+    return assessments
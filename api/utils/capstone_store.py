@@ -0,0 +1,178 @@
+"""
+Store of generated capstone projects keyed by the skill set they were generated for.
+
+A capstone's only input is the missing-skills list, and most users missing {"docker", "kubernetes",
+"aws"} are well served by the project generated for {"docker", "kubernetes", "aws", "terraform"}.
+Each capstone is stored under its canonical skill set (alias-folded with normalize_skill, sorted), and
+find() returns the stored capstone whose set is most similar by Jaccard when that similarity reaches
+CAPSTONE_REUSE_THRESHOLD, so generate_capstone_project can skip its Gemini call.
+
+Up to LSH_MIN_ENTRIES sets are scanned linearly; past that, a MinHash LSH index narrows the scan to
+candidate sets before the exact Jaccard check. The store keeps at most CAPSTONE_STORE_MAX entries,
+evicting the least recently used. Set CAPSTONE_STORE_PATH to move the database, or to an empty string
+to disable reuse.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Iterable
+
+from api.utils.learning_path import normalize_skill
+from api.utils.minhash import LSHIndex, MinHasher, exact_jaccard
+
+REUSE_THRESHOLD = float(os.getenv("CAPSTONE_REUSE_THRESHOLD", "0.75"))
+MAX_ENTRIES = int(os.getenv("CAPSTONE_STORE_MAX", "5000"))
+LSH_MIN_ENTRIES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS capstones (
+    id INTEGER PRIMARY KEY,
+    skill_key TEXT NOT NULL UNIQUE,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_capstones_last_used ON capstones(last_used);
+"""
+
+
+def canonical_skill_set(skills: Iterable) -> frozenset[str]:
+    return frozenset(normalize_skill(str(s)) for s in skills or [] if str(s).strip())
+
+
+def skill_set_key(skill_set: frozenset[str]) -> str:
+    return "|".join(sorted(skill_set))
+
+
+class CapstoneStore:
+    def __init__(self, path: str, threshold: float = REUSE_THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._init_lock = threading.Lock()
+        self._ready = False
+        # In-memory mirror of the stored skill sets, caught up by rowid so other processes' writes show up
+        self._lock = threading.Lock()
+        self._sets: dict[str, frozenset[str]] = {}
+        self._synced_id = 0
+        self._hasher = MinHasher()
+        self._lsh = LSHIndex()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+    def _index(self, key: str) -> None:
+        skill_set = frozenset(key.split("|")) if key else frozenset()
+        self._sets[key] = skill_set
+        self._lsh.add(key, self._hasher.signature(skill_set))
+
+    def _forget(self, key: str) -> None:
+        self._sets.pop(key, None)
+        self._lsh.remove(key)
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        rows = conn.execute(
+            "SELECT id, skill_key FROM capstones WHERE id > ? ORDER BY id", (self._synced_id,)
+        ).fetchall()
+        for row_id, key in rows:
+            self._index(key)
+            self._synced_id = row_id
+
+    def _nearest(self, skill_set: frozenset[str]) -> tuple[str, float] | None:
+        key = skill_set_key(skill_set)
+        if key in self._sets:
+            return key, 1.0
+        if len(self._sets) < LSH_MIN_ENTRIES:
+            candidates = self._sets.keys()
+        else:
+            candidates = self._lsh.candidates(self._hasher.signature(skill_set))
+        best = None
+        for candidate in candidates:
+            similarity = exact_jaccard(skill_set, self._sets[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def find(self, skills: Iterable) -> tuple[dict[str, Any], float] | None:
+        """The stored capstone for the most similar skill set at or above the threshold, with its similarity."""
+        skill_set = canonical_skill_set(skills)
+        if not skill_set:
+            return None
+        conn = self._connect()
+        try:
+            with self._lock:
+                self._sync(conn)
+                nearest = self._nearest(skill_set)
+            if nearest is None:
+                return None
+            key, similarity = nearest
+            with conn:
+                row = conn.execute("SELECT value FROM capstones WHERE skill_key = ?", (key,)).fetchone()
+                if row:
+                    conn.execute("UPDATE capstones SET last_used = ? WHERE skill_key = ?", (time.time(), key))
+            if row is None:
+                # Evicted by another process since it was indexed
+                with self._lock:
+                    self._forget(key)
+                return None
+            return json.loads(row[0]), similarity
+        finally:
+            conn.close()
+
+    def put(self, skills: Iterable, capstone: dict[str, Any]) -> None:
+        skill_set = canonical_skill_set(skills)
+        if not skill_set:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO capstones (skill_key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (skill_set_key(skill_set), json.dumps(capstone), now, now),
+                )
+                (count,) = conn.execute("SELECT COUNT(*) FROM capstones").fetchone()
+                evicted = []
+                if count > self.max_entries:
+                    evicted = [k for (k,) in conn.execute(
+                        "SELECT skill_key FROM capstones ORDER BY last_used LIMIT ?", (count - self.max_entries,)
+                    )]
+                    conn.executemany("DELETE FROM capstones WHERE skill_key = ?", [(k,) for k in evicted])
+            with self._lock:
+                for key in evicted:
+                    self._forget(key)
+                self._sync(conn)
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sets)
+
+
+_store: CapstoneStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_capstone_store() -> CapstoneStore | None:
+    """Process-wide store, or None when disabled with an empty CAPSTONE_STORE_PATH."""
+    global _store
+    path = os.getenv("CAPSTONE_STORE_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "skillsphere_capstones.sqlite3")
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = CapstoneStore(path)
+    return _store
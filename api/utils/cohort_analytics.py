@@ -0,0 +1,198 @@
+"""
+Cohort skill-gap analytics ("top missing skills for Data Analyst aspirants").
+
+Postgres keeps per-(target_role, skill) missing counts and gap_score histograms up to date with a
+trigger on user_assessments (migration 005). This module loads those aggregate rows into a compact
+in-memory index: skills are interned to integer ids and each role holds flat integer arrays indexed by
+skill id, so a query is a pass over a few arrays instead of a scan of every assessment. Rows inserted by
+this process are folded in immediately; the whole index is reloaded from the aggregate tables every
+ANALYTICS_REFRESH_SECONDS.
+
+Both paths count the same skill names: skill_keys() folds an assessment's skills with normalize_skill
+once, the API stores the result in the feedback as "skill_keys" before inserting, and the trigger
+(migration 008) counts those keys instead of re-deriving its own.
+"""
+import heapq
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any
+
+from api.utils.learning_path import normalize_skill
+
+HIST_BUCKETS = 10
+REFRESH_S = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+_PAGE = 1000
+
+
+def _role_key(target_role: str | None) -> str:
+    return " ".join((target_role or "").lower().split())
+
+
+def skill_keys(feedback: dict[str, Any]) -> dict[str, list[Any]]:
+    """
+    An assessment's missing skills and rated gaps under normalize_skill names, each skill once:
+    {"missing": [skill, ...], "gaps": [{"skill", "gap_score"}, ...]}. gap_score is rounded half up and
+    clamped to the 1-10 histogram buckets here so SQL and Python can't round it differently.
+    """
+    missing = (feedback.get("keywords") or {}).get("missing") or []
+    gaps: dict[str, int] = {}
+    for gap in feedback.get("skill_gaps") or []:
+        score = gap.get("gap_score") if isinstance(gap, dict) else None
+        if not isinstance(score, (int, float)) or isinstance(score, bool):
+            continue
+        skill = normalize_skill(str(gap.get("skill") or ""))
+        if skill:
+            gaps.setdefault(skill, min(HIST_BUCKETS, max(1, math.floor(score + 0.5))))
+    return {
+        "missing": [s for s in dict.fromkeys(normalize_skill(s) for s in missing if isinstance(s, str)) if s],
+        "gaps": [{"skill": skill, "gap_score": score} for skill, score in gaps.items()],
+    }
+
+
+def with_skill_keys(feedback: dict[str, Any]) -> dict[str, Any]:
+    """The feedback as stored in user_assessments: the assessment plus its skill_keys()."""
+    return {**feedback, "skill_keys": skill_keys(feedback)}
+
+
+class _RoleStats:
+    __slots__ = ("assessments", "missing", "hist")
+
+    def __init__(self):
+        self.assessments = 0
+        self.missing = array("q")
+        self.hist = array("q")  # HIST_BUCKETS counters per skill id, flattened
+
+    def grow(self, n_skills: int) -> None:
+        if len(self.missing) < n_skills:
+            extra = n_skills - len(self.missing)
+            self.missing.extend([0] * extra)
+            self.hist.extend([0] * (extra * HIST_BUCKETS))
+
+
+class SkillGapIndex:
+    def __init__(self):
+        self.skill_ids: dict[str, int] = {}
+        self.skill_names: list[str] = []
+        self.roles: dict[str, _RoleStats] = {}
+        self.total = _RoleStats()  # all roles combined, maintained alongside so it's never re-summed
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _skill_id(self, skill: str) -> int | None:
+        name = normalize_skill(skill)
+        if not name:
+            return None
+        sid = self.skill_ids.get(name)
+        if sid is None:
+            sid = self.skill_ids[name] = len(self.skill_names)
+            self.skill_names.append(name)
+        return sid
+
+    def _role(self, target_role: str) -> _RoleStats:
+        stats = self.roles.get(target_role)
+        if stats is None:
+            stats = self.roles[target_role] = _RoleStats()
+        stats.grow(len(self.skill_names))
+        return stats
+
+    def _add(self, role: str, skill: str, missing: int, hist: list[int]) -> None:
+        sid = self._skill_id(skill)
+        if sid is None:
+            return
+        base = sid * HIST_BUCKETS
+        self.total.grow(len(self.skill_names))
+        for stats in (self._role(role), self.total):
+            stats.missing[sid] += missing
+            for b, c in enumerate(hist[:HIST_BUCKETS]):
+                stats.hist[base + b] += c
+
+    def load(self, role_rows: list[dict[str, Any]], skill_rows: list[dict[str, Any]]) -> None:
+        """Builds the index from role_assessment_counts and skill_gap_stats rows."""
+        for row in role_rows:
+            count = int(row.get("assessments") or 0)
+            self._role(_role_key(row.get("target_role"))).assessments += count
+            self.total.assessments += count
+        for row in skill_rows:
+            self._add(
+                _role_key(row.get("target_role")),
+                row.get("skill") or "",
+                int(row.get("missing_count") or 0),
+                [int(c or 0) for c in (row.get("gap_hist") or [])],
+            )
+        self.loaded_at = time.time()
+
+    def record_assessment(self, target_role: str, feedback: dict[str, Any]) -> None:
+        """Folds one new assessment in, mirroring accumulate_skill_gap_stats() in SQL."""
+        role = _role_key(target_role)
+        if not role or not isinstance(feedback, dict):
+            return
+        keys = skill_keys(feedback)
+        with self._lock:
+            self._role(role).assessments += 1
+            self.total.assessments += 1
+            for skill in keys["missing"]:
+                self._add(role, skill, 1, [])
+            for gap in keys["gaps"]:
+                hist = [0] * HIST_BUCKETS
+                hist[gap["gap_score"] - 1] = 1
+                self._add(role, gap["skill"], 0, hist)
+
+    def top_missing_skills(self, target_role: str | None = None, limit: int = 20) -> dict[str, Any]:
+        """Most frequently missing skills for one role, or across all roles when target_role is empty."""
+        with self._lock:
+            role = _role_key(target_role)
+            stats = self.roles.get(role, _RoleStats()) if role else self.total
+            stats.grow(len(self.skill_names))
+            missing, hist, assessments = stats.missing, stats.hist, stats.assessments
+            top = heapq.nlargest(limit, (i for i, c in enumerate(missing) if c), key=missing.__getitem__)
+            skills = []
+            for sid in top:
+                h = hist[sid * HIST_BUCKETS:(sid + 1) * HIST_BUCKETS].tolist()
+                rated = sum(h)
+                skills.append({
+                    "skill": self.skill_names[sid],
+                    "missing_count": missing[sid],
+                    "missing_share": round(missing[sid] / assessments, 4) if assessments else None,
+                    "gap_score_histogram": h,
+                    "avg_gap_score": round(sum((b + 1) * c for b, c in enumerate(h)) / rated, 2) if rated else None,
+                })
+        return {"target_role": target_role or None, "assessments": assessments, "skills": skills}
+
+
+def _fetch_all(supabase: Any, table: str, columns: str) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    start = 0
+    while True:
+        res = supabase.table(table).select(columns).range(start, start + _PAGE - 1).execute()
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < _PAGE:
+            return rows
+        start += _PAGE
+
+
+_index: SkillGapIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_skill_gap_index(supabase: Any) -> SkillGapIndex:
+    """The process-wide index, (re)loaded from the aggregate tables when older than REFRESH_S."""
+    global _index
+    with _index_lock:
+        if _index is None or time.time() - _index.loaded_at > REFRESH_S:
+            index = SkillGapIndex()
+            index.load(
+                _fetch_all(supabase, "role_assessment_counts", "target_role, assessments"),
+                _fetch_all(supabase, "skill_gap_stats", "target_role, skill, missing_count, gap_hist"),
+            )
+            _index = index
+        return _index
+
+
+def record_assessment(target_role: str, feedback: dict[str, Any]) -> None:
+    """Keeps an already-loaded index current after this process inserts an assessment."""
+    if _index is not None:
+        _index.record_assessment(target_role, feedback)
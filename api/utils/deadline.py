@@ -0,0 +1,46 @@
+"""
+Per-request time budget passed from each handler down to the network and LLM helpers.
+
+Helpers clamp their timeouts and retry sleeps to the remaining budget and fall back to static or
+partial data once it is spent, so a request never runs past the SLA waiting on a slow dependency.
+"""
+import math
+import os
+import time
+
+# Whole-request budget in seconds; keep it below the serverless function timeout.
+DEFAULT_REQUEST_BUDGET_S = float(os.getenv("API_REQUEST_BUDGET_SECONDS", "25"))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough budget left to start or continue an operation."""
+
+
+class Deadline:
+    def __init__(self, budget_s: float):
+        self.expires_at = time.monotonic() + budget_s
+
+    @classmethod
+    def for_request(cls) -> "Deadline":
+        return cls(DEFAULT_REQUEST_BUDGET_S)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "operation") -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"Request budget exhausted before {what}")
+
+    def timeout(self, cap: float | None = None) -> float | None:
+        """A network timeout that never outlives the deadline (None = no limit at all)."""
+        if math.isinf(self.expires_at):
+            return cap
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+
+# Used when a helper is called without a deadline (scripts, background jobs): no limit.
+NO_DEADLINE = Deadline(math.inf)
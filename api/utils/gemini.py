@@ -1,46 +1,293 @@
+import hashlib
+import json
+import math
 import os
-from google import genai
+import threading
 import time
 import random
+from contextlib import ExitStack
+from typing import NamedTuple
 
-def call_gemini_with_retry(prompt, model='gemini-2.0-flash'):
+from api.utils.deadline import NO_DEADLINE, Deadline, DeadlineExceeded
+from api.utils.llm_usage import budget_error, get_usage_ledger, record_cache_hit, seconds_until_reset
+from api.utils.shared_cache import cache_key, get_shared_cache
+
+# How many requests one API key can have in flight before it starts returning 429s
+CONCURRENCY_PER_KEY = int(os.getenv("GEMINI_CONCURRENCY_PER_KEY", "2"))
+# Identical prompts are answered from the shared cache (shared_cache.py) for this long; 0 disables
+RESPONSE_CACHE_TTL_S = float(os.getenv("GEMINI_RESPONSE_CACHE_SECONDS", str(24 * 3600)))
+# Static prompt prefixes are registered with Gemini context caching and sent by handle (see PromptTemplate)
+PREFIX_CACHE_ENABLED = os.getenv("GEMINI_PREFIX_CACHE", "1") != "0"
+PREFIX_CACHE_TTL_S = int(os.getenv("GEMINI_PREFIX_CACHE_SECONDS", "3600"))
+# Gemini rejects context caches below a model-specific minimum size; smaller prefixes (at ~4
+# characters per token) are sent inline instead of being registered
+PREFIX_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_PREFIX_CACHE_MIN_TOKENS", "1024"))
+# After a failed registration the prefix is sent inline for this long before trying again
+PREFIX_CACHE_RETRY_S = 3600
+
+def get_api_keys():
+    """GEMINI_API_KEY may hold several comma-separated keys."""
+    api_keys_str = os.getenv("GEMINI_API_KEY", "")
+    return [k.strip() for k in api_keys_str.split(",") if k.strip()]
+
+def key_pool_capacity():
+    """Concurrent Gemini calls the configured key pool can sustain (at least 1)."""
+    return max(1, len(get_api_keys()) * CONCURRENCY_PER_KEY)
+
+class SplitPrompt(NamedTuple):
+    name: str
+    prefix: str  # identical on every call: instructions and output schema
+    suffix: str  # this call's data
+
+    @property
+    def text(self):
+        return self.prefix + self.suffix
+
+class PromptTemplate:
+    """
+    A prompt split into a static prefix and a variable suffix (str.format fields). Keeping the static
+    part first lets Gemini serve it from a context cache: call_gemini_with_retry registers the prefix
+    once per key and model and sends only the suffix with the cache handle. A prefix below
+    PREFIX_CACHE_MIN_TOKENS, or one Gemini refuses to cache, is sent inline with the suffix; the
+    default model (gemini-2.0-flash) has no implicit caching, so those calls pay for the full prompt.
+    """
+
+    def __init__(self, name, prefix, suffix):
+        self.name = name
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def render(self, **fields):
+        return SplitPrompt(self.name, self.prefix, self.suffix.format(**fields))
+
+class _PrefixCaches:
+    """Context-cache handles per (API key, model, prefix), shared across workers through shared_cache."""
+
+    def __init__(self):
+        self._handles = {}  # key -> (handle or None, valid until)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.stats = {"registered": 0, "register_failures": 0, "cached_calls": 0, "inline_calls": 0, "tokens_saved": 0}
+
+    @staticmethod
+    def _key(api_key, model, prompt):
+        digest = lambda s: hashlib.sha256(s.encode()).hexdigest()[:16]
+        return (digest(api_key), model, digest(prompt.prefix))
+
+    def handle(self, client, api_key, model, prompt):
+        if not PREFIX_CACHE_ENABLED or len(prompt.prefix) / 4 < PREFIX_CACHE_MIN_TOKENS:
+            return None
+        key = self._key(api_key, model, prompt)
+        entry = self._handles.get(key)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._handles.get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+            shared = get_shared_cache()
+            name = shared.get("gemini_prefix", cache_key(*key)) if shared else None
+            if name:
+                # Registered by another worker; re-read shortly since its remaining lifetime is unknown
+                self._handles[key] = (name, time.time() + 60)
+                return name
+            from google.genai import types
+            try:
+                cached = client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        contents=[prompt.prefix],
+                        ttl=f"{PREFIX_CACHE_TTL_S}s",
+                        display_name=f"skillsphere-{prompt.name}",
+                    ),
+                )
+                name, valid_s = cached.name, PREFIX_CACHE_TTL_S - 60
+                self.stats["registered"] += 1
+                if shared:
+                    shared.set("gemini_prefix", cache_key(*key), name, valid_s)
+            except Exception as e:
+                print(f"Prompt prefix {prompt.name} not cached, sending inline: {e}")
+                name, valid_s = None, PREFIX_CACHE_RETRY_S
+                self.stats["register_failures"] += 1
+            self._handles[key] = (name, time.time() + valid_s)
+            return name
+
+    def invalidate(self, api_key, model, prompt):
+        key = self._key(api_key, model, prompt)
+        self._handles.pop(key, None)
+        shared = get_shared_cache()
+        if shared:
+            shared.delete("gemini_prefix", cache_key(*key))
+
+    def note(self, response, used_handle):
+        self.stats["cached_calls" if used_handle else "inline_calls"] += 1
+        usage = getattr(response, "usage_metadata", None)
+        self.stats["tokens_saved"] += getattr(usage, "cached_content_token_count", None) or 0
+
+_prefix_caches = _PrefixCaches()
+
+def prefix_cache_stats():
+    """Calls sent with a prefix handle vs inline, and input tokens Gemini served from its cache."""
+    return dict(_prefix_caches.stats)
+
+def _generate(client, api_key, model, prompt):
+    """Returns (response, sent_with_prefix_handle)."""
+    if not isinstance(prompt, SplitPrompt):
+        return client.models.generate_content(model=model, contents=prompt), False
+    handle = _prefix_caches.handle(client, api_key, model, prompt)
+    if handle:
+        from google.genai import types
+        try:
+            response = client.models.generate_content(
+                model=model,
+                contents=prompt.suffix,
+                config=types.GenerateContentConfig(cached_content=handle),
+            )
+            return response, True
+        except Exception as e:
+            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                raise
+            # Expired or deleted early: drop the handle and send this call inline
+            print(f"Prompt prefix cache {handle} unusable, sending inline: {e}")
+            _prefix_caches.invalidate(api_key, model, prompt)
+    return client.models.generate_content(model=model, contents=prompt.text), False
+
+def _record_usage(caller, model, prompt, started, retries, status, api_key=None, response=None):
+    """Appends the call to the usage ledger (llm_usage.py); never fails the call itself."""
+    ledger = get_usage_ledger()
+    if not ledger:
+        return
+    try:
+        usage = getattr(response, "usage_metadata", None)
+        ledger.record(
+            caller=caller,
+            model=model,
+            prompt_chars=len(prompt.text if isinstance(prompt, SplitPrompt) else prompt),
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+            cached_tokens=getattr(usage, "cached_content_token_count", None),
+            total_tokens=getattr(usage, "total_token_count", None),
+            latency_ms=int((time.monotonic() - started) * 1000),
+            key_suffix=api_key[-4:] if api_key else None,
+            retries=retries,
+            status=status,
+        )
+    except Exception as e:
+        print(f"LLM usage record failed: {e}")
+
+def parses_as_json(text):
+    """validate= for JSON prompts: the answer, less any markdown code fence, is well-formed JSON."""
+    if "```json" in text:
+        text = text.split("```json", 1)[1].split("```", 1)[0]
+    elif "```" in text:
+        text = text.split("```", 1)[1].split("```", 1)[0]
+    try:
+        json.loads(text.strip())
+        return True
+    except ValueError:
+        return False
+
+def call_gemini_with_retry(
+    prompt, model='gemini-2.0-flash', deadline: Deadline | None = None, validate=None, caller='unattributed'
+):
     """
     Calls Gemini with exponential backoff and rotates through multiple API keys if provided.
+    prompt is a string or a PromptTemplate-rendered SplitPrompt. Each call's timeout and every
+    backoff sleep are clamped to the request deadline; raises DeadlineExceeded instead of waiting
+    past it. Identical prompts are answered from the shared
+    cache; when validate is given (e.g. parses_as_json), only answers it accepts are cached or
+    served from the cache, so a truncated answer is asked again next time instead of replayed.
+    Every call is recorded in the usage ledger under caller (the call site, e.g.
+    "learning_path.generate_roadmap"), and a route or user over its daily token
+    budget gets an error dict of type "budget" instead. Calls made for an admitted request hold an
+    admission slot while they run, or get an error dict of type "rate_limit" when none frees up.
     """
-    api_keys_str = os.getenv("GEMINI_API_KEY", "")
-    api_keys = [k.strip() for k in api_keys_str.split(",") if k.strip()]
+    deadline = deadline or NO_DEADLINE
+    api_keys = get_api_keys()
     
     if not api_keys:
         return {"error": "GEMINI_API_KEY not configured"}
 
+    started = time.monotonic()
+    cache = get_shared_cache() if RESPONSE_CACHE_TTL_S > 0 else None
+    response_key = cache_key(model, prompt.text if isinstance(prompt, SplitPrompt) else prompt) if cache else None
+    if cache:
+        try:
+            cached = cache.get("gemini", response_key)
+            if cached is not None and (validate is None or validate(cached)):
+                record_cache_hit(caller)
+                return cached
+        except Exception as e:
+            print(f"Gemini response cache read failed: {e}")
+    over_budget = budget_error()
+    if over_budget:
+        print(f"Gemini call from {caller} refused: {over_budget}")
+        _record_usage(caller, model, prompt, started, 0, "budget")
+        return {"error": over_budget, "type": "budget", "retry_after": math.ceil(seconds_until_reset())}
+    retries = 0
+
     max_retries = 3
     base_delay = 2
     
     # Randomly shuffle keys to distribute load if multiple keys are provided
     random.shuffle(api_keys)
 
-    for attempt in range(max_retries + 1):
-        for api_key in api_keys:
-            try:
-                client = genai.Client(api_key=api_key)
-                response = client.models.generate_content(
-                    model=model,
-                    contents=prompt
-                )
-                return response.text
-            except Exception as e:
-                error_msg = str(e)
-                # Check for rate limit error
-                if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
-                    print(f"Rate limit hit for key ...{api_key[-5:]}. Attempt {attempt+1}/{max_retries+1}")
-                    continue # Try next key
-                else:
-                    raise e
+    # Deferred: google.genai is the slowest import in the API and only LLM routes need it
+    from google import genai
+    from api.utils.admission import Rejected, busy_error, gemini_slot
+
+    with ExitStack() as stack:
+        # The admitted request's admission slot is held for this call only (admission.py)
+        try:
+            stack.enter_context(gemini_slot())
+        except Rejected as e:
+            _record_usage(caller, model, prompt, started, 0, "busy")
+            return busy_error(e)
+
+        for attempt in range(max_retries + 1):
+            for api_key in api_keys:
+                try:
+                    deadline.check("Gemini call")
+                except DeadlineExceeded:
+                    _record_usage(caller, model, prompt, started, retries, "deadline")
+                    raise
+                timeout = deadline.timeout()
+                try:
+                    if timeout is None:
+                        client = genai.Client(api_key=api_key)
+                    else:
+                        client = genai.Client(api_key=api_key, http_options={"timeout": int(timeout * 1000)})
+                    response, used_handle = _generate(client, api_key, model, prompt)
+                    if isinstance(prompt, SplitPrompt):
+                        _prefix_caches.note(response, used_handle)
+                    _record_usage(caller, model, prompt, started, retries, "ok", api_key, response)
+                    if cache and response.text and (validate is None or validate(response.text)):
+                        try:
+                            cache.set("gemini", response_key, response.text, RESPONSE_CACHE_TTL_S)
+                        except Exception as e:
+                            print(f"Gemini response cache write failed: {e}")
+                    return response.text
+                except Exception as e:
+                    error_msg = str(e)
+                    # Check for rate limit error
+                    if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
+                        print(f"Rate limit hit for key ...{api_key[-5:]}. Attempt {attempt+1}/{max_retries+1}")
+                        retries += 1
+                        continue # Try next key
+                    else:
+                        _record_usage(caller, model, prompt, started, retries, "error", api_key)
+                        raise e
         
-        # If we reach here, all keys were rate limited in this attempt
-        if attempt < max_retries:
-            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-            print(f"All keys rate limited. Retrying in {delay:.2f} seconds...")
-            time.sleep(delay)
-    
-    raise Exception("Gemini API rate limit reached for all provided keys after retries.")
+            # If we reach here, all keys were rate limited in this attempt
+            if attempt < max_retries:
+                delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+                if delay >= deadline.remaining():
+                    _record_usage(caller, model, prompt, started, retries, "deadline")
+                    raise DeadlineExceeded("Gemini rate limited and no budget left to back off")
+                print(f"All keys rate limited. Retrying in {delay:.2f} seconds...")
+                time.sleep(delay)
+
+        _record_usage(caller, model, prompt, started, retries, "rate_limited")
+        raise Exception("Gemini API rate limit reached for all provided keys after retries.")
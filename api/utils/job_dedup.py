@@ -0,0 +1,92 @@
+"""
+Collapses duplicate job listings across portals into one listing with several portal links.
+
+Two listings are the same posting when their canonical URLs match (job_store.canonicalize_url drops
+tracking parameters) or when their title + snippet word shingles have Jaccard similarity of at least
+NEAR_DUPLICATE_THRESHOLD, which catches one posting syndicated to LinkedIn and Glassdoor. Candidate
+pairs come from a MinHash LSH index (minhash.py), so a result set is collapsed in one pass instead of
+comparing every pair; each candidate is confirmed with exact Jaccard before merging.
+"""
+import os
+import re
+from typing import Any
+
+from api.utils.job_store import canonicalize_url
+from api.utils.minhash import LSHIndex, MinHasher, exact_jaccard
+
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("JOB_DEDUP_THRESHOLD", "0.6"))
+SHINGLE_WORDS = 2
+
+# Portal names and boilerplate differ between syndicated copies of one posting
+_NOISE_WORDS = {
+    "linkedin", "naukri", "naukri.com", "glassdoor", "com", "jobs", "job", "hiring", "apply", "now",
+    "the", "a", "an", "and", "of", "in", "at", "for", "to", "with", "on", "is",
+}
+_hasher = MinHasher(num_perm=63)
+
+
+def _shingles(job: dict[str, Any]) -> frozenset[str]:
+    words = [
+        w for w in re.findall(r"[a-z0-9+#]+", f"{job.get('title') or ''} {job.get('snippet') or ''}".lower())
+        if w not in _NOISE_WORDS
+    ]
+    if len(words) <= SHINGLE_WORDS:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _merge(group: list[dict[str, Any]]) -> dict[str, Any]:
+    """The first listing (highest-priority provider) with every distinct portal link and the longest snippet."""
+    primary = dict(group[0])
+    portals: list[dict[str, Any]] = []
+    seen_urls: set[str] = set()
+    for job in group:
+        url = canonicalize_url(job["url"])
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        portals.append({"portal": job.get("portal"), "portal_key": job.get("portal_key"), "url": job["url"]})
+    primary["snippet"] = max((j.get("snippet") or "" for j in group), key=len)
+    primary["portals"] = portals
+    return primary
+
+
+def collapse_duplicates(
+    jobs: list[dict[str, Any]], threshold: float = NEAR_DUPLICATE_THRESHOLD
+) -> list[dict[str, Any]]:
+    """Merges exact (canonical URL) and near (title + snippet) duplicates; keeps first-seen order."""
+    jobs = [j for j in jobs if j.get("url")]
+    parent = list(range(len(jobs)))
+    by_url: dict[str, int] = {}
+    shingles: list[frozenset[str]] = []
+    # 21 bands x 3 rows: pairs at the 0.6 threshold become candidates with probability ~0.99
+    index = LSHIndex(bands=21, rows=3)
+    for i, job in enumerate(jobs):
+        url = canonicalize_url(job["url"])
+        if url in by_url:
+            parent[_find(parent, i)] = _find(parent, by_url[url])
+        else:
+            by_url[url] = i
+        shingles.append(_shingles(job))
+        if not shingles[i]:
+            continue
+        signature = _hasher.signature(shingles[i])
+        for j in index.candidates(signature):
+            if exact_jaccard(shingles[i], shingles[j]) >= threshold:
+                root_i, root_j = _find(parent, i), _find(parent, j)
+                if root_i != root_j:
+                    # The earlier listing stays the root, so groups keep their first-seen listing first
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+        index.add(i, signature)
+
+    groups: dict[int, list[dict[str, Any]]] = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault(_find(parent, i), []).append(job)
+    return [_merge(group) for group in groups.values()]
@@ -1,13 +1,27 @@
 """
 Crew-style job discovery: three portal "agents" run in sequence, results merge, rank by skills, then Gemini summary.
+Every live run is recorded in the local job store (job_store.py); a role searched recently is answered
+from there, and mode="index" searches all stored listings without calling any provider.
 
 The `crewai` PyPI package requires Python <3.14; this project uses a small in-process orchestration so it works on 3.14+.
 Swap in the official CrewAI SDK when your runtime is Python 3.10–3.13 and add `crewai` to requirements.
 """
 import json
+import time
 from typing import Any
 
-from api.utils.job_search_serp import fetch_portal_jobs, rank_by_skills, search_capability_message
+from api.utils.deadline import NO_DEADLINE, Deadline
+from api.utils.job_dedup import collapse_duplicates
+from api.utils.job_search_serp import (
+    deep_fetch_portal_jobs,
+    fetch_portal_jobs,
+    rank_by_skills,
+    search_capability_message,
+)
+from api.utils.job_store import get_job_store
+
+# Skip the Gemini summary when less budget than this is left; listings are returned without it.
+MIN_SUMMARY_BUDGET_S = 3.0
 
 
 class PortalResearchAgent:
@@ -17,8 +31,8 @@ class PortalResearchAgent:
         self.display_name = display_name
         self.portal_key = portal_key
 
-    def run(self, target_role: str) -> list[dict[str, Any]]:
-        return fetch_portal_jobs(target_role.strip(), self.portal_key)
+    def run(self, target_role: str, deadline: Deadline | None = None) -> list[dict[str, Any]]:
+        return fetch_portal_jobs(target_role.strip(), self.portal_key, deadline)
 
 
 class JobSearchCrew:
@@ -34,23 +48,54 @@ class JobSearchCrew:
             PortalResearchAgent("Glassdoor researcher", "glassdoor"),
         ]
 
-    def kickoff(self) -> tuple[list[dict[str, Any]], str]:
-        """Returns (deduped jobs, short log for debugging/UI)."""
+    def kickoff(self, deadline: Deadline | None = None, deep: bool = False) -> tuple[list[dict[str, Any]], str]:
+        """
+        Returns (jobs with cross-portal duplicates merged, short log for debugging/UI).
+        Portals not reached before the deadline are skipped. `deep` searches several pages and
+        role-synonym queries per portal concurrently (deep_fetch_portal_jobs) instead.
+        """
+        deadline = deadline or NO_DEADLINE
+        if deep:
+            return self._deep_kickoff(deadline)
         combined: list[dict[str, Any]] = []
         lines: list[str] = []
+        complete = True
         for agent in self.agents:
-            rows = agent.run(self.target_role)
+            if deadline.expired():
+                lines.append(f"{agent.display_name}: skipped (time budget)")
+                complete = False
+                continue
+            rows = agent.run(self.target_role, deadline)
             combined.extend(rows)
             lines.append(f"{agent.display_name}: {len(rows)} listings")
-        merged_map: dict[str, dict[str, Any]] = {}
-        for row in combined:
-            u = row.get("url")
-            if u and u not in merged_map:
-                merged_map[u] = row
-        all_jobs = list(merged_map.values())
+        # The store keeps every portal's copy (keyed by canonical URL); callers get one listing per posting
+        self._record(combined, complete)
+        all_jobs = collapse_duplicates(combined)
+        if len(all_jobs) < len(combined):
+            lines.append(f"{len(combined) - len(all_jobs)} duplicates merged")
         log = " · ".join(lines)
         return all_jobs, log
 
+    def _deep_kickoff(self, deadline: Deadline) -> tuple[list[dict[str, Any]], str]:
+        rows, stats = deep_fetch_portal_jobs(self.target_role.strip(), deadline)
+        self._record(rows, not stats["timed_out"])
+        jobs = collapse_duplicates(rows)
+        log = f"Deep fetch: {stats['completed']}/{stats['planned']} searches, {len(jobs)} listings"
+        if stats["timed_out"]:
+            log += " (time budget reached)"
+        elif stats["started"] < stats["planned"]:
+            log += f" (enough listings; {stats['planned'] - stats['started']} searches skipped)"
+        return jobs, log
+
+    def _record(self, jobs: list[dict[str, Any]], complete: bool) -> None:
+        store = get_job_store()
+        if not store:
+            return
+        try:
+            store.record(self.target_role, jobs, complete=complete)
+        except Exception as e:
+            print(f"Job store write failed: {e}")
+
 
 def _gemini_key() -> str:
     raw = __import__("os").getenv("GEMINI_API_KEY", "") or ""
@@ -58,8 +103,11 @@ def _gemini_key() -> str:
     return parts[0] if parts else ""
 
 
-def _summarize_top_matches(target_role: str, skills: list[str], top: list[dict[str, Any]]) -> str | None:
-    if not top:
+def _summarize_top_matches(
+    target_role: str, skills: list[str], top: list[dict[str, Any]], deadline: Deadline | None = None
+) -> str | None:
+    deadline = deadline or NO_DEADLINE
+    if not top or deadline.remaining() < MIN_SUMMARY_BUDGET_S:
         return None
     try:
         from api.utils.gemini import call_gemini_with_retry
@@ -77,7 +125,7 @@ def _summarize_top_matches(target_role: str, skills: list[str], top: list[dict[s
             "and what they should verify on the employer site before applying. "
             "Do not invent company names, salaries, or URLs."
         )
-        out = call_gemini_with_retry(prompt)
+        out = call_gemini_with_retry(prompt, deadline=deadline, caller="job_search_crew._summarize_top_matches")
         if isinstance(out, dict) and out.get("error"):
             return None
         return str(out).strip()[:1500]
@@ -86,21 +134,59 @@ def _summarize_top_matches(target_role: str, skills: list[str], top: list[dict[s
         return None
 
 
-def run_job_search_with_crew(target_role: str, skills: list[str]) -> dict[str, Any]:
-    cap = search_capability_message()
-    if cap:
-        return {
-            "jobs": [],
-            "top_matches": [],
-            "summary": None,
-            "crew_output": None,
-            "config_hint": cap,
-        }
+def _from_index(target_role: str, mode: str) -> tuple[list[dict[str, Any]], str] | None:
+    """Stored listings for the role, or None when the store can't answer (auto mode then goes live)."""
+    store = get_job_store()
+    if not store:
+        return None
+    try:
+        if mode == "index":
+            jobs = collapse_duplicates(store.search(target_role))
+            return jobs, f"Job index: {len(jobs)} stored listings matched across all portals"
+        cov = store.coverage(target_role)
+        if not cov:
+            return None
+        jobs = collapse_duplicates(store.jobs_for_role(target_role))
+        if not jobs:
+            return None
+        age_min = int((time.time() - cov["searched_at"]) // 60)
+        return jobs, f"Job index: {len(jobs)} listings from a search {age_min} min ago"
+    except Exception as e:
+        print(f"Job store read failed: {e}")
+        return None
+
+
+def run_job_search_with_crew(
+    target_role: str, skills: list[str], deadline: Deadline | None = None, mode: str = "auto"
+) -> dict[str, Any]:
+    """
+    mode: "auto" answers from the job store when the role was searched recently, else searches live;
+    "live" always calls the providers; "deep" does too, over more pages and role synonyms;
+    "index" only searches stored listings.
+    """
+    indexed = _from_index(target_role, mode) if mode in ("auto", "index") else None
+    if indexed is not None:
+        all_jobs, crew_log = indexed
+        source = "index"
+    elif mode == "index":
+        all_jobs, crew_log, source = [], "Job index unavailable", "index"
+    else:
+        cap = search_capability_message()
+        if cap:
+            return {
+                "jobs": [],
+                "top_matches": [],
+                "summary": None,
+                "crew_output": None,
+                "config_hint": cap,
+            }
+
+        crew = JobSearchCrew(target_role)
+        all_jobs, crew_log = crew.kickoff(deadline, deep=mode == "deep")
+        source = "live"
 
-    crew = JobSearchCrew(target_role)
-    all_jobs, crew_log = crew.kickoff()
     top = rank_by_skills(all_jobs, skills, 6)
-    summary = _summarize_top_matches(target_role, skills, top) if _gemini_key() else None
+    summary = _summarize_top_matches(target_role, skills, top, deadline) if _gemini_key() else None
 
     return {
         "jobs": all_jobs,
@@ -108,4 +194,5 @@ def run_job_search_with_crew(target_role: str, skills: list[str]) -> dict[str, A
         "summary": summary,
         "crew_output": crew_log,
         "config_hint": None,
+        "source": source,
     }
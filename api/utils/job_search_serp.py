@@ -2,12 +2,47 @@
 Fetch job listing URLs via search APIs (SerpAPI, Google Programmable Search, or Tavily).
 Direct scraping of LinkedIn/Naukri/Glassdoor is not used (ToS / blocking).
 Recency: SerpAPI/CSE use a past-day filter; Tavily uses time_range=day (~last 24h).
+Providers are raced through a health-aware router (see provider_router.py): open circuits are
+skipped and a slow provider is hedged with the next one once it passes its p95 latency. Each HTTP
+timeout is clamped to the request deadline, so a hedged call left behind frees its pool worker
+when the request's budget runs out.
 """
 import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Any
 
 import requests
 
+from api.utils.deadline import NO_DEADLINE, Deadline
+from api.utils.job_dedup import collapse_duplicates
+from api.utils.job_store import canonicalize_url
+from api.utils.provider_router import Provider, ProviderRouter
+from api.utils.shared_cache import shared_cached
+
+# Results only cover the past day, so a portal search is shared across workers for a short while
+SEARCH_CACHE_TTL_S = float(os.getenv("JOB_SEARCH_CACHE_SECONDS", "1800"))
+
+# Deep fetch (mode="deep"): extra result pages and role-synonym queries, searched concurrently
+DEEP_FETCH_PAGES = int(os.getenv("JOB_DEEP_FETCH_PAGES", "2"))
+DEEP_FETCH_VARIANTS = int(os.getenv("JOB_DEEP_FETCH_VARIANTS", "2"))
+DEEP_FETCH_MAX_REQUESTS = int(os.getenv("JOB_DEEP_FETCH_MAX_REQUESTS", "12"))
+DEEP_FETCH_TARGET = int(os.getenv("JOB_DEEP_FETCH_TARGET", "60"))
+DEEP_FETCH_CONCURRENCY = 6
+
+# Interchangeable words in role titles, used to build query variants
+_ROLE_SYNONYMS = [
+    ("engineer", "developer"),
+    ("frontend", "front end"),
+    ("backend", "back end"),
+    ("full stack", "fullstack"),
+    ("machine learning", "ml"),
+    ("devops", "site reliability"),
+]
+
+# Separate from the provider pool: each task waits on provider calls submitted there
+_deep_executor = ThreadPoolExecutor(max_workers=DEEP_FETCH_CONCURRENCY, thread_name_prefix="deep-fetch")
+
 # Domains that identify which portal a result belongs to
 PORTAL_SITES = {
     "linkedin": ("linkedin.com/jobs", "LinkedIn"),
@@ -16,7 +51,9 @@ PORTAL_SITES = {
 }
 
 
-def _serpapi_google_jobs(query: str, num: int = 10) -> list[dict[str, Any]]:
+def _serpapi_google_jobs(
+    query: str, num: int = 10, page: int = 0, deadline: Deadline = NO_DEADLINE
+) -> list[dict[str, Any]]:
     key = os.getenv("SERPAPI_KEY", "").strip()
     if not key:
         return []
@@ -28,13 +65,11 @@ def _serpapi_google_jobs(query: str, num: int = 10) -> list[dict[str, Any]]:
         # Past 24 hours (Google search)
         "tbs": "qdr:d",
     }
-    try:
-        r = requests.get("https://serpapi.com/search.json", params=params, timeout=45)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print(f"SerpAPI error: {e}")
-        return []
+    if page:
+        params["start"] = page * num
+    r = requests.get("https://serpapi.com/search.json", params=params, timeout=deadline.timeout(45))
+    r.raise_for_status()
+    data = r.json()
 
     organic = data.get("organic_results") or []
     out: list[dict[str, Any]] = []
@@ -59,7 +94,9 @@ def _serpapi_google_jobs(query: str, num: int = 10) -> list[dict[str, Any]]:
     return out
 
 
-def _google_cse_search(query: str, num: int = 10) -> list[dict[str, Any]]:
+def _google_cse_search(
+    query: str, num: int = 10, page: int = 0, deadline: Deadline = NO_DEADLINE
+) -> list[dict[str, Any]]:
     api_key = os.getenv("GOOGLE_SEARCH_API_KEY", "").strip()
     cx = os.getenv("GOOGLE_SEARCH_CX", "").strip()
     if not api_key or not cx:
@@ -71,17 +108,18 @@ def _google_cse_search(query: str, num: int = 10) -> list[dict[str, Any]]:
         "num": min(num, 10),
         "dateRestrict": "d1",
     }
-    try:
-        r = requests.get(
-            "https://www.googleapis.com/customsearch/v1",
-            params=params,
-            timeout=45,
-        )
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print(f"Google CSE error: {e}")
-        return []
+    if page:
+        # 1-based result index; CSE serves at most 100 results per query
+        params["start"] = page * min(num, 10) + 1
+        if params["start"] > 91:
+            return []
+    r = requests.get(
+        "https://www.googleapis.com/customsearch/v1",
+        params=params,
+        timeout=deadline.timeout(45),
+    )
+    r.raise_for_status()
+    data = r.json()
 
     items = data.get("items") or []
     out: list[dict[str, Any]] = []
@@ -106,8 +144,12 @@ def _google_cse_search(query: str, num: int = 10) -> list[dict[str, Any]]:
     return out
 
 
-def _tavily_search_jobs(query: str, num: int = 15) -> list[dict[str, Any]]:
+def _tavily_search_jobs(
+    query: str, num: int = 15, page: int = 0, deadline: Deadline = NO_DEADLINE
+) -> list[dict[str, Any]]:
     key = os.getenv("TAVILY_API_KEY", "").strip()
+    # Tavily has no result pages (paged=False below, so the router only asks for page 0); deep
+    # fetches get more from it through query variants
     if not key:
         return []
     payload: dict[str, Any] = {
@@ -118,13 +160,9 @@ def _tavily_search_jobs(query: str, num: int = 15) -> list[dict[str, Any]]:
         "time_range": "day",
         "include_answer": False,
     }
-    try:
-        r = requests.post("https://api.tavily.com/search", json=payload, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print(f"Tavily error: {e}")
-        return []
+    r = requests.post("https://api.tavily.com/search", json=payload, timeout=deadline.timeout(60))
+    r.raise_for_status()
+    data = r.json()
 
     results = data.get("results") or []
     out: list[dict[str, Any]] = []
@@ -160,38 +198,133 @@ def _portal_from_url(url: str) -> tuple[str, str] | None:
     return None
 
 
-def fetch_portal_jobs(target_role: str, portal_key: str) -> list[dict[str, Any]]:
+def _serpapi_configured() -> bool:
+    return bool(os.getenv("SERPAPI_KEY", "").strip())
+
+
+def _google_cse_configured() -> bool:
+    return bool(os.getenv("GOOGLE_SEARCH_API_KEY", "").strip() and os.getenv("GOOGLE_SEARCH_CX", "").strip())
+
+
+def _tavily_configured() -> bool:
+    return bool(os.getenv("TAVILY_API_KEY", "").strip())
+
+
+# Priority order is preserved; health only decides skipping and when to hedge.
+search_router = ProviderRouter(
+    [
+        Provider("SerpAPI", _serpapi_google_jobs, _serpapi_configured),
+        Provider("Google CSE", _google_cse_search, _google_cse_configured),
+        Provider("Tavily", _tavily_search_jobs, _tavily_configured, paged=False),
+    ]
+)
+
+
+@shared_cached(
+    "portal_jobs",
+    SEARCH_CACHE_TTL_S,
+    key=lambda target_role, portal_key, deadline=None, page=0: (
+        " ".join(target_role.lower().split()), portal_key, page
+    ),
+    cache_if=bool,
+)
+def fetch_portal_jobs(
+    target_role: str, portal_key: str, deadline: Deadline | None = None, page: int = 0
+) -> list[dict[str, Any]]:
     """
     One portal: site:-restricted query + last 24h when using SerpAPI tbs=qdr:d or CSE dateRestrict.
+    `page` selects a later result page (0 is the first). Returns [] if no provider answers before the
+    deadline. Non-empty results are shared by every worker for JOB_SEARCH_CACHE_SECONDS.
     """
     site_tuple = PORTAL_SITES.get(portal_key)
     if not site_tuple:
         return []
     site = site_tuple[0]
     q = f'site:{site} {target_role}'
-    rows = _serpapi_google_jobs(q)
-    if not rows:
-        rows = _google_cse_search(q)
-    if not rows:
-        rows = _tavily_search_jobs(q)
-    return rows
+    return search_router.run(q, deadline, page=page)
 
 
-def fetch_all_portal_jobs(target_role: str) -> list[dict[str, Any]]:
-    """Collect jobs from LinkedIn, Naukri, and Glassdoor (via search index)."""
+def fetch_all_portal_jobs(target_role: str, deadline: Deadline | None = None) -> list[dict[str, Any]]:
+    """
+    Collect jobs from LinkedIn, Naukri, and Glassdoor (via search index). One posting found on several
+    portals (or under several tracking URLs) comes back once, with all of its links in "portals".
+    """
     combined: list[dict[str, Any]] = []
     for key in PORTAL_SITES:
-        combined.extend(fetch_portal_jobs(target_role, key))
-    # Dedupe by URL
+        combined.extend(fetch_portal_jobs(target_role, key, deadline))
+    return collapse_duplicates(combined)
+
+
+def role_variants(target_role: str, limit: int = DEEP_FETCH_VARIANTS) -> list[str]:
+    """The role as given, then up to `limit` synonym phrasings ("backend engineer" -> "backend developer")."""
+    role = " ".join(target_role.lower().split())
+    variants = [role]
+    for a, b in _ROLE_SYNONYMS:
+        for src, dst in ((a, b), (b, a)):
+            for base in list(variants):
+                swapped = re.sub(rf"\b{re.escape(src)}\b", dst, base)
+                if swapped not in variants and len(variants) <= limit:
+                    variants.append(swapped)
+    return variants
+
+
+def deep_fetch_portal_jobs(
+    target_role: str,
+    deadline: Deadline | None = None,
+    max_requests: int = DEEP_FETCH_MAX_REQUESTS,
+    target_unique: int = DEEP_FETCH_TARGET,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Every portal's first page for the role, then synonym variants, then later pages (only when a
+    configured provider has pages): at most `max_requests` searches in that order,
+    DEEP_FETCH_CONCURRENCY at a time. Results are merged as
+    they arrive, and no further search starts once `target_unique` distinct listings are in hand.
+    Returns (rows with distinct canonical URLs, stats for the log); near-duplicates across portals
+    are left for collapse_duplicates.
+    """
+    deadline = deadline or NO_DEADLINE
+    pages = DEEP_FETCH_PAGES if search_router.supports_pages() else 1
+    plan = [
+        (variant, portal_key, page)
+        for page in range(pages)
+        for variant in role_variants(target_role)
+        for portal_key in PORTAL_SITES
+    ][:max_requests]
+    queue = iter(plan)
+    in_flight: dict[Future, tuple[str, str, int]] = {}
+    combined: list[dict[str, Any]] = []
     seen: set[str] = set()
-    unique: list[dict[str, Any]] = []
-    for j in combined:
-        u = j.get("url") or ""
-        if u in seen:
-            continue
-        seen.add(u)
-        unique.append(j)
-    return unique
+    stats = {"planned": len(plan), "started": 0, "completed": 0, "timed_out": False}
+
+    def top_up() -> None:
+        while len(in_flight) < DEEP_FETCH_CONCURRENCY and len(seen) < target_unique and not deadline.expired():
+            task = next(queue, None)
+            if task is None:
+                return
+            in_flight[_deep_executor.submit(fetch_portal_jobs, task[0], task[1], deadline, task[2])] = task
+            stats["started"] += 1
+
+    top_up()
+    while in_flight and len(seen) < target_unique:
+        if deadline.expired():
+            stats["timed_out"] = True
+            break
+        done, _ = wait(list(in_flight), timeout=deadline.timeout(), return_when=FIRST_COMPLETED)
+        for fut in done:
+            task = in_flight.pop(fut)
+            stats["completed"] += 1
+            if fut.exception() is not None:
+                print(f"Deep fetch {task} failed: {fut.exception()}")
+                continue
+            for row in fut.result():
+                url = canonicalize_url(row.get("url") or "")
+                if url and url not in seen:
+                    seen.add(url)
+                    combined.append(row)
+        top_up()
+    # Searches still running are not waited for; they finish in the pool and fill the shared cache
+    stats["unique_urls"] = len(seen)
+    return combined, stats
 
 
 def rank_by_skills(jobs: list[dict[str, Any]], skills: list[str], top_n: int = 6) -> list[dict[str, Any]]:
@@ -213,11 +346,7 @@ def rank_by_skills(jobs: list[dict[str, Any]], skills: list[str], top_n: int = 6
 
 
 def search_capability_message() -> str | None:
-    if os.getenv("SERPAPI_KEY", "").strip():
-        return None
-    if os.getenv("GOOGLE_SEARCH_API_KEY", "").strip() and os.getenv("GOOGLE_SEARCH_CX", "").strip():
-        return None
-    if os.getenv("TAVILY_API_KEY", "").strip():
+    if _serpapi_configured() or _google_cse_configured() or _tavily_configured():
         return None
     return (
         "Job discovery requires TAVILY_API_KEY, or SERPAPI_KEY, or GOOGLE_SEARCH_API_KEY + "
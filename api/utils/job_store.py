@@ -0,0 +1,251 @@
+"""
+Accumulating local store of job listings returned by the search providers.
+
+Listings are keyed by canonical URL in SQLite with an FTS5 index over title + snippet, plus
+first-seen / last-seen timestamps. Each live crew run records what it found and when the role was
+searched, so later requests for a recently covered role (or a free-text search across every stored
+portal) are answered locally without spending provider quota. Listings not seen for
+JOB_STORE_MAX_AGE_SECONDS are evicted.
+
+Set JOB_STORE_PATH to move the database, or to an empty string to disable the store.
+"""
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+FRESH_COVERAGE_S = float(os.getenv("JOB_STORE_FRESH_SECONDS", str(6 * 3600)))
+MAX_AGE_S = float(os.getenv("JOB_STORE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+
+# Query parameters that only identify the click, not the posting
+TRACKING_PARAM_PREFIXES = ("utm_", "ref", "trk", "tracking", "src", "fbclid", "gclid", "msclkid", "position", "pagenum")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT,
+    snippet TEXT,
+    portal TEXT,
+    portal_key TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs(last_seen);
+CREATE TABLE IF NOT EXISTS job_roles (
+    role TEXT NOT NULL,
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (role, job_id)
+);
+CREATE TABLE IF NOT EXISTS role_searches (
+    role TEXT PRIMARY KEY,
+    searched_at REAL NOT NULL,
+    listings INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(title, snippet, content='jobs', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, snippet ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO jobs_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+"""
+
+
+def canonicalize_url(url: str) -> str:
+    """Lowercased scheme/host, no fragment, tracking params dropped, remaining params sorted."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(query), ""))
+
+
+def _role_key(target_role: str) -> str:
+    return " ".join(target_role.lower().split())
+
+
+def _fts_query(text: str, any_term: bool = False) -> str:
+    terms = [t for t in re.findall(r"[\w+#]+", text.lower()) if len(t) > 1]
+    return (" OR " if any_term else " ").join(f'"{t}"' for t in terms)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def _row_to_job(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "title": row["title"],
+        "url": row["url"],
+        "snippet": row["snippet"],
+        "portal": row["portal"],
+        "portal_key": row["portal_key"],
+        "first_seen": _iso(row["first_seen"]),
+        "last_seen": _iso(row["last_seen"]),
+    }
+
+
+class JobStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+    def record(
+        self, target_role: str, jobs: list[dict[str, Any]], complete: bool = True, now: float | None = None
+    ) -> None:
+        """
+        Upserts listings from one live search. Only a complete search (every portal answered)
+        marks the role as covered, so a deadline-truncated run is never served as the full picture.
+        """
+        now = now or time.time()
+        role = _role_key(target_role)
+        conn = self._connect()
+        try:
+            with conn:
+                for job in jobs:
+                    if not job.get("url"):
+                        continue
+                    url = canonicalize_url(job["url"])
+                    conn.execute(
+                        """
+                        INSERT INTO jobs (url, title, snippet, portal, portal_key, first_seen, last_seen)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(url) DO UPDATE SET
+                            title = excluded.title, snippet = excluded.snippet, last_seen = excluded.last_seen
+                        """,
+                        (url, job.get("title"), job.get("snippet"), job.get("portal"), job.get("portal_key"), now, now),
+                    )
+                    conn.execute(
+                        """
+                        INSERT INTO job_roles (role, job_id, last_seen)
+                        SELECT ?, id, ? FROM jobs WHERE url = ?
+                        ON CONFLICT(role, job_id) DO UPDATE SET last_seen = excluded.last_seen
+                        """,
+                        (role, now, url),
+                    )
+                if complete:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO role_searches (role, searched_at, listings) VALUES (?, ?, ?)",
+                        (role, now, len(jobs)),
+                    )
+                self._evict(conn, now - MAX_AGE_S)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, cutoff: float) -> int:
+        cur = conn.execute("DELETE FROM jobs WHERE last_seen < ?", (cutoff,))
+        conn.execute("DELETE FROM role_searches WHERE searched_at < ?", (cutoff,))
+        return cur.rowcount
+
+    def evict_older_than(self, max_age_s: float = MAX_AGE_S) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                return self._evict(conn, time.time() - max_age_s)
+        finally:
+            conn.close()
+
+    def coverage(self, target_role: str, max_age_s: float = FRESH_COVERAGE_S) -> dict[str, Any] | None:
+        """The role's last live search if it is recent enough and found something, else None."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT searched_at, listings FROM role_searches WHERE role = ? AND searched_at >= ? AND listings > 0",
+                (_role_key(target_role), time.time() - max_age_s),
+            ).fetchone()
+        finally:
+            conn.close()
+        return {"searched_at": row["searched_at"], "listings": row["listings"]} if row else None
+
+    def jobs_for_role(self, target_role: str, max_age_s: float = FRESH_COVERAGE_S) -> list[dict[str, Any]]:
+        """Listings surfaced by searches for this role, most recently seen first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT j.* FROM job_roles r JOIN jobs j ON j.id = r.job_id
+                WHERE r.role = ? AND r.last_seen >= ?
+                ORDER BY r.last_seen DESC, j.first_seen DESC
+                """,
+                (_role_key(target_role), time.time() - max_age_s),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [_row_to_job(r) for r in rows]
+
+    def search(
+        self, text: str, portal_keys: list[str] | None = None, limit: int = 50, max_age_s: float = MAX_AGE_S
+    ) -> list[dict[str, Any]]:
+        """Full-text search over every stored portal at once (all terms first, then any term)."""
+        out: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        conn = self._connect()
+        try:
+            for any_term in (False, True):
+                match = _fts_query(text, any_term)
+                if not match or len(out) >= limit:
+                    break
+                sql = """
+                    SELECT j.* FROM jobs_fts f JOIN jobs j ON j.id = f.rowid
+                    WHERE jobs_fts MATCH ? AND j.last_seen >= ?
+                """
+                params: list[Any] = [match, time.time() - max_age_s]
+                if portal_keys:
+                    sql += f" AND j.portal_key IN ({','.join('?' * len(portal_keys))})"
+                    params.extend(portal_keys)
+                sql += " ORDER BY bm25(jobs_fts) LIMIT ?"
+                params.append(limit)
+                for r in conn.execute(sql, params):
+                    if r["url"] not in seen and len(out) < limit:
+                        seen.add(r["url"])
+                        out.append(_row_to_job(r))
+        finally:
+            conn.close()
+        return out
+
+
+_store: JobStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore | None:
+    """Process-wide store, or None when disabled with an empty JOB_STORE_PATH."""
+    global _store
+    path = os.getenv("JOB_STORE_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "skillsphere_jobs.sqlite3")
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = JobStore(path)
+    return _store
@@ -0,0 +1,84 @@
+"""
+Role keywords present in / missing from a resume, computed locally for /api/career-assessment.
+
+A role's vocabulary is its roadmap.sh topic list (fetch_roadmapsh_topics, shared-cached) with the
+curriculum scaffolding removed ("Learn the Basics", "How does the internet work?"): a topic is kept
+when it is a known skill (skills table or catalog, see skill_matcher.py) or a short, non-generic
+label. Each vocabulary is compiled once into a SkillMatcher that also knows every spelling folding to
+the same skill, so "ReactJS" in a resume counts for the "React" topic. present/missing keep roadmap
+order (fundamentals first) and are the same for the same resume on every run.
+
+Roles without a roadmap.sh vocabulary return None and the assessment prompt keeps asking Gemini.
+"""
+import os
+import re
+import threading
+import time
+
+from api.utils.deadline import Deadline
+from api.utils.learning_path import fetch_roadmapsh_topics, get_roadmapsh_id, normalize_skill
+from api.utils.skill_matcher import SkillMatcher, get_skill_matcher
+
+MAX_PRESENT = int(os.getenv("ASSESSMENT_MAX_PRESENT_KEYWORDS", "20"))
+MAX_MISSING = int(os.getenv("ASSESSMENT_MAX_MISSING_KEYWORDS", "12"))
+# Fewer usable topics than this is too thin a vocabulary to judge a resume by
+MIN_VOCABULARY = 5
+VOCAB_TTL_S = 3600.0
+_MAX_TOPIC_WORDS = 3
+_GENERIC_WORDS = re.compile(
+    r"\b(?:learn|learning|basics?|introduction|intro|fundamentals|overview|what|why|how|pick|choose|"
+    r"understand|understanding|getting|started|more|other|beginner|advanced|concepts?|tools?)\b",
+    re.IGNORECASE,
+)
+
+_vocabularies: dict[str, tuple[float, list[str], SkillMatcher]] = {}
+_vocab_lock = threading.Lock()
+
+
+def _keep_topic(label: str, known: set[str]) -> bool:
+    if normalize_skill(label) in known:
+        return True
+    return len(label.split()) <= _MAX_TOPIC_WORDS and "?" not in label and not _GENERIC_WORDS.search(label)
+
+
+def _role_vocabulary(target_role: str, deadline: Deadline | None) -> tuple[list[str], SkillMatcher] | None:
+    """(canonical topics in roadmap order, matcher over their spellings), cached per roadmap."""
+    roadmap_id = get_roadmapsh_id(target_role)
+    if not roadmap_id:
+        return None
+    cached = _vocabularies.get(roadmap_id)
+    if cached and time.monotonic() - cached[0] < VOCAB_TTL_S:
+        return cached[1], cached[2]
+
+    topics = fetch_roadmapsh_topics(target_role, deadline)
+    skills = get_skill_matcher()
+    known = set(skills.display)
+    labels = [t for t in topics if _keep_topic(t, known)]
+    wanted = {normalize_skill(t) for t in labels}
+    # Roadmap labels first so they are the display names; other known spellings of the same skills follow
+    spellings = [n for n in skills.names if normalize_skill(n) in wanted]
+    matcher = SkillMatcher([*labels, *spellings])
+    # Labels the matcher can't match on their own ("Next") drop out of the vocabulary
+    canonical = [c for c in dict.fromkeys(normalize_skill(t) for t in labels) if c in matcher.display]
+    if len(canonical) < MIN_VOCABULARY:
+        return None
+    with _vocab_lock:
+        _vocabularies[roadmap_id] = (time.monotonic(), canonical, matcher)
+    return canonical, matcher
+
+
+def keyword_split(target_role: str, resume_text: str, deadline: Deadline | None = None) -> dict[str, list[str]] | None:
+    """{"present", "missing"} role keywords for the resume, or None without a usable vocabulary."""
+    try:
+        vocabulary = _role_vocabulary(target_role, deadline)
+    except Exception as e:
+        print(f"Keyword vocabulary for {target_role} unavailable: {e}")
+        return None
+    if vocabulary is None:
+        return None
+    canonical, matcher = vocabulary
+    found = set(matcher.canonical_in(resume_text))
+    return {
+        "present": [matcher.display[c] for c in canonical if c in found][:MAX_PRESENT],
+        "missing": [matcher.display[c] for c in canonical if c not in found][:MAX_MISSING],
+    }
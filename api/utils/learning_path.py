@@ -1,6 +1,17 @@
 import json
+import os
+import re
+from functools import lru_cache
+
 import requests
-from api.utils.gemini import call_gemini_with_retry
+from api.utils.deadline import NO_DEADLINE, Deadline
+from api.utils.gemini import PromptTemplate, call_gemini_with_retry, parses_as_json
+from api.utils.shared_cache import shared_cached
+
+# Below this much remaining budget an LLM call cannot finish; serve the static roadmap instead.
+MIN_LLM_BUDGET_S = 3.0
+# roadmap.sh content changes rarely; one worker's fetch serves every worker for this long
+ROADMAPSH_CACHE_TTL_S = 24 * 3600
 
 # Maps common role titles to roadmap.sh roadmap IDs
 # Full list: https://roadmap.sh/roadmaps
@@ -41,6 +52,7 @@ ROADMAP_ID_MAP = {
     "machine learning engineer": "mlops",
     "ml engineer": "mlops",
     "ai engineer": "ai-data-scientist",
+    "ai data scientist": "ai-data-scientist",
     "mlops engineer": "mlops",
     # Mobile
     "android developer": "android",
@@ -49,6 +61,7 @@ ROADMAP_ID_MAP = {
     "flutter developer": "flutter",
     # Other
     "software engineer": "software-design-architecture",
+    "software architect": "software-design-architecture",
     "qa engineer": "qa",
     "cyber security engineer": "cyber-security",
     "cybersecurity engineer": "cyber-security",
@@ -65,6 +78,7 @@ ROADMAPSH_BASE_URL = "https://raw.githubusercontent.com/kamranahmedse/developer-
 ROADMAPSH_RAW_BASE = "https://raw.githubusercontent.com/kamranahmedse/developer-roadmap/master/src/data/roadmaps"
 
 
+@lru_cache(maxsize=1024)
 def get_roadmapsh_id(target_role: str) -> str | None:
     """Maps a target role string to a roadmap.sh roadmap ID."""
     role_lower = target_role.lower().strip()
@@ -81,14 +95,18 @@ def get_roadmapsh_id(target_role: str) -> str | None:
     return None
 
 
-def fetch_roadmapsh_raw(roadmap_id: str) -> dict | None:
+@shared_cached("roadmapsh_raw", ROADMAPSH_CACHE_TTL_S, key=lambda roadmap_id, deadline=None: roadmap_id)
+def fetch_roadmapsh_raw(roadmap_id: str, deadline: Deadline | None = None) -> dict | None:
     """
     Fetches the raw roadmap.sh flowchart JSON (nodes + edges) for a given roadmap ID.
-    Returns {"nodes": [...], "edges": [...]} or None if fetch fails.
+    Returns {"nodes": [...], "edges": [...]} or None if fetch fails or the deadline has passed.
     """
+    deadline = deadline or NO_DEADLINE
+    if deadline.expired():
+        return None
     url = f"{ROADMAPSH_RAW_BASE}/{roadmap_id}/{roadmap_id}.json"
     try:
-        response = requests.get(url, timeout=15)
+        response = requests.get(url, timeout=deadline.timeout(15))
         response.raise_for_status()
         data = response.json()
         nodes = data.get("nodes", [])
@@ -104,20 +122,30 @@ def fetch_roadmapsh_raw(roadmap_id: str) -> dict | None:
         return None
 
 
-def fetch_roadmapsh_topics(target_role: str) -> list:
+@shared_cached(
+    "roadmapsh_topics",
+    ROADMAPSH_CACHE_TTL_S,
+    # Keyed by the resolved roadmap, so every role title that maps to it shares one entry
+    key=lambda target_role, deadline=None: get_roadmapsh_id(target_role),
+    cache_if=bool,
+)
+def fetch_roadmapsh_topics(target_role: str, deadline: Deadline | None = None) -> list:
     """
     Fetches the roadmap.sh JSON for a given role and extracts topic labels.
     Roadmap.sh stores roadmaps as reactflow node/edge graphs on GitHub.
-    Returns a deduplicated list of up to 40 skill/topic names.
+    Returns a deduplicated list of up to 40 skill/topic names ([] once the deadline has passed).
     """
+    deadline = deadline or NO_DEADLINE
     roadmap_id = get_roadmapsh_id(target_role)
     if not roadmap_id:
         print(f"No roadmap.sh ID found for role: {target_role}")
         return []
+    if deadline.expired():
+        return []
 
     url = f"{ROADMAPSH_BASE_URL}/{roadmap_id}.json"
     try:
-        response = requests.get(url, timeout=10)
+        response = requests.get(url, timeout=deadline.timeout(10))
         response.raise_for_status()
         data = response.json()
 
@@ -168,138 +196,198 @@ def fetch_roadmapsh_topics(target_role: str) -> list:
         return []
 
 
-def find_resources(skill: str, target_role: str = None) -> list:
-    """
-    Returns curated high-quality learning links for a given skill.
-    Augmented with a roadmap.sh link when a matching roadmap exists.
-    """
-    resource_map = {
-        "react": [
-            {"title": "Official React Documentation", "url": "https://react.dev/"},
-            {"title": "Kent C. Dodds - Epic React", "url": "https://epicreact.dev/"},
-            {"title": "FreeCodeCamp - React Course", "url": "https://www.youtube.com/watch?v=bMknfKXIFA8"},
-        ],
-        "node": [
-            {"title": "Node.js Documentation", "url": "https://nodejs.org/en/docs/"},
-            {"title": "MDN - Express/Node Tutorial", "url": "https://developer.mozilla.org/en-US/docs/Learn/Server-side/Express_Nodejs"},
-            {"title": "Node.js Best Practices", "url": "https://github.com/goldbergyoni/nodebestpractices"},
-        ],
-        "nodejs": [
-            {"title": "Node.js Documentation", "url": "https://nodejs.org/en/docs/"},
-            {"title": "Node.js Best Practices", "url": "https://github.com/goldbergyoni/nodebestpractices"},
-        ],
-        "python": [
-            {"title": "Official Python Tutorial", "url": "https://docs.python.org/3/tutorial/"},
-            {"title": "Real Python", "url": "https://realpython.com/"},
-            {"title": "Python for Beginners (YouTube)", "url": "https://www.youtube.com/watch?v=_uQrJ0TkZlc"},
-        ],
-        "typescript": [
-            {"title": "TypeScript Handbook", "url": "https://www.typescriptlang.org/docs/handbook/intro.html"},
-            {"title": "Total TypeScript", "url": "https://www.totaltypescript.com/"},
-            {"title": "TypeScript Deep Dive", "url": "https://basarat.gitbook.io/typescript/"},
-        ],
-        "javascript": [
-            {"title": "MDN JavaScript Guide", "url": "https://developer.mozilla.org/en-US/docs/Web/JavaScript/Guide"},
-            {"title": "javascript.info - The Modern JS Tutorial", "url": "https://javascript.info/"},
-            {"title": "Eloquent JavaScript (Free Book)", "url": "https://eloquentjavascript.net/"},
-        ],
-        "docker": [
-            {"title": "Docker Get Started", "url": "https://docs.docker.com/get-started/"},
-            {"title": "Docker Tutorial for Beginners", "url": "https://www.youtube.com/watch?v=pg19Z8LL06w"},
-        ],
-        "kubernetes": [
-            {"title": "Kubernetes Basics", "url": "https://kubernetes.io/docs/tutorials/kubernetes-basics/"},
-            {"title": "Nana - Kubernetes Tutorial", "url": "https://www.youtube.com/watch?v=X48VuDVv0do"},
-        ],
-        "nextjs": [
-            {"title": "Next.js Documentation", "url": "https://nextjs.org/docs"},
-            {"title": "Next.js Learn Course", "url": "https://nextjs.org/learn"},
-        ],
-        "html": [
-            {"title": "MDN HTML Reference", "url": "https://developer.mozilla.org/en-US/docs/Web/HTML"},
-            {"title": "HTML Full Course - freeCodeCamp", "url": "https://www.youtube.com/watch?v=pQN-pnXPaVg"},
-        ],
-        "css": [
-            {"title": "MDN CSS Reference", "url": "https://developer.mozilla.org/en-US/docs/Web/CSS"},
-            {"title": "CSS-Tricks", "url": "https://css-tricks.com/"},
-            {"title": "Flexbox Froggy", "url": "https://flexboxfroggy.com/"},
-        ],
-        "sql": [
-            {"title": "SQLZoo - Interactive SQL", "url": "https://sqlzoo.net/"},
-            {"title": "PostgreSQL Tutorial", "url": "https://www.postgresqltutorial.com/"},
-        ],
-        "postgresql": [
-            {"title": "Official PostgreSQL Docs", "url": "https://www.postgresql.org/docs/"},
-            {"title": "PostgreSQL Tutorial", "url": "https://www.postgresqltutorial.com/"},
-        ],
-        "mongodb": [
-            {"title": "MongoDB University (Free)", "url": "https://learn.mongodb.com/"},
-            {"title": "MongoDB Documentation", "url": "https://www.mongodb.com/docs/"},
-        ],
-        "redis": [
-            {"title": "Redis Documentation", "url": "https://redis.io/docs/"},
-            {"title": "Redis University", "url": "https://university.redis.com/"},
-        ],
-        "aws": [
-            {"title": "AWS Free Tier & Docs", "url": "https://aws.amazon.com/free/"},
-            {"title": "AWS Skill Builder", "url": "https://skillbuilder.aws/"},
-        ],
-        "graphql": [
-            {"title": "GraphQL Official Docs", "url": "https://graphql.org/learn/"},
-            {"title": "How to GraphQL", "url": "https://www.howtographql.com/"},
-        ],
-        "git": [
-            {"title": "Pro Git Book (Free)", "url": "https://git-scm.com/book/en/v2"},
-            {"title": "Learn Git Branching (Interactive)", "url": "https://learngitbranching.js.org/"},
-        ],
-        "system design": [
-            {"title": "System Design Primer", "url": "https://github.com/donnemartin/system-design-primer"},
-            {"title": "Grokking System Design", "url": "https://www.educative.io/courses/grokking-modern-system-design-interview-for-engineers-managers"},
-        ],
-        "machine learning": [
-            {"title": "fast.ai - Practical Deep Learning", "url": "https://course.fast.ai/"},
-            {"title": "Google ML Crash Course", "url": "https://developers.google.com/machine-learning/crash-course"},
-        ],
-        "data structures": [
-            {"title": "Visualgo - Visual Algorithms", "url": "https://visualgo.net/en"},
-            {"title": "NeetCode - DSA Roadmap", "url": "https://neetcode.io/roadmap"},
-        ],
-        "algorithms": [
-            {"title": "NeetCode - DSA Roadmap", "url": "https://neetcode.io/roadmap"},
-            {"title": "LeetCode", "url": "https://leetcode.com/"},
-        ],
+# Curated learning links keyed by canonical skill name. Built once at import; see normalize_skill().
+RESOURCE_CATALOG: dict[str, list[dict]] = {
+    "react": [
+        {"title": "Official React Documentation", "url": "https://react.dev/"},
+        {"title": "Kent C. Dodds - Epic React", "url": "https://epicreact.dev/"},
+        {"title": "FreeCodeCamp - React Course", "url": "https://www.youtube.com/watch?v=bMknfKXIFA8"},
+    ],
+    "node": [
+        {"title": "Node.js Documentation", "url": "https://nodejs.org/en/docs/"},
+        {"title": "MDN - Express/Node Tutorial", "url": "https://developer.mozilla.org/en-US/docs/Learn/Server-side/Express_Nodejs"},
+        {"title": "Node.js Best Practices", "url": "https://github.com/goldbergyoni/nodebestpractices"},
+    ],
+    "nodejs": [
+        {"title": "Node.js Documentation", "url": "https://nodejs.org/en/docs/"},
+        {"title": "Node.js Best Practices", "url": "https://github.com/goldbergyoni/nodebestpractices"},
+    ],
+    "python": [
+        {"title": "Official Python Tutorial", "url": "https://docs.python.org/3/tutorial/"},
+        {"title": "Real Python", "url": "https://realpython.com/"},
+        {"title": "Python for Beginners (YouTube)", "url": "https://www.youtube.com/watch?v=_uQrJ0TkZlc"},
+    ],
+    "typescript": [
+        {"title": "TypeScript Handbook", "url": "https://www.typescriptlang.org/docs/handbook/intro.html"},
+        {"title": "Total TypeScript", "url": "https://www.totaltypescript.com/"},
+        {"title": "TypeScript Deep Dive", "url": "https://basarat.gitbook.io/typescript/"},
+    ],
+    "javascript": [
+        {"title": "MDN JavaScript Guide", "url": "https://developer.mozilla.org/en-US/docs/Web/JavaScript/Guide"},
+        {"title": "javascript.info - The Modern JS Tutorial", "url": "https://javascript.info/"},
+        {"title": "Eloquent JavaScript (Free Book)", "url": "https://eloquentjavascript.net/"},
+    ],
+    "docker": [
+        {"title": "Docker Get Started", "url": "https://docs.docker.com/get-started/"},
+        {"title": "Docker Tutorial for Beginners", "url": "https://www.youtube.com/watch?v=pg19Z8LL06w"},
+    ],
+    "kubernetes": [
+        {"title": "Kubernetes Basics", "url": "https://kubernetes.io/docs/tutorials/kubernetes-basics/"},
+        {"title": "Nana - Kubernetes Tutorial", "url": "https://www.youtube.com/watch?v=X48VuDVv0do"},
+    ],
+    "nextjs": [
+        {"title": "Next.js Documentation", "url": "https://nextjs.org/docs"},
+        {"title": "Next.js Learn Course", "url": "https://nextjs.org/learn"},
+    ],
+    "html": [
+        {"title": "MDN HTML Reference", "url": "https://developer.mozilla.org/en-US/docs/Web/HTML"},
+        {"title": "HTML Full Course - freeCodeCamp", "url": "https://www.youtube.com/watch?v=pQN-pnXPaVg"},
+    ],
+    "css": [
+        {"title": "MDN CSS Reference", "url": "https://developer.mozilla.org/en-US/docs/Web/CSS"},
+        {"title": "CSS-Tricks", "url": "https://css-tricks.com/"},
+        {"title": "Flexbox Froggy", "url": "https://flexboxfroggy.com/"},
+    ],
+    "sql": [
+        {"title": "SQLZoo - Interactive SQL", "url": "https://sqlzoo.net/"},
+        {"title": "PostgreSQL Tutorial", "url": "https://www.postgresqltutorial.com/"},
+    ],
+    "postgresql": [
+        {"title": "Official PostgreSQL Docs", "url": "https://www.postgresql.org/docs/"},
+        {"title": "PostgreSQL Tutorial", "url": "https://www.postgresqltutorial.com/"},
+    ],
+    "mongodb": [
+        {"title": "MongoDB University (Free)", "url": "https://learn.mongodb.com/"},
+        {"title": "MongoDB Documentation", "url": "https://www.mongodb.com/docs/"},
+    ],
+    "redis": [
+        {"title": "Redis Documentation", "url": "https://redis.io/docs/"},
+        {"title": "Redis University", "url": "https://university.redis.com/"},
+    ],
+    "aws": [
+        {"title": "AWS Free Tier & Docs", "url": "https://aws.amazon.com/free/"},
+        {"title": "AWS Skill Builder", "url": "https://skillbuilder.aws/"},
+    ],
+    "graphql": [
+        {"title": "GraphQL Official Docs", "url": "https://graphql.org/learn/"},
+        {"title": "How to GraphQL", "url": "https://www.howtographql.com/"},
+    ],
+    "git": [
+        {"title": "Pro Git Book (Free)", "url": "https://git-scm.com/book/en/v2"},
+        {"title": "Learn Git Branching (Interactive)", "url": "https://learngitbranching.js.org/"},
+    ],
+    "system design": [
+        {"title": "System Design Primer", "url": "https://github.com/donnemartin/system-design-primer"},
+        {"title": "Grokking System Design", "url": "https://www.educative.io/courses/grokking-modern-system-design-interview-for-engineers-managers"},
+    ],
+    "machine learning": [
+        {"title": "fast.ai - Practical Deep Learning", "url": "https://course.fast.ai/"},
+        {"title": "Google ML Crash Course", "url": "https://developers.google.com/machine-learning/crash-course"},
+    ],
+    "data structures": [
+        {"title": "Visualgo - Visual Algorithms", "url": "https://visualgo.net/en"},
+        {"title": "NeetCode - DSA Roadmap", "url": "https://neetcode.io/roadmap"},
+    ],
+    "algorithms": [
+        {"title": "NeetCode - DSA Roadmap", "url": "https://neetcode.io/roadmap"},
+        {"title": "LeetCode", "url": "https://leetcode.com/"},
+    ],
+}
+
+# Common spellings and abbreviations -> RESOURCE_CATALOG key
+SKILL_ALIASES = {
+    "js": "javascript",
+    "es6": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "next": "nextjs",
+    "py": "python",
+    "python3": "python",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "amazon web services": "aws",
+    "html5": "html",
+    "css3": "css",
+    "gql": "graphql",
+    "github": "git",
+    "ml": "machine learning",
+    "dsa": "data structures",
+    "data structures and algorithms": "data structures",
+}
+
+
+def _alias_key(name: str) -> str:
+    """Lowercase and drop separators so "React.js", "react js" and "ReactJS" compare equal."""
+    return re.sub(r"[^a-z0-9+#]", "", name.lower())
+
+
+_SKILL_INDEX: dict[str, str] = {_alias_key(k): k for k in RESOURCE_CATALOG}
+_SKILL_INDEX.update({_alias_key(alias): canonical for alias, canonical in SKILL_ALIASES.items()})
+
+
+@lru_cache(maxsize=4096)
+def normalize_skill(skill: str) -> str:
+    """Canonical skill name: a RESOURCE_CATALOG key when known, else the lowercased, trimmed input."""
+    cleaned = " ".join(skill.lower().split())
+    return _SKILL_INDEX.get(_alias_key(cleaned), cleaned)
+
+
+def _roadmap_resource(target_role: str | None) -> dict | None:
+    if not target_role:
+        return None
+    roadmap_id = get_roadmapsh_id(target_role)
+    if not roadmap_id:
+        return None
+    return {
+        "title": f"Roadmap.sh — Official {target_role} Path",
+        "url": f"https://roadmap.sh/{roadmap_id}",
     }
 
-    skill_lower = skill.lower().strip()
-    resources = list(resource_map.get(skill_lower, []))
 
-    # Roadmap.sh deep link for the role
-    if target_role:
-        roadmap_id = get_roadmapsh_id(target_role)
-        if roadmap_id:
-            roadmap_url = f"https://roadmap.sh/{roadmap_id}"
-            resources.append({
-                "title": f"Roadmap.sh — Official {target_role} Path",
-                "url": roadmap_url,
-            })
-
-    # Generic fallback if we found nothing
+def _resources_for(skill: str, roadmap_link: dict | None) -> list:
+    resources = list(RESOURCE_CATALOG.get(normalize_skill(skill), []))
     if not resources:
+        # Generic fallback if we found nothing
         resources = [
             {"title": f"Search '{skill}' on MDN", "url": f"https://developer.mozilla.org/en-US/search?q={skill}"},
             {"title": f"{skill} on freeCodeCamp", "url": f"https://www.freecodecamp.org/news/search/?query={skill}"},
         ]
-        if target_role:
-            roadmap_id = get_roadmapsh_id(target_role)
-            if roadmap_id:
-                resources.append({
-                    "title": f"Roadmap.sh — Official {target_role} Path",
-                    "url": f"https://roadmap.sh/{roadmap_id}",
-                })
-
+    # Roadmap.sh deep link for the role
+    if roadmap_link:
+        resources.append(roadmap_link)
     return resources
 
 
+def find_resources(skill: str, target_role: str = None) -> list:
+    """
+    Returns curated high-quality learning links for a given skill.
+    Augmented with a roadmap.sh link when a matching roadmap exists.
+    """
+    return _resources_for(skill, _roadmap_resource(target_role))
+
+
+def find_resources_batch(skills: list, target_role: str = None) -> dict[str, list]:
+    """
+    Resources for every skill in one pass: the role is resolved to its roadmap.sh link once and
+    skills that normalize to the same catalog entry share one lookup.
+    """
+    roadmap_link = _roadmap_resource(target_role)
+    by_canonical: dict[str, list] = {}
+    out: dict[str, list] = {}
+    for skill in skills:
+        key = normalize_skill(skill)
+        if key not in RESOURCE_CATALOG:
+            out[skill] = _resources_for(skill, roadmap_link)
+            continue
+        if key not in by_canonical:
+            by_canonical[key] = _resources_for(skill, roadmap_link)
+        out[skill] = list(by_canonical[key])
+    return out
+
+
 # Fallback roadmaps when Gemini fails (rate limit, etc.)
 FALLBACK_ROADMAPS: dict[str, list[dict]] = {
     "frontend": [
@@ -358,27 +446,22 @@ def _get_fallback_roadmap(target_role: str) -> list:
     return get_roadmap_for_role(target_role)
 
 
-def generate_roadmap(target_role: str, missing_skills: list) -> list:
-    """
-    Uses Gemini to create a structured 30-day learning path.
-    Injects roadmap.sh topic data as structured context to ground the output.
-    """
-    # Fetch authoritative topic list from roadmap.sh
-    roadmapsh_topics = fetch_roadmapsh_topics(target_role)
+def _degraded_roadmap(target_role: str, missing_skills: list, known_skills: list | None, deadline: Deadline) -> list:
+    """Roadmap without Gemini: the roadmap.sh prerequisite builder (in "llm" engine mode), else the static roadmap."""
+    from api.utils.roadmap_builder import ROADMAP_ENGINE, build_prerequisite_roadmap
 
-    roadmap_context = ""
-    if roadmapsh_topics:
-        roadmap_context = f"""
-    Reference Curriculum (from roadmap.sh for {target_role}):
-    These are the industry-standard topics for this role — use them to ensure the milestones are
-    comprehensive and correctly sequenced, but focus the content on the user's specific missing skills:
-    {', '.join(roadmapsh_topics)}
-    """
+    if ROADMAP_ENGINE == "llm":
+        roadmap = build_prerequisite_roadmap(target_role, missing_skills, known_skills, deadline)
+        if roadmap:
+            return roadmap
+    return _get_fallback_roadmap(target_role)
 
-    prompt = f"""
-    Create a highly personalized 30-day learning roadmap for someone aiming to become a {target_role}.
-    Their missing skills are: {', '.join(missing_skills)}
-    {roadmap_context}
+
+# Static requirements first so Gemini can serve them from its context cache (gemini.py)
+ROADMAP_PROMPT = PromptTemplate(
+    "roadmap",
+    """
+    Create a highly personalized 30-day learning roadmap for the learner described at the end.
 
     Requirements:
     1. The roadmap must be progressive (fundamentals BEFORE advanced topics).
@@ -386,23 +469,79 @@ def generate_roadmap(target_role: str, missing_skills: list) -> list:
     3. Each milestone should directly address one or more of the missing skills.
     4. Return ONLY a JSON array with the following structure:
        [
-         {{
+         {
            "title": "Week 1: Foundations of X",
            "description": "Short description of what to learn and why.",
            "difficulty": "Beginner" | "Intermediate" | "Advanced"
-         }}
+         }
        ]
 
     Return ONLY the JSON array, no markdown, no extra text.
+    """,
+    """
+    Target role: {target_role}
+    Their missing skills are: {missing_skills}
+    {roadmap_context}
+    """,
+)
+
+
+def _roadmap_context(target_role: str, roadmapsh_topics: list) -> str:
+    if not roadmapsh_topics:
+        return ""
+    return f"""
+    Reference Curriculum (from roadmap.sh for {target_role}):
+    These are the industry-standard topics for this role — use them to ensure the milestones are
+    comprehensive and correctly sequenced, but focus the content on the user's specific missing skills:
+    {', '.join(roadmapsh_topics)}
+    """
+
+
+def generate_roadmap(
+    target_role: str,
+    missing_skills: list,
+    deadline: Deadline | None = None,
+    known_skills: list | None = None,
+) -> list:
+    """
+    Builds a 4-week learning path. With ROADMAP_ENGINE=graph (default) the deterministic roadmap.sh
+    prerequisite builder is used and Gemini is only asked when it can't place the skills; otherwise
+    Gemini creates the path, grounded with roadmap.sh topic data.
+    Degrades to the non-LLM roadmap when Gemini fails or the request deadline can't fit an LLM call.
     """
+    from api.utils.roadmap_builder import ROADMAP_ENGINE, build_prerequisite_roadmap
+
+    deadline = deadline or NO_DEADLINE
+    if ROADMAP_ENGINE == "graph":
+        roadmap = build_prerequisite_roadmap(target_role, missing_skills, known_skills, deadline)
+        if roadmap:
+            return roadmap
+
+    if deadline.remaining() < MIN_LLM_BUDGET_S:
+        print("Roadmap: request budget too low for Gemini, using fallback roadmap")
+        return _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
+
+    # Fetch authoritative topic list from roadmap.sh (bounded so the LLM call keeps its share)
+    roadmapsh_topics = fetch_roadmapsh_topics(target_role, deadline)
+    if deadline.remaining() < MIN_LLM_BUDGET_S:
+        print("Roadmap: request budget spent on roadmap.sh, using fallback roadmap")
+        return _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
+
+    prompt = ROADMAP_PROMPT.render(
+        target_role=target_role,
+        missing_skills=', '.join(missing_skills),
+        roadmap_context=_roadmap_context(target_role, roadmapsh_topics),
+    )
 
     try:
-        content = call_gemini_with_retry(prompt)
+        content = call_gemini_with_retry(
+            prompt, deadline=deadline, validate=parses_as_json, caller="learning_path.generate_roadmap"
+        )
 
         # Handle error dict from call_gemini_with_retry
         if isinstance(content, dict) and "error" in content:
             print(f"Roadmap Gemini error: {content.get('error')}")
-            return _get_fallback_roadmap(target_role)
+            return _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
 
         # Strip markdown code fences if present
         if isinstance(content, str):
@@ -413,16 +552,56 @@ def generate_roadmap(target_role: str, missing_skills: list) -> list:
             result = json.loads(content.strip())
             if isinstance(result, list) and len(result) > 0:
                 return result
-        return _get_fallback_roadmap(target_role)
+        return _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
     except Exception as e:
         print(f"Roadmap generation error: {e}")
-        return _get_fallback_roadmap(target_role)
+        return _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
 
 
-def generate_capstone_project(missing_skills: list) -> dict | None:
+def _stored_capstone(missing_skills: list) -> dict | None:
+    """A stored capstone generated for a similar enough skill set (capstone_store.py), if any."""
+    from api.utils.capstone_store import get_capstone_store
+    from api.utils.llm_usage import record_cache_hit
+
+    store = get_capstone_store()
+    if not store:
+        return None
+    try:
+        reused = store.find(missing_skills)
+    except Exception as e:
+        print(f"Capstone store read failed: {e}")
+        return None
+    if reused is None:
+        return None
+    print(f"Capstone: reusing stored project (similarity {reused[1]:.2f})")
+    record_cache_hit("learning_path.generate_capstone_project")
+    return reused[0]
+
+
+def _store_capstone(missing_skills: list, capstone: dict) -> None:
+    from api.utils.capstone_store import get_capstone_store
+
+    store = get_capstone_store()
+    if store:
+        try:
+            store.put(missing_skills, capstone)
+        except Exception as e:
+            print(f"Capstone store write failed: {e}")
+
+
+def generate_capstone_project(missing_skills: list, deadline: Deadline | None = None) -> dict | None:
     """
     Suggests a complex capstone project that combines multiple missing skills.
+    Reuses a stored capstone generated for a similar enough skill set (capstone_store.py).
+    Returns None (no capstone) when the request deadline can't fit an LLM call.
     """
+    deadline = deadline or NO_DEADLINE
+    reused = _stored_capstone(missing_skills)
+    if reused is not None:
+        return reused
+    if deadline.remaining() < MIN_LLM_BUDGET_S:
+        print("Capstone: request budget too low for Gemini, skipping")
+        return None
     prompt = f"""
     Suggest a single, complex capstone project idea that helps a student practice these missing skills: {', '.join(missing_skills)}.
     The project should be a meaningful portfolio piece.
@@ -439,14 +618,150 @@ def generate_capstone_project(missing_skills: list) -> dict | None:
     """
 
     try:
-        content = call_gemini_with_retry(prompt)
+        content = call_gemini_with_retry(
+            prompt, deadline=deadline, validate=parses_as_json, caller="learning_path.generate_capstone_project"
+        )
 
         if "```json" in content:
             content = content.split("```json", 1)[1].split("```", 1)[0]
         elif "```" in content:
             content = content.split("```", 1)[1].split("```", 1)[0]
 
-        return json.loads(content.strip())
+        capstone = json.loads(content.strip())
     except Exception as e:
         print(f"Capstone generation error: {e}")
         return None
+    if isinstance(capstone, dict):
+        _store_capstone(missing_skills, capstone)
+    return capstone
+
+
+# Roadmap and capstone in one Gemini call when both need the LLM (generate_learning_path); "0" makes
+# two separate calls as generate_roadmap and generate_capstone_project do
+COMBINED_GENERATION = os.getenv("LEARNING_PATH_COMBINED", "1") != "0"
+
+LEARNING_PATH_PROMPT = PromptTemplate(
+    "learning-path",
+    """
+    Create a learning path for the learner described at the end: a 30-day roadmap and one capstone project.
+
+    Roadmap requirements:
+    1. The roadmap must be progressive (fundamentals BEFORE advanced topics).
+    2. Divide it into exactly 4 weekly milestones (Week 1–4).
+    3. Each milestone should directly address one or more of the missing skills.
+
+    Capstone requirements: a single, complex project idea that practices several of the missing
+    skills together and makes a meaningful portfolio piece.
+
+    Return ONLY a JSON object with the following structure:
+    {
+      "roadmap": [
+        {
+          "title": "Week 1: Foundations of X",
+          "description": "Short description of what to learn and why.",
+          "difficulty": "Beginner" | "Intermediate" | "Advanced"
+        }
+      ],
+      "capstone": {
+        "title": "Project Title",
+        "description": "Detailed description of the project.",
+        "technologies": ["list", "of", "technologies"],
+        "learning_outcomes": ["point 1", "point 2"]
+      }
+    }
+
+    Return ONLY the JSON object, no markdown, no extra text.
+    """,
+    """
+    Target role: {target_role}
+    Their missing skills are: {missing_skills}
+    {roadmap_context}
+    """,
+)
+
+
+def _valid_roadmap(roadmap) -> bool:
+    return isinstance(roadmap, list) and bool(roadmap) and all(
+        isinstance(m, dict) and isinstance(m.get("title"), str) and m["title"].strip() for m in roadmap
+    )
+
+
+def _valid_capstone(capstone) -> bool:
+    return isinstance(capstone, dict) and isinstance(capstone.get("title"), str) and bool(capstone["title"].strip())
+
+
+def _generate_combined(
+    target_role: str, missing_skills: list, deadline: Deadline, known_skills: list | None
+) -> dict:
+    """One Gemini call for both parts; each part that fails validation falls back on its own."""
+    roadmapsh_topics = fetch_roadmapsh_topics(target_role, deadline)
+    parsed = {}
+    if deadline.remaining() < MIN_LLM_BUDGET_S:
+        print("Learning path: request budget spent on roadmap.sh, using fallback roadmap")
+    else:
+        prompt = LEARNING_PATH_PROMPT.render(
+            target_role=target_role,
+            missing_skills=', '.join(missing_skills),
+            roadmap_context=_roadmap_context(target_role, roadmapsh_topics),
+        )
+        try:
+            content = call_gemini_with_retry(
+                prompt, deadline=deadline, validate=parses_as_json, caller="learning_path._generate_combined"
+            )
+            if isinstance(content, dict) and "error" in content:
+                print(f"Learning path Gemini error: {content.get('error')}")
+            else:
+                if "```json" in content:
+                    content = content.split("```json", 1)[1].split("```", 1)[0]
+                elif "```" in content:
+                    content = content.split("```", 1)[1].split("```", 1)[0]
+                parsed = json.loads(content.strip())
+                if not isinstance(parsed, dict):
+                    parsed = {}
+        except Exception as e:
+            print(f"Learning path generation error: {e}")
+
+    roadmap, capstone = parsed.get("roadmap"), parsed.get("capstone")
+    if not _valid_roadmap(roadmap):
+        if parsed:
+            print("Learning path: roadmap part invalid, using fallback roadmap")
+        roadmap = _degraded_roadmap(target_role, missing_skills, known_skills, deadline)
+    if _valid_capstone(capstone):
+        _store_capstone(missing_skills, capstone)
+    else:
+        if parsed:
+            print("Learning path: capstone part invalid, skipping capstone")
+        capstone = None
+    return {"roadmap": roadmap, "capstone": capstone}
+
+
+def generate_learning_path(
+    target_role: str,
+    missing_skills: list,
+    deadline: Deadline | None = None,
+    known_skills: list | None = None,
+) -> dict:
+    """
+    {"roadmap", "capstone"} for /api/learning-path. A roadmap the prerequisite builder can place and a
+    stored capstone need no LLM; when both parts need Gemini they are asked for in one call
+    (COMBINED_GENERATION), with the same per-part fallbacks as generate_roadmap and
+    generate_capstone_project.
+    """
+    from api.utils.roadmap_builder import ROADMAP_ENGINE, build_prerequisite_roadmap
+
+    deadline = deadline or NO_DEADLINE
+    capstone = _stored_capstone(missing_skills)
+    if not COMBINED_GENERATION or capstone is not None:
+        roadmap = generate_roadmap(target_role, missing_skills, deadline, known_skills=known_skills)
+        if capstone is None:
+            capstone = generate_capstone_project(missing_skills, deadline)
+        return {"roadmap": roadmap, "capstone": capstone}
+
+    if ROADMAP_ENGINE == "graph":
+        roadmap = build_prerequisite_roadmap(target_role, missing_skills, known_skills, deadline)
+        if roadmap:
+            return {"roadmap": roadmap, "capstone": generate_capstone_project(missing_skills, deadline)}
+    if deadline.remaining() < MIN_LLM_BUDGET_S:
+        print("Learning path: request budget too low for Gemini, using fallback roadmap")
+        return {"roadmap": _degraded_roadmap(target_role, missing_skills, known_skills, deadline), "capstone": None}
+    return _generate_combined(target_role, missing_skills, deadline, known_skills)
@@ -0,0 +1,132 @@
+"""
+Shared cache of generated learning paths (roadmap + capstone), filled on demand by /api/learning-path
+and ahead of time by the prefetch worker (prefetch.py).
+
+Entries are keyed by the target role and the alias-folded missing / known skill sets, so users with the
+same gap share one entry, and live in SQLite so every worker process (and the prefetch CLI) sees them.
+Only complete results are stored: a path whose capstone was skipped for lack of budget is regenerated
+next time. Set LEARNING_PATH_CACHE_PATH to move the database, or to an empty string to disable it.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any
+
+from api.utils.deadline import Deadline
+from api.utils.learning_path import generate_learning_path, normalize_skill
+from api.utils.llm_usage import record_cache_hit
+
+TTL_S = float(os.getenv("LEARNING_PATH_CACHE_SECONDS", str(7 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS learning_paths (
+    key TEXT PRIMARY KEY,
+    target_role TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_learning_paths_created ON learning_paths(created_at);
+"""
+
+
+def learning_path_key(target_role: str, missing_skills: list, known_skills: list | None = None) -> str:
+    from api.utils.roadmap_builder import MIN_PLACED_SHARE, ROADMAP_ENGINE
+
+    parts = [
+        " ".join((target_role or "").lower().split()),
+        sorted({normalize_skill(str(s)) for s in missing_skills or [] if str(s).strip()}),
+        sorted({normalize_skill(str(s)) for s in known_skills or [] if str(s).strip()}),
+        ROADMAP_ENGINE,
+        MIN_PLACED_SHARE,
+    ]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+class LearningPathCache:
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+    def get(self, key: str, max_age_s: float = TTL_S) -> dict[str, Any] | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM learning_paths WHERE key = ? AND created_at >= ?", (key, time.time() - max_age_s)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, target_role: str, value: dict[str, Any]) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO learning_paths (key, target_role, value, created_at) VALUES (?, ?, ?, ?)",
+                    (key, target_role, json.dumps(value), now),
+                )
+                conn.execute("DELETE FROM learning_paths WHERE created_at < ?", (now - TTL_S,))
+        finally:
+            conn.close()
+
+
+_cache: LearningPathCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_learning_path_cache() -> LearningPathCache | None:
+    """Process-wide cache, or None when disabled with an empty LEARNING_PATH_CACHE_PATH."""
+    global _cache
+    path = os.getenv("LEARNING_PATH_CACHE_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "skillsphere_learning_paths.sqlite3")
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = LearningPathCache(path)
+    return _cache
+
+
+def get_or_build_learning_path(
+    target_role: str, missing_skills: list, known_skills: list | None = None, deadline: Deadline | None = None
+) -> tuple[dict[str, Any], bool]:
+    """Returns ({"roadmap", "capstone"}, cache_hit), generating and storing the path on a miss."""
+    cache = get_learning_path_cache()
+    key = learning_path_key(target_role, missing_skills, known_skills)
+    if cache:
+        try:
+            hit = cache.get(key)
+            if hit is not None:
+                record_cache_hit("learning_path_cache.get_or_build_learning_path")
+                return hit, True
+        except Exception as e:
+            print(f"Learning path cache read failed: {e}")
+
+    value = generate_learning_path(target_role, missing_skills, deadline, known_skills=known_skills)
+    roadmap, capstone = value["roadmap"], value["capstone"]
+    if not isinstance(roadmap, list):
+        print(f"Warning: roadmap is not a list: {roadmap}")
+        value["roadmap"] = roadmap = []
+    if cache and roadmap and capstone is not None:
+        try:
+            cache.put(key, target_role, value)
+        except Exception as e:
+            print(f"Learning path cache write failed: {e}")
+    return value, False
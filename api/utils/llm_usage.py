@@ -0,0 +1,399 @@
+"""
+Ledger of every Gemini call, with per-route and per-user daily token budgets.
+
+call_gemini_with_retry records one row per call: the route and user it ran for, the calling
+function its call site names with caller= (which identifies the prompt template), prompt / response /
+cached token counts from the response's usage_metadata (cached = input tokens Gemini served from its
+prefix cache, i.e. saved), latency, the key used (last 4 characters), 429 retries, and the outcome.
+Callers that answer from a cache instead of calling Gemini record a cache_hit row. Prompt text is
+never stored, since most prompts embed resume text.
+
+Rows are appended to an in-memory batch and written to SQLite by a background thread every
+LLM_USAGE_FLUSH_SECONDS (or as soon as FLUSH_BATCH rows are waiting), so recording never blocks a
+request on disk. The route and user come from context variables set per request by the API's
+before_request hook (usage_context() for work outside a request, like the prefetch worker).
+
+Budgets are daily (UTC) token totals across all worker processes:
+
+    LLM_ROUTE_DAILY_TOKENS="/api/career-assessment=2000000,*=5000000"   # per route, * = any other route
+    LLM_USER_DAILY_TOKENS=200000                                        # per user, 0 = unlimited
+
+Once a route or user is over budget, the wrapper answers with an error dict of type "budget" instead
+of calling Gemini. The background thread re-reads the totals from the ledger every BUDGET_REFRESH_S
+once budgets are in use, so a budget check never touches the disk and other processes' usage counts
+within that delay.
+
+    python -m api.utils.llm_usage [--days 1] [--top 10]
+
+prints usage per route and user and the most expensive prompts. Set LLM_USAGE_LEDGER_PATH to move
+the database, or to an empty string to disable the ledger (and budgets).
+"""
+import argparse
+import atexit
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+FLUSH_INTERVAL_S = float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "5"))
+RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "30"))
+USER_DAILY_TOKENS = int(os.getenv("LLM_USER_DAILY_TOKENS", "0"))
+FLUSH_BATCH = 200
+MAX_PENDING = 10000
+BUDGET_REFRESH_S = 30.0
+_PRUNE_INTERVAL_S = 3600.0
+
+_COLUMNS = (
+    "ts", "day", "route", "user_key", "caller", "model", "prompt_chars", "prompt_tokens",
+    "response_tokens", "cached_tokens", "total_tokens", "latency_ms", "key_suffix", "retries",
+    "cache_hit", "status",
+)
+
+_DEFAULTS = {c: 0 for c in _COLUMNS if c not in ("route", "user_key", "caller", "model", "key_suffix", "status")}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    route TEXT NOT NULL,
+    user_key TEXT,
+    caller TEXT NOT NULL,
+    model TEXT,
+    prompt_chars INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    response_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms INTEGER NOT NULL DEFAULT 0,
+    key_suffix TEXT,
+    retries INTEGER NOT NULL DEFAULT 0,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_day_route ON llm_calls(day, route);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_day_user ON llm_calls(day, user_key);
+"""
+
+_route: ContextVar[str] = ContextVar("llm_usage_route", default="background")
+_user: ContextVar[str | None] = ContextVar("llm_usage_user", default=None)
+
+
+def _parse_route_budgets(raw: str) -> dict[str, int]:
+    budgets = {}
+    for part in raw.split(","):
+        route, _, limit = part.strip().rpartition("=")
+        if route and limit.strip().isdigit():
+            budgets[route.strip()] = int(limit)
+    return budgets
+
+
+ROUTE_DAILY_TOKENS = _parse_route_budgets(os.getenv("LLM_ROUTE_DAILY_TOKENS", ""))
+
+
+def set_usage_context(route: str, user: str | None = None) -> None:
+    """Tags the Gemini calls made from here on in the current context (the API sets this per request)."""
+    _route.set(route)
+    _user.set(user)
+
+
+@contextmanager
+def usage_context(route: str, user: str | None = None) -> Iterator[None]:
+    route_token, user_token = _route.set(route), _user.set(user)
+    try:
+        yield
+    finally:
+        _route.reset(route_token)
+        _user.reset(user_token)
+
+
+def current_usage_context() -> tuple[str, str | None]:
+    return _route.get(), _user.get()
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def seconds_until_reset() -> float:
+    """Seconds until the daily budgets start over (midnight UTC)."""
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class UsageLedger:
+    def __init__(self, path: str, flush_interval_s: float = FLUSH_INTERVAL_S):
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self._init_lock = threading.Lock()
+        self._ready = False
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        self._wake = threading.Event()
+        self._flusher: threading.Thread | None = None
+        self._flush_lock = threading.Lock()
+        self._last_prune = 0.0
+        # Today's token totals by ("route", r) / ("user", u): the ledger's as of the last refresh plus
+        # what this process has recorded since
+        self._totals: dict[tuple[str, str], int] = {}
+        self._totals_day = ""
+        self._totals_loaded = 0.0
+        self._totals_wanted = False  # set by the first budget check; until then totals aren't kept
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+    def record(self, **call: Any) -> None:
+        now = time.time()
+        day = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        route, user = current_usage_context()
+        call = {"ts": now, "day": day, "route": route, "user_key": user, **call}
+        row = tuple(call.get(c) if call.get(c) is not None else _DEFAULTS.get(c) for c in _COLUMNS)
+        tokens = call.get("total_tokens") or 0
+        with self._lock:
+            if len(self._pending) >= MAX_PENDING:
+                del self._pending[: len(self._pending) - MAX_PENDING + 1]  # the ledger is behind; drop the oldest
+            self._pending.append(row)
+            if tokens and self._totals_day == day:
+                self._totals[("route", route)] = self._totals.get(("route", route), 0) + tokens
+                if user:
+                    self._totals[("user", user)] = self._totals.get(("user", user), 0) + tokens
+            full = len(self._pending) >= FLUSH_BATCH
+            self._start_flusher()
+        if full:
+            self._wake.set()
+
+    def _start_flusher(self) -> None:
+        # Called with self._lock held
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name="llm-usage-flush", daemon=True)
+            self._flusher.start()
+
+    def _totals_stale(self) -> bool:
+        return self._totals_day != _today() or time.monotonic() - self._totals_loaded > BUDGET_REFRESH_S
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            try:
+                if self._totals_wanted and self._totals_stale():
+                    self._refresh_totals()
+                else:
+                    self.flush()
+            except Exception as e:
+                print(f"LLM usage ledger flush failed: {e}")
+
+    def flush(self) -> int:
+        """Writes the pending batch; returns how many rows were written."""
+        with self._flush_lock:
+            return self._write_pending()
+
+    def _write_pending(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO llm_calls ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    batch,
+                )
+                if time.time() - self._last_prune > _PRUNE_INTERVAL_S:
+                    cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).strftime("%Y-%m-%d")
+                    conn.execute("DELETE FROM llm_calls WHERE day < ?", (cutoff,))
+                    self._last_prune = time.time()
+        except Exception:
+            with self._lock:
+                self._pending[:0] = batch  # retry with the next flush
+            raise
+        finally:
+            conn.close()
+        return len(batch)
+
+    def _refresh_totals(self) -> None:
+        # Holding the flush lock keeps every row either in the ledger or pending while totals are read
+        with self._flush_lock:
+            self._write_pending()
+            self._read_totals()
+
+    def _read_totals(self) -> None:
+        day = _today()
+        conn = self._connect()
+        try:
+            by_route = conn.execute(
+                "SELECT route, SUM(total_tokens) FROM llm_calls WHERE day = ? GROUP BY route", (day,)
+            ).fetchall()
+            by_user = conn.execute(
+                "SELECT user_key, SUM(total_tokens) FROM llm_calls WHERE day = ? AND user_key IS NOT NULL "
+                "GROUP BY user_key",
+                (day,),
+            ).fetchall()
+        finally:
+            conn.close()
+        totals = {("route", r): n for r, n in by_route}
+        totals.update({("user", u): n for u, n in by_user})
+        with self._lock:
+            # Rows recorded since the write are still pending; count them too
+            for row in self._pending:
+                call = dict(zip(_COLUMNS, row))
+                if call["day"] == day and call["total_tokens"]:
+                    totals[("route", call["route"])] = totals.get(("route", call["route"]), 0) + call["total_tokens"]
+                    if call["user_key"]:
+                        key = ("user", call["user_key"])
+                        totals[key] = totals.get(key, 0) + call["total_tokens"]
+            self._totals, self._totals_day, self._totals_loaded = totals, day, time.monotonic()
+
+    def spent_today(self, route: str, user: str | None) -> tuple[int, int]:
+        """
+        (tokens spent today by route, by user) across all processes, up to BUDGET_REFRESH_S stale. Never
+        reads the ledger itself: stale totals are refreshed by the background thread, and until the
+        first refresh after startup or midnight nothing counts as spent.
+        """
+        with self._lock:
+            self._totals_wanted = True
+            self._start_flusher()
+            current = self._totals_day == _today()
+            spent = (self._totals.get(("route", route), 0), self._totals.get(("user", user), 0) if user else 0)
+        if not current:
+            self._wake.set()  # first check today: refresh now rather than at the next flush interval
+            return 0, 0
+        return spent
+
+    def report(self, days: int = 1, top: int = 10) -> dict[str, Any]:
+        self.flush()
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        totals = """
+            COUNT(*) FILTER (WHERE NOT cache_hit) AS calls,
+            SUM(cache_hit) AS cache_hits,
+            SUM(prompt_tokens) AS prompt_tokens,
+            SUM(response_tokens) AS response_tokens,
+            SUM(cached_tokens) AS cached_tokens,
+            SUM(total_tokens) AS total_tokens,
+            CAST(AVG(latency_ms) FILTER (WHERE NOT cache_hit) AS INTEGER) AS avg_latency_ms,
+            SUM(retries) AS retries,
+            COUNT(*) FILTER (WHERE status NOT IN ('ok', 'cache_hit')) AS failures
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            def grouped(column: str, limit: int | None = None) -> list[dict[str, Any]]:
+                rows = conn.execute(
+                    f"SELECT {column}, {totals} FROM llm_calls WHERE day >= ? AND {column} IS NOT NULL "
+                    f"GROUP BY {column} ORDER BY total_tokens DESC" + (" LIMIT ?" if limit else ""),
+                    (since, limit) if limit else (since,),
+                ).fetchall()
+                return [dict(r) for r in rows]
+
+            prompts = conn.execute(
+                """
+                SELECT caller, COUNT(*) AS calls, SUM(total_tokens) AS total_tokens,
+                       CAST(AVG(prompt_tokens) AS INTEGER) AS avg_prompt_tokens,
+                       CAST(AVG(response_tokens) AS INTEGER) AS avg_response_tokens,
+                       SUM(cached_tokens) AS cached_tokens, MAX(total_tokens) AS max_tokens,
+                       CAST(AVG(latency_ms) AS INTEGER) AS avg_latency_ms
+                FROM llm_calls WHERE day >= ? AND NOT cache_hit
+                GROUP BY caller ORDER BY total_tokens DESC LIMIT ?
+                """,
+                (since, top),
+            ).fetchall()
+            return {
+                "since": since,
+                "by_route": grouped("route"),
+                "by_user": grouped("user_key", top),
+                "top_prompts": [dict(r) for r in prompts],
+            }
+        finally:
+            conn.close()
+
+
+_ledger: UsageLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger | None:
+    """Process-wide ledger, or None when disabled with an empty LLM_USAGE_LEDGER_PATH."""
+    global _ledger
+    path = os.getenv("LLM_USAGE_LEDGER_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "skillsphere_llm_usage.sqlite3")
+    if not path:
+        return None
+    with _ledger_lock:
+        if _ledger is None or _ledger.path != path:
+            _ledger = UsageLedger(path)
+            atexit.register(_ledger.flush)
+    return _ledger
+
+
+def record_cache_hit(caller: str) -> None:
+    """Notes a Gemini call that a cache answered instead."""
+    ledger = get_usage_ledger()
+    if ledger:
+        ledger.record(caller=caller, cache_hit=1, status="cache_hit")
+
+
+def budget_error() -> str | None:
+    """Why the current route / user may not call Gemini now, or None while both are within budget."""
+    ledger = get_usage_ledger()
+    route, user = current_usage_context()
+    route_limit = ROUTE_DAILY_TOKENS.get(route, ROUTE_DAILY_TOKENS.get("*", 0))
+    if not ledger or not (route_limit or (user and USER_DAILY_TOKENS)):
+        return None
+    try:
+        route_spent, user_spent = ledger.spent_today(route, user)
+    except Exception as e:
+        print(f"LLM usage ledger unavailable, not enforcing budgets: {e}")
+        return None
+    if route_limit and route_spent >= route_limit:
+        return "Daily AI usage limit reached for this feature. Please try again tomorrow."
+    if user and USER_DAILY_TOKENS and user_spent >= USER_DAILY_TOKENS:
+        return "You've reached today's AI usage limit. Please try again tomorrow."
+    return None
+
+
+def _print_table(title: str, rows: list[dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    if not rows:
+        print("  (none)")
+        return
+    columns = list(rows[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  " + "  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report Gemini usage from the LLM usage ledger.")
+    parser.add_argument("--days", type=int, default=1, help="days to cover, including today")
+    parser.add_argument("--top", type=int, default=10, help="users and prompts to list")
+    args = parser.parse_args()
+
+    ledger = get_usage_ledger()
+    if not ledger:
+        raise SystemExit("LLM usage ledger disabled (LLM_USAGE_LEDGER_PATH is empty)")
+    report = ledger.report(args.days, args.top)
+    print(f"Gemini usage since {report['since']} (UTC)")
+    _print_table("By route", report["by_route"])
+    _print_table(f"Top {args.top} users", report["by_user"])
+    _print_table(f"Top {args.top} prompts (by calling function)", report["top_prompts"])
+
+
+if __name__ == "__main__":
+    main()
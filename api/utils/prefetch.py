@@ -0,0 +1,192 @@
+"""
+Background prefetch of learning paths and job openings, so a dashboard's first load is a cache hit.
+
+Each cycle the worker picks up user_assessments rows created since its last cycle and precomputes
+their learning path (roadmap + capstone, into learning_path_cache) and job listings for their target
+role (a live crew run, recorded in the job store that "auto" mode answers from). It then tops up the
+job store for the most assessed roles.
+
+Prefetching must only use spare capacity: each cycle spends at most PREFETCH_MAX_LLM_CALLS Gemini
+calls and PREFETCH_MAX_SEARCHES role searches, spaces them PREFETCH_MIN_INTERVAL_SECONDS apart,
+stays away from providers whose circuit is open, and (when running inside the web process) backs off
+while user requests hold more than PREFETCH_MAX_SLOT_SHARE of the admission slots.
+
+    python -m api.utils.prefetch [--once] [--interval 120]
+
+or set PREFETCH_IN_PROCESS=1 to run it as a daemon thread of the API process.
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from api.utils.deadline import Deadline
+
+INTERVAL_S = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "120"))
+MAX_LLM_CALLS = int(os.getenv("PREFETCH_MAX_LLM_CALLS", "20"))
+MAX_SEARCHES = int(os.getenv("PREFETCH_MAX_SEARCHES", "6"))
+MIN_INTERVAL_S = float(os.getenv("PREFETCH_MIN_INTERVAL_SECONDS", "2"))
+MAX_SLOT_SHARE = float(os.getenv("PREFETCH_MAX_SLOT_SHARE", "0.5"))
+POPULAR_ROLES = int(os.getenv("PREFETCH_POPULAR_ROLES", "10"))
+LOOKBACK_S = float(os.getenv("PREFETCH_LOOKBACK_SECONDS", "3600"))
+TASK_BUDGET_S = 60.0
+
+
+class PrefetchBudget:
+    """Per-cycle allowance of Gemini calls and role searches, spent at a bounded pace."""
+
+    def __init__(self, llm_calls: int = MAX_LLM_CALLS, searches: int = MAX_SEARCHES):
+        self.llm_calls = llm_calls
+        self.searches = searches
+        self._last_spend = 0.0
+
+    def spend(self, llm_calls: int = 0, searches: int = 0) -> bool:
+        if llm_calls > self.llm_calls or searches > self.searches or not _has_spare_capacity():
+            return False
+        wait = self._last_spend + MIN_INTERVAL_S - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.llm_calls -= llm_calls
+        self.searches -= searches
+        self._last_spend = time.monotonic()
+        return True
+
+
+def _has_spare_capacity() -> bool:
+    """False while user requests hold most admission slots or every search provider's circuit is open."""
+    from api.utils import admission
+    from api.utils.job_search_serp import search_router
+
+    controller = admission._controller  # only exists when user traffic runs in this process
+    if controller is not None:
+        snap = controller.snapshot()
+        if snap["queued"] or snap["in_flight"] >= snap["capacity"] * MAX_SLOT_SHARE:
+            return False
+    circuits = [p.health.snapshot()["circuit"] for p in search_router.providers if p.configured()]
+    return not circuits or "closed" in circuits
+
+
+class PrefetchWorker:
+    def __init__(self, storage: Any):
+        self.storage = storage
+        since = datetime.now(timezone.utc) - timedelta(seconds=LOOKBACK_S)
+        self.watermark = since.isoformat()
+        self.prefetched_paths = 0
+        self.prefetched_roles = 0
+
+    def _prefetch_learning_path(self, row: dict[str, Any], budget: PrefetchBudget) -> bool:
+        from api.utils.learning_path import COMBINED_GENERATION
+        from api.utils.learning_path_cache import get_learning_path_cache, get_or_build_learning_path, learning_path_key
+
+        keywords = (row.get('feedback') or {}).get('keywords') or {}
+        missing, present = keywords.get('missing') or [], keywords.get('present') or []
+        cache = get_learning_path_cache()
+        if not cache or not missing:
+            return True
+        if cache.get(learning_path_key(row['target_role'], missing, present)) is not None:
+            return True
+        # At most one Gemini call for roadmap + capstone when combined, else one each
+        if not budget.spend(llm_calls=1 if COMBINED_GENERATION else 2):
+            return False
+        _, hit = get_or_build_learning_path(row['target_role'], missing, present, Deadline(TASK_BUDGET_S))
+        self.prefetched_paths += not hit
+        return True
+
+    def _prefetch_jobs(self, target_role: str, budget: PrefetchBudget) -> bool:
+        from api.utils.job_search_crew import JobSearchCrew
+        from api.utils.job_search_serp import search_capability_message
+        from api.utils.job_store import get_job_store
+
+        store = get_job_store()
+        if not store or search_capability_message() or store.coverage(target_role):
+            return True
+        if not budget.spend(searches=1):
+            return False
+        JobSearchCrew(target_role).kickoff(Deadline(TASK_BUDGET_S))
+        self.prefetched_roles += 1
+        return True
+
+    def run_once(self) -> dict[str, Any]:
+        """One cycle: new assessments first, then popular roles, until the budget runs out."""
+        from api.utils.llm_usage import usage_context
+
+        with usage_context("prefetch"):
+            return self._run_cycle()
+
+    def _run_cycle(self) -> dict[str, Any]:
+        budget = PrefetchBudget()
+        rows = self.storage.assessments_since(self.watermark, 100)
+        roles = list(dict.fromkeys(r['target_role'] for r in rows if r.get('target_role')))
+        for row in rows:
+            if row.get('target_role') and not self._prefetch_learning_path(row, budget):
+                break
+            # Only advance past rows that were handled, so an exhausted budget resumes here next cycle
+            self.watermark = row['created_at']
+        try:
+            roles += [r for r in self.storage.popular_roles(POPULAR_ROLES) if r not in roles]
+        except Exception as e:
+            print(f"Prefetch: popular roles unavailable: {e}")
+        for role in roles:
+            if not self._prefetch_jobs(role, budget):
+                break
+        return {
+            "assessments": len(rows),
+            "learning_paths": self.prefetched_paths,
+            "job_roles": self.prefetched_roles,
+            "llm_calls_left": budget.llm_calls,
+            "searches_left": budget.searches,
+        }
+
+    def run_forever(self, interval_s: float = INTERVAL_S, stop: threading.Event | None = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                print(f"Prefetch cycle: {self.run_once()}")
+            except Exception as e:
+                print(f"Prefetch cycle failed: {e}")
+            stop.wait(interval_s)
+
+
+_thread: threading.Thread | None = None
+
+
+def start_background_prefetch() -> bool:
+    """Starts the worker as a daemon thread (once per process) when PREFETCH_IN_PROCESS=1."""
+    global _thread
+    if os.getenv("PREFETCH_IN_PROCESS") != "1" or _thread is not None:
+        return False
+    from api.utils.storage import get_storage
+
+    storage = get_storage()
+    if not storage:
+        print("Prefetch disabled: Supabase not initialized")
+        return False
+    _thread = threading.Thread(target=PrefetchWorker(storage).run_forever, name="prefetch", daemon=True)
+    _thread.start()
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prefetch learning paths and job openings for active users.")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=INTERVAL_S)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from api.utils.storage import get_storage
+
+    load_dotenv(dotenv_path=".env.local")
+    storage = get_storage()
+    if not storage:
+        raise SystemExit("Supabase not initialized (set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY)")
+    worker = PrefetchWorker(storage)
+    if args.once:
+        print(worker.run_once())
+    else:
+        worker.run_forever(args.interval)
+
+
+if __name__ == "__main__":
+    main()
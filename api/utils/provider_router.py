@@ -0,0 +1,196 @@
+"""
+Health-aware routing across interchangeable search providers.
+
+Each provider keeps a rolling window of call latencies and outcomes. A circuit breaker skips a
+provider after repeated failures until a cooldown passes, then lets one probe call through. Calls
+are hedged: once the in-flight provider runs past its own p95 latency, the next healthy provider
+is started too and the first non-empty answer wins. Slow calls left behind finish in the shared
+pool and still feed the health stats.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+from api.utils.deadline import NO_DEADLINE, Deadline, DeadlineExceeded
+
+WINDOW_SIZE = 50
+MIN_SAMPLES_FOR_P95 = 5
+HEDGE_DEFAULT_S = 3.0
+HEDGE_MIN_S = 0.5
+HEDGE_MAX_S = 15.0
+FAILURE_THRESHOLD = 3
+ERROR_RATE_THRESHOLD = 0.5
+COOLDOWN_S = 30.0
+
+# Shared pool: hung requests must not block the caller on shutdown, so no per-call executor.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="provider")
+
+
+class ProviderHealth:
+    """Rolling latency / error stats plus a consecutive-failure circuit breaker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._samples: deque[tuple[float, bool]] = deque(maxlen=WINDOW_SIZE)
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((latency, ok))
+            self._probe_in_flight = False
+            if ok:
+                self._consecutive_failures = 0
+                self._opened_at = None
+                return
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= FAILURE_THRESHOLD or (
+                len(self._samples) >= 10 and self._error_rate() >= ERROR_RATE_THRESHOLD
+            ):
+                self._opened_at = time.monotonic()
+
+    def _error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._error_rate()
+
+    def p95(self) -> float | None:
+        with self._lock:
+            lat = sorted(l for l, ok in self._samples if ok)
+        if len(lat) < MIN_SAMPLES_FOR_P95:
+            return None
+        return lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+
+    def acquire(self) -> bool:
+        """True when the circuit is closed, or half-open and this caller gets the single probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < COOLDOWN_S or self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def snapshot(self) -> dict[str, Any]:
+        p95 = self.p95()
+        with self._lock:
+            return {
+                "samples": len(self._samples),
+                "error_rate": round(self._error_rate(), 3),
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "circuit": "open" if self._opened_at is not None else "closed",
+            }
+
+
+class Provider:
+    """
+    A named search backend: `search(query, page=n, deadline=d)` returns rows or raises, and clamps its
+    network timeouts to the deadline; `configured()` gates it. A provider without result pages
+    (paged=False) is only asked for page 0.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        search: Callable[..., list[dict[str, Any]]],
+        configured: Callable[[], bool],
+        paged: bool = True,
+    ):
+        self.name = name
+        self.search = search
+        self.configured = configured
+        self.paged = paged
+        self.health = ProviderHealth(name)
+
+    def hedge_delay(self) -> float:
+        p95 = self.health.p95()
+        if p95 is None:
+            return HEDGE_DEFAULT_S
+        return min(HEDGE_MAX_S, max(HEDGE_MIN_S, p95))
+
+
+class ProviderRouter:
+    """Races providers in priority order, hedging past p95 and skipping open circuits."""
+
+    def __init__(self, providers: list[Provider], max_wait: float = 60.0):
+        self.providers = providers
+        self.max_wait = max_wait
+
+    def _call(self, provider: Provider, query: str, page: int, deadline: Deadline) -> list[dict[str, Any]]:
+        start = time.monotonic()
+        try:
+            deadline.check(f"{provider.name} search")
+            rows = provider.search(query, page=page, deadline=deadline)
+        except DeadlineExceeded:
+            raise  # the request ran out of time, not the provider: no health sample
+        except Exception as e:
+            provider.health.record(time.monotonic() - start, False)
+            print(f"{provider.name} error: {e}")
+            raise
+        provider.health.record(time.monotonic() - start, True)
+        return rows
+
+    def _eligible(self, page: int) -> list[Provider]:
+        return [p for p in self.providers if p.configured() and (p.paged or not page)]
+
+    def supports_pages(self) -> bool:
+        """True when a configured provider can serve pages past the first."""
+        return any(p.paged for p in self.providers if p.configured())
+
+    def run(self, query: str, deadline: Deadline | None = None, page: int = 0) -> list[dict[str, Any]]:
+        """
+        First non-empty result page, or [] when every provider fails or the deadline passes. Providers
+        without pages are left out of page > 0 entirely, so they record no health sample for it.
+        """
+        deadline = deadline or NO_DEADLINE
+        pending = self._eligible(page)
+        if not pending or deadline.expired():
+            return []
+        # Provider calls get the same bound, so one left behind by a hedge can't outlive the wait
+        deadline = Deadline(min(self.max_wait, deadline.remaining()))
+        give_up_at = deadline.expires_at
+        in_flight: dict[Future, Provider] = {}
+
+        def launch() -> Provider | None:
+            # Circuits are checked at launch time so a half-open probe is only claimed when used.
+            while pending:
+                provider = pending.pop(0)
+                if provider.health.acquire():
+                    in_flight[_executor.submit(self._call, provider, query, page, deadline)] = provider
+                    return provider
+            return None
+
+        latest = launch()
+        if latest is None:
+            # Every circuit open: better to try the least-bad provider than return nothing.
+            latest = min(self._eligible(page), key=lambda p: p.health.error_rate())
+            in_flight[_executor.submit(self._call, latest, query, page, deadline)] = latest
+
+        while in_flight:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(remaining, latest.hedge_delay()) if pending else remaining
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # In-flight provider is past its p95: hedge with the next healthy one.
+                latest = launch() or latest
+                continue
+            for fut in done:
+                in_flight.pop(fut)
+                if fut.exception() is None and fut.result():
+                    return fut.result()
+            if not in_flight:
+                latest = launch() or latest
+        return []
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {p.name: p.health.snapshot() for p in self.providers}
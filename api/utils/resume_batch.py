@@ -0,0 +1,190 @@
+"""
+Batch resume ingestion for cohort onboarding (/api/parse-resumes/batch).
+
+Uploads (several PDFs and/or zip archives of PDFs) are spooled to a per-batch work directory and
+expanded into (filename, path) items, so a large cohort never sits in memory at once. Text
+extraction runs in a process pool, since PyMuPDF is CPU-bound and holds the GIL; the pool is created
+once per worker and shared by concurrent batches, so it is spawned once and never grows past
+BATCH_TEXT_WORKERS processes. Each extracted text is handed straight to a thread pool for field
+extraction. That pool is capped at
+BATCH_SLOT_SHARE of the Gemini key pool, and each resume waits for an admission slot (admission.py)
+under the uploading user's fair queue, so a cohort upload shares the keys with interactive requests
+instead of taking all of them. Results are yielded as each resume finishes, in completion order, so
+the route can stream them as NDJSON.
+"""
+import contextvars
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Any, Iterable, Iterator
+
+from api.utils.admission import Rejected, busy_error, gemini_slot
+from api.utils.deadline import Deadline
+from api.utils.gemini import key_pool_capacity
+from api.utils.resume_parser import ResumeTooLargeError, extract_resume_fields, extract_resume_text, spool_upload
+
+MAX_BATCH_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+MAX_PDF_BYTES = int(os.getenv("BATCH_MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+MAX_ZIP_BYTES = int(os.getenv("BATCH_MAX_ZIP_BYTES", str(500 * 1024 * 1024)))
+# Gemini budget per resume; a batch as a whole is not bound to the single-request SLA
+PER_RESUME_BUDGET_S = float(os.getenv("BATCH_PER_RESUME_SECONDS", "90"))
+# Share of the Gemini key pool (key_pool_capacity) one batch may keep busy
+SLOT_SHARE = float(os.getenv("BATCH_SLOT_SHARE", "0.5"))
+# Text extraction processes shared by every batch in this worker
+TEXT_WORKERS = int(os.getenv("BATCH_TEXT_WORKERS", str(min(4, os.cpu_count() or 2))))
+
+_text_pool: Executor | None = None
+_text_pool_lock = threading.Lock()
+
+
+class BatchInputError(ValueError):
+    """The upload can't be turned into a list of PDFs (too many files, bad archive, ...)."""
+
+
+# (filename, spooled pdf path, error); exactly one of path and error is set
+BatchItem = tuple[str, str | None, str | None]
+
+
+def expand_uploads(uploads: Iterable[tuple[str, IO[bytes]]], workdir: str) -> list[BatchItem]:
+    """
+    Spools uploaded PDFs and zip archive members into workdir and returns (filename, pdf_path, error)
+    items. Oversized files are kept with an error instead of a path so they still get a result line.
+    The caller removes workdir once the batch is done.
+    """
+    items: list[BatchItem] = []
+
+    def add(name: str, stream: IO[bytes] | None, error: str | None = None) -> None:
+        if len(items) >= MAX_BATCH_FILES:
+            raise BatchInputError(f"At most {MAX_BATCH_FILES} resumes per batch")
+        path = None
+        if stream is not None:
+            try:
+                path = spool_upload(stream, MAX_PDF_BYTES, dir=workdir)
+            except ResumeTooLargeError as e:
+                error = str(e)
+        items.append((name, path, error))
+
+    for filename, stream in uploads:
+        if filename.lower().endswith(".zip") or zipfile.is_zipfile(stream):
+            stream.seek(0)
+            try:
+                zip_path = spool_upload(stream, MAX_ZIP_BYTES, dir=workdir)
+            except ResumeTooLargeError as e:
+                raise BatchInputError(f"{filename}: {e}")
+            try:
+                with zipfile.ZipFile(zip_path) as archive:
+                    for info in archive.infolist():
+                        name = info.filename
+                        if info.is_dir() or not name.lower().endswith(".pdf") or "/__MACOSX/" in f"/{name}":
+                            continue
+                        # Checked against the declared size first so a zip bomb is never inflated;
+                        # spool_upload enforces the real size in case the header lies
+                        if info.file_size > MAX_PDF_BYTES:
+                            add(name, None, f"File exceeds {MAX_PDF_BYTES // (1024 * 1024)} MB limit")
+                        else:
+                            with archive.open(info) as member:
+                                add(name, member)
+            except zipfile.BadZipFile as e:
+                raise BatchInputError(f"{filename}: {e}")
+            finally:
+                os.unlink(zip_path)
+        else:
+            stream.seek(0)
+            add(filename, stream)
+    return items
+
+
+def _get_text_pool() -> Executor:
+    global _text_pool
+    with _text_pool_lock:
+        if _text_pool is None:
+            try:
+                _text_pool = ProcessPoolExecutor(max_workers=TEXT_WORKERS)
+            except (OSError, NotImplementedError) as e:
+                # Some serverless sandboxes have no /dev/shm for multiprocessing semaphores
+                print(f"Process pool unavailable ({e}); extracting text in threads")
+                _text_pool = ThreadPoolExecutor(max_workers=TEXT_WORKERS)
+        return _text_pool
+
+
+def _drop_text_pool(pool: Executor) -> None:
+    """Forgets a pool whose worker died (BrokenProcessPool) so the next submit starts a new one."""
+    global _text_pool
+    with _text_pool_lock:
+        if _text_pool is pool:
+            _text_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_text(path: str) -> Future:
+    pool = _get_text_pool()
+    try:
+        # Workers open the spooled file by path; the batch is already parallel across resumes
+        return pool.submit(extract_resume_text, path, False)
+    except BrokenProcessPool:
+        _drop_text_pool(pool)
+        return _get_text_pool().submit(extract_resume_text, path, False)
+
+
+def _fields(text: str, user: str | None) -> dict[str, Any]:
+    deadline = Deadline(PER_RESUME_BUDGET_S)
+    try:
+        with gemini_slot(user, deadline):
+            return extract_resume_fields(text, deadline)
+    except Rejected as e:
+        return busy_error(e)
+
+
+def ingest_resumes(items: list[BatchItem], user: str | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Yields one result dict per item as soon as it completes: {index, filename, status, data|error}.
+    user is the admitted client key (admission.admitted_user) the Gemini calls queue under.
+    """
+    text_futures: dict[Future, int] = {}
+    llm_futures: dict[Future, int] = {}
+
+    def failed(index: int, error: str) -> dict[str, Any]:
+        return {"index": index, "filename": items[index][0], "status": "error", "error": error}
+
+    llm_pool = ThreadPoolExecutor(max_workers=max(1, int(key_pool_capacity() * SLOT_SHARE)))
+    try:
+        for index, (_, path, error) in enumerate(items):
+            if error:
+                yield failed(index, error)
+            else:
+                text_futures[_submit_text(path)] = index
+
+        while text_futures or llm_futures:
+            done, _ = wait(list(text_futures) + list(llm_futures), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in text_futures:
+                    index = text_futures.pop(fut)
+                    try:
+                        text = fut.result()
+                    except Exception as e:
+                        yield failed(index, f"Could not read PDF: {e}")
+                        continue
+                    if not text:
+                        yield failed(index, "No text content found in PDF")
+                        continue
+                    # Run in a copy of this context so the call is attributed to the request in the usage ledger
+                    llm_futures[llm_pool.submit(contextvars.copy_context().run, _fields, text, user)] = index
+                else:
+                    index = llm_futures.pop(fut)
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        yield failed(index, str(e))
+                        continue
+                    if isinstance(result.get("error"), str):
+                        yield failed(index, result["error"])
+                    else:
+                        yield {"index": index, "filename": items[index][0], "status": "ok", "data": result}
+    finally:
+        # Client went away mid-stream: drop this batch's queued work instead of finishing the whole
+        # cohort; the shared text pool stays up for other batches
+        for fut in text_futures:
+            fut.cancel()
+        llm_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+"""
+Deterministic resume field extraction from PyMuPDF text, run before (and instead of, when Gemini is
+unavailable) the LLM pass in resume_parser.py.
+
+- email and linkedin_url: regular expressions.
+- Sections: a heading is a short line of its own whose text is a known section title ("EDUCATION",
+  "Work Experience:", "S K I L L S"); everything before the first heading is the contact header.
+- skills: the skill matcher (skill_matcher.py) run over the whole text.
+- education: entries split at degree / institution lines, with the last year in each entry.
+- experience: entries split at lines carrying a date range ("Jan 2021 - Present"); the LLM replaces
+  these with cleaner structured entries when it answers.
+"""
+import re
+from typing import Any
+
+from api.utils.skill_matcher import get_skill_matcher
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "about me", "objective",
+                "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship experience"),
+    "education": ("education", "academic background", "academics", "academic qualifications",
+                  "educational qualifications", "education and training"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "skills and tools"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications"),
+    "achievements": ("achievements", "awards", "honors", "honours", "awards and achievements"),
+}
+_HEADING_INDEX = {title: section for section, titles in SECTION_HEADINGS.items() for title in titles}
+_MAX_HEADING_WORDS = 4
+
+_DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|ph\.?\s?d|doctorate|diploma|associate|b\.?\s?tech|m\.?\s?tech|b\.?\s?e|m\.?\s?e|"
+    r"b\.?\s?sc|m\.?\s?sc|b\.?\s?s|m\.?\s?s|b\.?\s?a|m\.?\s?a|mba|bca|mca|b\.?\s?com|m\.?\s?com|"
+    r"high school|higher secondary|secondary school|hsc|ssc|cbse|icse)\b\.?",
+    re.IGNORECASE,
+)
+_INSTITUTION_RE = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic|iit|nit|iiit)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19[5-9]\d|20\d{2})\b")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*'?\d{{2,4}}|\d{{1,2}}/\d{{2,4}}|(?:19|20)\d{{2}})"
+_DATE_RANGE_RE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now|till date|date)", re.IGNORECASE
+)
+_NAME_STOPWORDS = {"resume", "curriculum vitae", "cv", "biodata"}
+
+
+def _heading(line: str) -> str | None:
+    text = line.strip().rstrip(":").strip()
+    # Letter-spaced headings: "E D U C A T I O N"
+    if re.fullmatch(r"(?:[A-Za-z] )+[A-Za-z]", text):
+        text = text.replace(" ", "")
+    text = " ".join(text.lower().replace("&", "and").split())
+    if not text or len(text.split()) > _MAX_HEADING_WORDS:
+        return None
+    return _HEADING_INDEX.get(text)
+
+
+def split_sections(text: str) -> tuple[str, dict[str, str]]:
+    """(contact header, {section: body}); a section repeated under another heading is appended."""
+    header: list[str] = []
+    sections: dict[str, list[str]] = {}
+    current: list[str] = header
+    for line in text.splitlines():
+        section = _heading(line)
+        if section:
+            current = sections.setdefault(section, [])
+            continue
+        current.append(line)
+    return "\n".join(header).strip(), {k: "\n".join(v).strip() for k, v in sections.items() if any(l.strip() for l in v)}
+
+
+def _full_name(header: str) -> str | None:
+    for line in header.splitlines()[:5]:
+        line = " ".join(line.split())
+        if not line or line.lower() in _NAME_STOPWORDS:
+            continue
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", w) for w in words):
+            return line.title() if line.isupper() else line
+        return None
+    return None
+
+
+def parse_education(section: str) -> list[dict[str, str]]:
+    entries: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    for line in (l.strip() for l in section.splitlines()):
+        if not line:
+            continue
+        degree = _DEGREE_RE.search(line)
+        institution = _INSTITUTION_RE.search(line)
+        if (degree and "degree" in current) or (institution and not degree and "institution" in current):
+            entries.append(current)
+            current = {}
+        if degree and "degree" not in current:
+            current["degree"] = line
+        elif institution and "institution" not in current:
+            current["institution"] = line
+        years = _YEAR_RE.findall(line)
+        if years:
+            current["year"] = years[-1]
+    if current:
+        entries.append(current)
+    return [
+        {"degree": e.get("degree", ""), "institution": e.get("institution", ""), "year": e.get("year", "")}
+        for e in entries
+        if e.get("degree") or e.get("institution")
+    ]
+
+
+def parse_experience(section: str) -> list[dict[str, str]]:
+    entries: list[dict[str, Any]] = []
+    previous = ""
+    for line in (l.strip() for l in section.splitlines()):
+        if not line:
+            continue
+        dates = _DATE_RANGE_RE.search(line)
+        if dates:
+            title = " ".join(_DATE_RANGE_RE.sub("", line).strip(" |,-–—()").split())
+            # A line holding only the dates belongs to the title line above it
+            if not title and previous and entries and entries[-1]["lines"] and entries[-1]["lines"][-1] == previous:
+                entries[-1]["lines"].pop()
+            entries.append({"role": title or previous, "duration": dates.group(0), "lines": []})
+        elif entries:
+            entries[-1]["lines"].append(line)
+        previous = line
+    return [
+        {"role": e["role"], "company": "", "duration": e["duration"], "description": " ".join(e["lines"])}
+        for e in entries
+    ]
+
+
+def extract_local_fields(text: str) -> dict[str, Any]:
+    """
+    The fields a local pass can find, plus the section texts the LLM pass uses:
+    {"full_name", "email", "linkedin_url", "skills", "education", "experience", "header", "sections"}.
+    """
+    header, sections = split_sections(text)
+    email = EMAIL_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    linkedin_url = None
+    if linkedin:
+        linkedin_url = linkedin.group(0).rstrip("/")
+        if not linkedin_url.lower().startswith("http"):
+            linkedin_url = f"https://{linkedin_url}"
+    return {
+        "full_name": _full_name(header),
+        "email": email.group(0) if email else None,
+        "linkedin_url": linkedin_url,
+        "skills": get_skill_matcher().find(text),
+        "education": parse_education(sections.get("education", "")),
+        "experience": parse_experience(sections.get("experience", "")),
+        "header": header,
+        "sections": sections,
+    }
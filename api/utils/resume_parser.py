@@ -1,25 +1,92 @@
 import os
 import fitz  # PyMuPDF
-from google import genai
 import json
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from api.utils.deadline import NO_DEADLINE, Deadline, DeadlineExceeded
+from api.utils.gemini import PromptTemplate
 
-def parse_resume_pdf(file_buffer):
+# Upload and document limits keep peak memory per concurrent upload bounded
+MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "25"))
+MAX_TEXT_CHARS = int(os.getenv("RESUME_MAX_TEXT_CHARS", "200000"))
+# Documents with at least this many pages are split into page ranges and extracted in parallel
+PARALLEL_PAGE_THRESHOLD = 12
+PAGES_PER_CHUNK = 6
+_SPOOL_CHUNK = 64 * 1024
+
+# At most this many PDFs are open and being extracted at once in this worker
+_extraction_slots = threading.BoundedSemaphore(int(os.getenv("RESUME_MAX_CONCURRENT_EXTRACTIONS", "4")))
+_page_pool: ProcessPoolExecutor | None = None
+_page_pool_lock = threading.Lock()
+
+class ResumeTooLargeError(ValueError):
+    """The upload exceeds the byte or page limit."""
+
+def spool_upload(stream, max_bytes: int = MAX_UPLOAD_BYTES, dir: str | None = None) -> str:
     """
-    Parses a PDF buffer using PyMuPDF and extracts structured data using Google Gemini.
+    Copies an upload stream to a temp file in fixed-size chunks, never holding the whole file in
+    memory. Returns the path (caller deletes it); raises ResumeTooLargeError past max_bytes.
     """
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=dir)
     try:
-        # Extract text from PDF
-        doc = fitz.open(stream=file_buffer, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        
-        if not text:
-            return {"error": "No text content found in PDF"}
-
-        prompt = f"""
+        total = 0
+        with os.fdopen(fd, "wb") as out:
+            while chunk := stream.read(_SPOOL_CHUNK):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ResumeTooLargeError(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+def _extract_page_range(path: str, start: int, stop: int) -> str:
+    with fitz.open(path) as doc:
+        return "".join(doc[i].get_text() for i in range(start, stop))
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 2))
+        return _page_pool
+
+def extract_resume_text(source, parallel: bool = True) -> str:
+    """
+    Extracts plain text from a PDF (file path or bytes) with PyMuPDF, enforcing MAX_PAGES.
+    Large documents given by path are extracted in page ranges across processes; pages are joined
+    once at the end. Module-level so batch ingestion can run it in a process pool.
+    """
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    with doc:
+        pages = doc.page_count
+        if pages > MAX_PAGES:
+            raise ResumeTooLargeError(f"PDF has {pages} pages; the limit is {MAX_PAGES}")
+        if not (parallel and isinstance(source, str) and pages >= PARALLEL_PAGE_THRESHOLD):
+            text = "".join(page.get_text() for page in doc)
+            return text[:MAX_TEXT_CHARS]
+
+    ranges = [(start, min(start + PAGES_PER_CHUNK, pages)) for start in range(0, pages, PAGES_PER_CHUNK)]
+    try:
+        pool = _get_page_pool()
+        parts = list(pool.map(_extract_page_range, [source] * len(ranges), *zip(*ranges)))
+    except (OSError, NotImplementedError, RuntimeError) as e:
+        print(f"Parallel page extraction unavailable ({e}); extracting sequentially")
+        parts = [_extract_page_range(source, start, stop) for start, stop in ranges]
+    return "".join(parts)[:MAX_TEXT_CHARS]
+
+# Instructions first, resume last, so the static part can be served from Gemini's context cache
+RESUME_FIELDS_PROMPT = PromptTemplate(
+    "resume-fields",
+    """
         You are an AI assistant that extracts structured data from resumes.
-        Extract the following information from the text below and return it as a valid JSON object:
+        Extract the following information from the resume text at the end and return it as a valid JSON object:
         - full_name: the person's full name (string)
         - email: email address (string)
         - country: city and/or country (string)
@@ -29,29 +96,151 @@ def parse_resume_pdf(file_buffer):
         - experience: list of objects with fields "role", "company", "duration", "description"
         - bio: a short professional summary (string)
 
+        Return ONLY the JSON object, no markdown formatting.
+
         Resume Text:
-        {text}
-        
+        """,
+    "{text}\n",
+)
+
+# When the local pass (resume_local.py) has found the sections, only what it can't extract is asked for
+RESUME_SECTIONS_PROMPT = PromptTemplate(
+    "resume-sections",
+    """
+        You are an AI assistant that extracts structured data from resumes.
+        The resume excerpt at the end holds its contact header, summary, skills and work experience sections.
+        Extract the following information and return it as a valid JSON object:
+        - full_name: the person's full name (string)
+        - country: city and/or country (string)
+        - skills: list of strings (e.g., ["Python", "React", "Project Management"])
+        - experience: list of objects with fields "role", "company", "duration", "description"
+        - bio: a short professional summary (string)
+
         Return ONLY the JSON object, no markdown formatting.
-        """
 
-        from api.utils.gemini import call_gemini_with_retry
-        content = call_gemini_with_retry(prompt)
-        
+        Resume Excerpt:
+        """,
+    "{text}\n",
+)
+_HEADER_CHARS = 1500
+
+def _sections_excerpt(local):
+    sections = local["sections"]
+    parts = [local["header"][:_HEADER_CHARS]]
+    if sections.get("summary"):
+        parts.append("SUMMARY\n" + sections["summary"])
+    if sections.get("skills"):
+        parts.append("SKILLS\n" + sections["skills"])
+    parts.append("EXPERIENCE\n" + sections["experience"])
+    return "\n\n".join(parts)
+
+def _local_only(local, reason):
+    """The complete no-LLM result, used when Gemini is throttled, out of budget or unparseable."""
+    print(f"Resume parse from local extraction only: {reason}")
+    return {
+        "full_name": local["full_name"] or "",
+        "email": local["email"] or "",
+        "country": "",
+        "linkedin_url": local["linkedin_url"] or "",
+        "skills": local["skills"],
+        "education": local["education"],
+        "experience": local["experience"],
+        "bio": local["sections"].get("summary", "")[:600],
+        "extraction": "local",
+    }
+
+def extract_resume_fields(text: str, deadline: Deadline | None = None):
+    """
+    Extracts structured resume fields from already-extracted text. Email, LinkedIn URL, skills and
+    (when its section is found) education come from the local pass; Gemini is asked only for the
+    rest plus its own skill list, on the header, summary, skills and experience sections, or for
+    everything when those sections can't be found. When Gemini is throttled, out of budget or unparseable, the local fields are
+    returned on their own ("extraction": "local").
+    """
+    from api.utils.learning_path import normalize_skill
+    from api.utils.resume_local import extract_local_fields
+
+    try:
+        local = extract_local_fields(text)
+    except Exception as e:
+        print(f"Local resume extraction failed: {e}")
+        local = None
+    sections = local["sections"] if local else {}
+    targeted = "experience" in sections and (bool(local["education"]) or "education" not in sections)
+
+    try:
+        from api.utils.gemini import call_gemini_with_retry, parses_as_json
+
+        if targeted:
+            prompt = RESUME_SECTIONS_PROMPT.render(text=_sections_excerpt(local))
+        else:
+            prompt = RESUME_FIELDS_PROMPT.render(text=text)
+        try:
+            content = call_gemini_with_retry(
+                prompt, deadline=deadline, validate=parses_as_json, caller="resume_parser.extract_resume_fields"
+            )
+        except DeadlineExceeded as e:
+            if local:
+                return _local_only(local, e)
+            print(f"Resume parse degraded: {e}")
+            return {"error": "Resume analysis timed out. Please try again.", "type": "deadline"}
+
         # Handle potential error return from call_gemini_with_retry
         if isinstance(content, dict) and "error" in content:
-            return content
-        
+            return _local_only(local, content["error"]) if local else content
+
         # Clean up potential markdown code blocks
         if content.startswith("```json"):
             content = content[7:]
         if content.endswith("```"):
             content = content[:-3]
-            
+
         result = json.loads(content.strip())
-        result["raw_text"] = text
+
+    except Exception as e:
+        if local:
+            return _local_only(local, e)
+        print(f"Error parsing resume: {e}")
+        return {"error": str(e)}
+
+    if not local:
         return result
+    # Exact matches win over the model's reading; its own skill list only adds to the matched ones
+    result["email"] = local["email"] or result.get("email")
+    result["linkedin_url"] = local["linkedin_url"] or result.get("linkedin_url")
+    result["full_name"] = result.get("full_name") or local["full_name"]
+    if targeted:
+        result["education"] = local["education"]
+    seen = {normalize_skill(s) for s in local["skills"]}
+    extra = [s for s in result.get("skills") or [] if isinstance(s, str) and normalize_skill(s) not in seen]
+    result["skills"] = local["skills"] + extra
+    result["extraction"] = "local+llm"
+    return result
 
+def parse_resume_pdf(source, deadline: Deadline | None = None, include_text: bool = False):
+    """
+    Parses a PDF (spooled file path or bytes) using PyMuPDF and extracts structured data locally and
+    with Google Gemini. Extraction waits for one of the worker's extraction slots, for no longer than
+    the deadline allows. The extracted text is returned as "raw_text" only with include_text, for
+    callers that store or assess it next.
+    """
+    deadline = deadline or NO_DEADLINE
+    if not _extraction_slots.acquire(timeout=deadline.timeout()):
+        return {"error": "The server is busy reading other resumes. Please try again.", "type": "deadline"}
+    try:
+        text = extract_resume_text(source)
+    except ResumeTooLargeError:
+        raise
     except Exception as e:
         print(f"Error parsing resume: {e}")
         return {"error": str(e)}
+    finally:
+        _extraction_slots.release()
+
+    if not text:
+        return {"error": "No text content found in PDF"}
+
+    result = extract_resume_fields(text, deadline)
+    if include_text and "error" not in result:
+        result["raw_text"] = text
+    return result
@@ -0,0 +1,192 @@
+"""
+Deterministic, prerequisite-aware roadmaps built from roadmap.sh edges (no Gemini quota).
+
+Missing skills are matched onto topic nodes of the role's roadmap.sh graph, the nearest topic
+ancestors of those nodes are pulled in as prerequisites, and the resulting subgraph is packed into
+the four weekly milestones get_learning_path expects. RoadmapGraph numbers nodes in topological
+order, so sorting the subgraph's node ids is already a valid prerequisite order.
+"""
+import os
+import re
+import threading
+from collections import deque
+from typing import Any
+
+from api.utils.deadline import Deadline
+from api.utils.learning_path import get_roadmapsh_id, normalize_skill
+from api.utils.roadmap_graph import RoadmapGraph, get_roadmap_graph
+
+# "graph": serve this builder first and use Gemini only when it has nothing to match;
+# "llm": Gemini first, this builder when Gemini is throttled, fails or runs out of budget
+ROADMAP_ENGINE = os.getenv("ROADMAP_ENGINE", "graph").lower()
+TOPIC_TYPES = ("topic", "subtopic")
+PREREQ_DEPTH = 2  # topic hops walked up from each matched node
+MAX_TOPICS = 24
+# Below this share of the missing skills placed on the graph, Gemini builds the roadmap instead
+MIN_PLACED_SHARE = float(os.getenv("ROADMAP_MIN_PLACED_SHARE", "0.6"))
+WEEKS = 4
+_DIFFICULTY = ("Beginner", "Intermediate", "Advanced")
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+class _TopicIndex:
+    __slots__ = ("exact", "tokens", "token_count")
+
+    def __init__(self, graph: RoadmapGraph):
+        self.exact: dict[str, list[int]] = {}
+        self.tokens: dict[str, set[int]] = {}
+        self.token_count: dict[int, int] = {}
+        for node in range(len(graph.nodes)):
+            if graph.node_type(node) not in TOPIC_TYPES or not graph.label(node):
+                continue
+            name = normalize_skill(graph.label(node))
+            self.exact.setdefault(name, []).append(node)
+            words = set(_TOKEN_RE.findall(name))
+            self.token_count[node] = len(words)
+            for w in words:
+                self.tokens.setdefault(w, set()).add(node)
+
+    def match(self, skill: str) -> list[int]:
+        """Nodes whose label is the skill, else the most specific labels containing all of its words."""
+        name = normalize_skill(skill)
+        if name in self.exact:
+            return self.exact[name][:2]
+        words = set(_TOKEN_RE.findall(name))
+        if not words:
+            return []
+        found = set.intersection(*(self.tokens.get(w, set()) for w in words))
+        return sorted(found, key=lambda n: (self.token_count[n], n))[:2]
+
+
+_indexes: dict[tuple[str, str], _TopicIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _topic_index(graph: RoadmapGraph) -> _TopicIndex:
+    key = (graph.roadmap_id, graph.etag)
+    index = _indexes.get(key)
+    if index is None:
+        index = _TopicIndex(graph)
+        with _indexes_lock:
+            _indexes[key] = index
+    return index
+
+
+def _prerequisites(graph: RoadmapGraph, target: int, known: set[str]) -> dict[int, int]:
+    """Topic ancestors of target within PREREQ_DEPTH topic hops, as {node: depth}; known topics end the walk."""
+    found: dict[int, int] = {}
+    seen = {target}
+    queue = deque([(target, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        for parent in graph.parents[node]:
+            if parent in seen:
+                continue
+            seen.add(parent)
+            hop = depth
+            if graph.node_type(parent) in TOPIC_TYPES and graph.label(parent):
+                if normalize_skill(graph.label(parent)) in known:
+                    continue
+                hop = depth + 1
+                found[parent] = hop
+            if hop < PREREQ_DEPTH:
+                queue.append((parent, hop))
+    return found
+
+
+def _pack(items: list[int], weights: dict[int, int]) -> list[list[int]]:
+    """Splits items (in order) into WEEKS contiguous, non-empty groups of roughly equal weight."""
+    total = sum(weights[i] for i in items)
+    groups: list[list[int]] = []
+    start, acc = 0, 0
+    for week in range(1, WEEKS):
+        goal = total * week / WEEKS
+        end = start + 1
+        acc += weights[items[start]]
+        # Stop at the item nearest the week's share, leaving one item for each later week
+        while end < len(items) - (WEEKS - week) and acc + weights[items[end]] / 2 <= goal:
+            acc += weights[items[end]]
+            end += 1
+        groups.append(items[start:end])
+        start = end
+    groups.append(items[start:])
+    return groups
+
+
+def _join(names: list[str]) -> str:
+    return names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+
+
+def build_prerequisite_roadmap(
+    target_role: str,
+    missing_skills: list,
+    known_skills: list | None = None,
+    deadline: Deadline | None = None,
+) -> list[dict[str, Any]] | None:
+    """
+    Four weekly milestones covering the missing skills and their roadmap.sh prerequisites, or None
+    when the role has no roadmap.sh graph or less than MIN_PLACED_SHARE of the skills can be placed on
+    it. Skills that can't be placed are added to the last week so none is dropped.
+    """
+    roadmap_id = get_roadmapsh_id(target_role) if target_role else None
+    graph = get_roadmap_graph(roadmap_id, deadline) if roadmap_id else None
+    if graph is None or not missing_skills:
+        return None
+    index = _topic_index(graph)
+    known = {normalize_skill(str(s)) for s in known_skills or []}
+
+    skills = list(dict.fromkeys(str(s).strip() for s in missing_skills if str(s).strip()))
+    covers: dict[int, list[str]] = {}
+    unplaced: list[str] = []
+    for skill in skills:
+        nodes = index.match(skill)
+        if not nodes:
+            unplaced.append(skill)
+        for node in nodes:
+            covers.setdefault(node, []).append(skill)
+    if not covers or len(skills) - len(unplaced) < MIN_PLACED_SHARE * len(skills):
+        return None
+
+    prereq_depth: dict[int, int] = {}
+    for target in covers:
+        for node, depth in _prerequisites(graph, target, known).items():
+            if node not in covers:
+                prereq_depth[node] = min(depth, prereq_depth.get(node, depth))
+    prereqs = sorted(prereq_depth, key=lambda n: (prereq_depth[n], n))[:max(0, MAX_TOPICS - len(covers))]
+
+    # Distinct labels only (roadmap.sh repeats some topics across sections)
+    chosen: dict[str, int] = {}
+    for node in sorted(list(covers) + prereqs):
+        first = chosen.setdefault(normalize_skill(graph.label(node)), node)
+        if first != node and node in covers:
+            covers.setdefault(first, []).extend(covers.pop(node))
+    items = list(chosen.values())
+    if len(items) < WEEKS:
+        return None
+
+    weights = {n: 2 if n in covers else 1 for n in items}
+    milestones = []
+    level = 0
+    for week, group in enumerate(_pack(items, weights), start=1):
+        labels = [graph.label(n) for n in group]
+        gaps = [s for n in group for s in covers.get(n, [])]
+        if week == WEEKS and unplaced:
+            labels += unplaced
+            gaps += unplaced
+        title = f"Week {week}: " + (_join(labels) if len(labels) <= 3 else f"{labels[0]}, {labels[1]} and {len(labels) - 2} more")
+        description = f"Cover {_join(labels)}."
+        if gaps:
+            description += f" Closes your gaps in {_join(list(dict.fromkeys(gaps)))}."
+        else:
+            description += " Prerequisites for the skills in the following weeks."
+        # Difficulty follows how deep into the roadmap the week sits, never going back down
+        depth = sum(group) / len(group) / max(1, len(graph.nodes) - 1)
+        level = max(level, min(len(_DIFFICULTY) - 1, int(depth * len(_DIFFICULTY))))
+        milestones.append({
+            "title": title,
+            "description": description,
+            "difficulty": _DIFFICULTY[level],
+            "topics": labels,
+            "skills": list(dict.fromkeys(gaps)),
+        })
+    return milestones
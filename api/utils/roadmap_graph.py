@@ -0,0 +1,183 @@
+"""
+Compact roadmap.sh graphs for /api/roadmap-graph/<roadmap_id>.
+
+roadmap.sh publishes each roadmap as reactflow JSON where every node and edge carries positional,
+selection and styling fields the dashboard never reads. This module reduces a roadmap to what
+RoadmapShFlowchart renders and encodes it once per roadmap id:
+
+    {
+      "v": 1,
+      "roadmap_id": "frontend",
+      "labels": ["", "Internet", ...],            # interned node labels
+      "node_types": ["title", "topic", ...],      # interned node types
+      "nodes": [[type, label, x, y, w, h], ...],  # node id = list index, topological then top-down
+      "edge_styles": [[type, stroke, width, dashed], ...],
+      "edges": [[source, target, style], ...]     # sorted by source, then target
+    }
+
+The encoded body, its gzip form and their ETags are kept in memory so repeat requests cost a dict
+lookup, and clients that send If-None-Match get a 304.
+"""
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from api.utils.deadline import Deadline
+from api.utils.learning_path import ROADMAP_ID_MAP, fetch_roadmapsh_raw
+
+FORMAT_VERSION = 1
+REFRESH_S = float(os.getenv("ROADMAP_GRAPH_REFRESH_SECONDS", str(24 * 3600)))
+# Only roadmaps the app links to are fetched; any other id is a 404 without a request to GitHub
+KNOWN_ROADMAP_IDS = frozenset(ROADMAP_ID_MAP.values())
+
+
+class _Interner:
+    __slots__ = ("ids", "values")
+
+    def __init__(self):
+        self.ids: dict[Any, int] = {}
+        self.values: list[Any] = []
+
+    def __call__(self, value: Any) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def _num(value: Any) -> int | None:
+    return round(value) if isinstance(value, (int, float)) else None
+
+
+def _topological_order(priority: list[tuple], edges: list[tuple[int, int]]) -> list[int]:
+    """
+    Kahn's algorithm; among ready nodes the lowest priority (layout position) goes first, so the order
+    also reads top to bottom. Nodes left in cycles are appended in priority order.
+    """
+    n = len(priority)
+    indegree = [0] * n
+    children: list[list[int]] = [[] for _ in range(n)]
+    for s, t in edges:
+        children[s].append(t)
+        indegree[t] += 1
+    ready = [(priority[i], i) for i in range(n) if not indegree[i]]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        _, i = heapq.heappop(ready)
+        order.append(i)
+        for c in children[i]:
+            indegree[c] -= 1
+            if not indegree[c]:
+                heapq.heappush(ready, (priority[c], c))
+    if len(order) < n:
+        placed = set(order)
+        order.extend(sorted((i for i in range(n) if i not in placed), key=lambda i: (priority[i], i)))
+    return order
+
+
+class RoadmapGraph:
+    """A roadmap.sh graph with integer node ids, plus its encoded compact payload."""
+
+    def __init__(self, roadmap_id: str, raw: dict[str, Any]):
+        raw_nodes = [n for n in raw.get("nodes") or [] if isinstance(n, dict) and n.get("id") is not None]
+        position = {str(n["id"]): i for i, n in enumerate(raw_nodes)}
+        raw_edges = []
+        for e in raw.get("edges") or []:
+            if not isinstance(e, dict):
+                continue
+            s, t = position.get(str(e.get("source"))), position.get(str(e.get("target")))
+            if s is not None and t is not None and s != t:
+                raw_edges.append((s, t, e))
+
+        layout = []
+        for n in raw_nodes:
+            pos = n.get("position") or {}
+            layout.append((_num(pos.get("y")) or 0, _num(pos.get("x")) or 0))
+        order = _topological_order(layout, [(s, t) for s, t, _ in raw_edges])
+        new_id = {old: new for new, old in enumerate(order)}
+
+        labels, types, styles = _Interner(), _Interner(), _Interner()
+        labels("")
+        self.roadmap_id = roadmap_id
+        self.nodes: list[list[Any]] = []
+        for old in order:
+            n = raw_nodes[old]
+            pos = n.get("position") or {}
+            self.nodes.append([
+                types(n.get("type") or "paragraph"),
+                labels(str((n.get("data") or {}).get("label") or "").strip()),
+                _num(pos.get("x")) or 0,
+                _num(pos.get("y")) or 0,
+                _num(n.get("width")),
+                _num(n.get("height")),
+            ])
+        edges = set()
+        for s, t, e in raw_edges:
+            style = e.get("style") or {}
+            edges.add((new_id[s], new_id[t], styles((
+                "step" if e.get("type") == "step" else "smoothstep",
+                style.get("stroke") or None,
+                style.get("strokeWidth") if isinstance(style.get("strokeWidth"), (int, float)) else None,
+                (e.get("data") or {}).get("edgeStyle") == "dashed",
+            ))))
+        self.edges: list[tuple[int, int, int]] = sorted(edges)
+        self.parents: list[list[int]] = [[] for _ in self.nodes]
+        for s, t, _ in self.edges:
+            self.parents[t].append(s)
+        self.labels: list[str] = labels.values
+        self.node_types: list[str] = types.values
+        self.edge_styles: list[tuple] = styles.values
+
+        self.body = json.dumps(self.payload(), separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f"rg{FORMAT_VERSION}-{digest}"
+        self.gzip_etag = f"{self.etag}-gz"
+        self.built_at = time.time()
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "v": FORMAT_VERSION,
+            "roadmap_id": self.roadmap_id,
+            "labels": self.labels,
+            "node_types": self.node_types,
+            "nodes": self.nodes,
+            "edge_styles": [list(s) for s in self.edge_styles],
+            "edges": [list(e) for e in self.edges],
+        }
+
+    def label(self, node: int) -> str:
+        return self.labels[self.nodes[node][1]]
+
+    def node_type(self, node: int) -> str:
+        return self.node_types[self.nodes[node][0]]
+
+
+_graphs: dict[str, RoadmapGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_roadmap_graph(roadmap_id: str, deadline: Deadline | None = None) -> RoadmapGraph | None:
+    """
+    The compact graph for a roadmap.sh id, built on first use and rebuilt after REFRESH_S.
+    Returns None for ids outside ROADMAP_ID_MAP or when roadmap.sh can't be reached (a stale graph is served then).
+    """
+    if roadmap_id not in KNOWN_ROADMAP_IDS:
+        return None
+    cached = _graphs.get(roadmap_id)
+    if cached and time.time() - cached.built_at < REFRESH_S:
+        return cached
+    raw = fetch_roadmapsh_raw(roadmap_id, deadline)
+    if not raw:
+        return cached
+    graph = RoadmapGraph(roadmap_id, raw)
+    with _graphs_lock:
+        _graphs[roadmap_id] = graph
+    return graph
@@ -0,0 +1,297 @@
+"""
+Role-similarity graph for career pivot suggestions in /api/career-assessment.
+
+The role universe is ROLE_TITLES, the role roadmaps of learning_path.ROADMAP_ID_MAP with the title
+each is shown under. Offline, each roadmap's topic list (fetch_roadmapsh_topics) is normalized into a
+shared topic vocabulary and every pair of roles is scored by cosine similarity of their topic sets;
+the result is written to ROLE_GRAPH_PATH:
+
+    {
+      "v": 1,
+      "built_at": "2026-10-19T08:00:00+00:00",
+      "topics": [{"name": "react", "forms": ["react", "react.js"]}, ...],  # vocabulary
+      "roles": [{"id": "frontend", "title": "Frontend Developer", "topics": [0, 4, ...]}, ...],
+      "similar": [[[role, cosine], ...], ...]    # per role, most similar roles first
+    }
+
+At request time each role is a bitmask over the vocabulary, so overlap is one AND and a popcount.
+The topics present in a resume are found by a SkillMatcher (skill_matcher.py) over every topic's
+surface forms, so short names ("Go", "C", "R") only count as written or in capitals and everyday
+words like "next" never do. Alternatives are ranked by how much of each role the resume already
+covers and how close that role sits to the target: a few microseconds per role, and the same answer
+for the same resume.
+
+    python -m api.utils.role_graph build [--out api/data/role_graph.json]
+
+Requests only read ROLE_GRAPH_PATH, which ships with the deployment. When no file has been built,
+the first request that asks for the graph starts building it in the background from the
+shared-cached roadmap.sh topics (ROLE_GRAPH_LAZY_BUILD=0 turns this off) and keeps the result in the
+shared cache for the other workers; nothing is written to the (possibly read-only) filesystem. Until
+then the assessment prompt keeps asking Gemini for pivot alternatives.
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from api.utils.learning_path import SKILL_ALIASES, normalize_skill
+from api.utils.shared_cache import get_shared_cache
+from api.utils.skill_matcher import SkillMatcher, get_skill_matcher
+
+FORMAT_VERSION = 1
+ROLE_GRAPH_PATH = os.getenv(
+    "ROLE_GRAPH_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "role_graph.json")
+)
+SIMILAR_PER_ROLE = 8
+PIVOT_LIMIT = 3
+# Match = COVERAGE_WEIGHT * resume coverage of the role + the rest * similarity to the target role
+COVERAGE_WEIGHT = 0.6
+# Roadmaps run from basics to advanced topics; covering this share of one counts as full coverage
+COVERAGE_SATURATION = 0.5
+LAZY_BUILD = os.getenv("ROLE_GRAPH_LAZY_BUILD", "1") != "0"
+# A lazy build that found no topics (roadmap.sh unreachable) is tried again after this long
+LAZY_BUILD_RETRY_S = 3600.0
+_SHARED_TTL_S = 7 * 24 * 3600
+_SHORT_FORM_CHARS = 2
+# roadmap id -> the role title pivots are shown under. Each title is a ROADMAP_ID_MAP key for its own
+# roadmap, so a suggested pivot can be sent back as a target role. Subject roadmaps (system-design)
+# are not roles and are left out.
+ROLE_TITLES = {
+    "frontend": "Frontend Developer",
+    "react": "React Developer",
+    "vue": "Vue Developer",
+    "angular": "Angular Developer",
+    "backend": "Backend Developer",
+    "nodejs": "Node.js Developer",
+    "python": "Python Developer",
+    "java": "Java Developer",
+    "spring-boot": "Spring Boot Developer",
+    "golang": "Golang Developer",
+    "rust": "Rust Developer",
+    "full-stack": "Full Stack Developer",
+    "devops": "DevOps Engineer",
+    "aws": "AWS Engineer",
+    "data-analyst": "Data Analyst",
+    "mlops": "MLOps Engineer",
+    "ai-data-scientist": "AI Data Scientist",
+    "android": "Android Developer",
+    "ios": "iOS Developer",
+    "react-native": "React Native Developer",
+    "flutter": "Flutter Developer",
+    "software-design-architecture": "Software Architect",
+    "qa": "QA Engineer",
+    "cyber-security": "Cyber Security Engineer",
+    "blockchain": "Blockchain Developer",
+    "game-developer": "Game Developer",
+    "ux-design": "UX Designer",
+    "product-manager": "Product Manager",
+    "technical-writing": "Technical Writer",
+}
+
+
+def _popcount(mask: int) -> int:
+    return mask.bit_count()
+
+
+def _cosine(a: int, b: int) -> float:
+    na, nb = _popcount(a), _popcount(b)
+    return _popcount(a & b) / math.sqrt(na * nb) if na and nb else 0.0
+
+
+def build_graph(roles: dict[str, str], topics_by_role: dict[str, list[str]]) -> dict[str, Any]:
+    """Graph document for {roadmap id: title} given each roadmap's topic labels."""
+    vocab: dict[str, int] = {}
+    forms: list[set[str]] = []
+    role_rows: list[dict[str, Any]] = []
+    for roadmap_id, title in roles.items():
+        indices: set[int] = set()
+        for label in topics_by_role.get(roadmap_id) or []:
+            name = normalize_skill(label)
+            if not name:
+                continue
+            if name not in vocab:
+                vocab[name] = len(vocab)
+                forms.append({name})
+            forms[vocab[name]].add(" ".join(label.lower().split()))
+            indices.add(vocab[name])
+        if indices:
+            role_rows.append({"id": roadmap_id, "title": title, "topics": sorted(indices)})
+
+    masks = [sum(1 << i for i in row["topics"]) for row in role_rows]
+    similar = []
+    for i, mask in enumerate(masks):
+        scored = [(j, _cosine(mask, other)) for j, other in enumerate(masks) if j != i]
+        scored = sorted((s for s in scored if s[1] > 0), key=lambda s: -s[1])[:SIMILAR_PER_ROLE]
+        similar.append([[j, round(score, 4)] for j, score in scored])
+
+    return {
+        "v": FORMAT_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "topics": [{"name": name, "forms": sorted(forms[i])} for name, i in vocab.items()],
+        "roles": role_rows,
+        "similar": similar,
+    }
+
+
+class RoleGraph:
+    def __init__(self, doc: dict[str, Any]):
+        self.roles = doc["roles"]
+        self.masks = [sum(1 << i for i in row["topics"]) for row in self.roles]
+        self.sizes = [_popcount(m) for m in self.masks]
+        self.similar = [{j: score for j, score in row} for row in doc["similar"]]
+        self._by_id = {row["id"]: i for i, row in enumerate(self.roles)}
+
+        # Canonical topic name -> index. The matcher gets every stored form, the skill aliases and the
+        # known spellings (skills table, catalog) folding to a topic; stored forms are lowercase, so
+        # short ones are capitalized to keep "go" and "c" in ordinary prose from matching
+        self._topic_index = {t["name"]: i for i, t in enumerate(doc["topics"])}
+        spellings = [
+            form[:1].upper() + form[1:] if len(form) <= _SHORT_FORM_CHARS else form
+            for topic in doc["topics"]
+            for form in topic["forms"]
+        ]
+        spellings += [alias for alias, canonical in SKILL_ALIASES.items() if canonical in self._topic_index]
+        spellings += [n for n in get_skill_matcher().names if normalize_skill(n) in self._topic_index]
+        self._matcher = SkillMatcher(spellings)
+
+    def present_mask(self, text: str) -> int:
+        """Bitmask of the vocabulary topics mentioned in text."""
+        mask = 0
+        for canonical in self._matcher.canonical_in(text):
+            index = self._topic_index.get(canonical)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def suggest_pivots(self, target_role: str, resume_text: str, limit: int = PIVOT_LIMIT) -> list[dict[str, Any]]:
+        """[{"role", "match"}] for the best alternative roles, highest match first."""
+        from api.utils.learning_path import get_roadmapsh_id
+
+        target = self._by_id.get(get_roadmapsh_id(target_role) or "")
+        similar = self.similar[target] if target is not None else {}
+        present = self.present_mask(resume_text)
+        scored = []
+        for i, mask in enumerate(self.masks):
+            if i == target or not self.sizes[i]:
+                continue
+            coverage = min(1.0, _popcount(present & mask) / (self.sizes[i] * COVERAGE_SATURATION))
+            match = COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * similar.get(i, 0.0)
+            scored.append((match, i))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [{"role": self.roles[i]["title"], "match": round(100 * match)} for match, i in scored[:limit] if match > 0]
+
+
+_graph: RoleGraph | None = None
+_file_checked = False
+_build_started_at: float | None = None
+_graph_lock = threading.Lock()
+
+
+def collect_topics(workers: int = 8) -> tuple[dict[str, str], dict[str, list[str]]]:
+    """({roadmap id: title}, {roadmap id: topic labels}) for every role roadmap."""
+    from api.utils.learning_path import fetch_roadmapsh_topics
+
+    roles = dict(ROLE_TITLES)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        topics = dict(zip(roles, pool.map(fetch_roadmapsh_topics, roles.values())))
+    return roles, topics
+
+
+def _write(doc: dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _load_file() -> RoleGraph | None:
+    try:
+        with open(ROLE_GRAPH_PATH, encoding="utf-8") as f:
+            doc = json.load(f)
+        if doc.get("v") == FORMAT_VERSION and doc.get("roles"):
+            return RoleGraph(doc)
+    except FileNotFoundError:
+        print(f"Role graph not built ({ROLE_GRAPH_PATH}); pivot alternatives come from Gemini")
+    except Exception as e:
+        print(f"Role graph load failed: {e}")
+    return None
+
+
+def _load_shared() -> RoleGraph | None:
+    shared = get_shared_cache()
+    if not shared:
+        return None
+    try:
+        doc = shared.get("role_graph", str(FORMAT_VERSION))
+        return RoleGraph(doc) if doc and doc.get("roles") else None
+    except Exception as e:
+        print(f"Role graph shared cache read failed: {e}")
+        return None
+
+
+def _lazy_build() -> None:
+    global _graph
+    try:
+        roles, topics = collect_topics()
+        if not any(topics.values()):
+            print(f"Role graph build found no roadmap.sh topics; retrying in {LAZY_BUILD_RETRY_S:.0f}s")
+            return
+        doc = build_graph(roles, topics)
+        graph = RoleGraph(doc)
+        shared = get_shared_cache()
+        if shared:
+            shared.set("role_graph", str(FORMAT_VERSION), doc, _SHARED_TTL_S)
+        _graph = graph
+        print(f"Role graph built: {len(doc['roles'])} roles, {len(doc['topics'])} topics")
+    except Exception as e:
+        print(f"Role graph build failed: {e}")
+
+
+def get_role_graph() -> RoleGraph | None:
+    """
+    The graph from ROLE_GRAPH_PATH, or built by another worker (shared cache), loaded once per process.
+    None while it hasn't been built; the first such call starts a background build (LAZY_BUILD).
+    """
+    global _graph, _file_checked, _build_started_at
+    if _graph is not None:
+        return _graph
+    with _graph_lock:
+        if _graph is None and not _file_checked:
+            _graph = _load_file()
+            _file_checked = True
+        if _graph is None:
+            _graph = _load_shared()
+        now = time.monotonic()
+        if _graph is None and LAZY_BUILD and (
+            _build_started_at is None or now - _build_started_at > LAZY_BUILD_RETRY_S
+        ):
+            _build_started_at = now
+            threading.Thread(target=_lazy_build, name="role-graph-build", daemon=True).start()
+    return _graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the role-similarity graph from roadmap.sh topics.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", default=ROLE_GRAPH_PATH)
+    args = parser.parse_args()
+
+    roles, topics = collect_topics()
+    missing = [rid for rid, t in topics.items() if not t]
+    if len(missing) == len(roles):
+        raise SystemExit("No roadmap.sh topics fetched; graph not written")
+    doc = build_graph(roles, topics)
+    _write(doc, args.out)
+    print(f"Wrote {len(doc['roles'])} roles, {len(doc['topics'])} topics to {args.out}")
+    if missing:
+        print(f"No topics for: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
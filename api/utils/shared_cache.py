@@ -0,0 +1,152 @@
+"""
+Host-wide cache shared by every API worker process.
+
+Production runs several workers, and in-process memoization leaves each one warming its own copy.
+This tier keeps JSON values in one SQLite file in WAL mode: readers never block the writer or each
+other, and with mmap_size set, reads come from the OS page cache mapped into every process instead
+of a per-worker copy. Each write is one INSERT OR REPLACE, so readers see the old value or the new
+one, never a partial write. Entries expire after their TTL; expired rows read as misses and are
+deleted every PRUNE_INTERVAL_S.
+
+Callers use the @shared_cached(namespace, ttl_s) decorator or get() / set() directly. Currently
+cached: roadmap.sh payloads (learning_path.py), per-portal search results (job_search_serp.py) and
+Gemini responses to identical prompts (gemini.py). Set SHARED_CACHE_PATH to move the database, or to
+an empty string to disable the tier (every call then goes to its source).
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable
+
+MMAP_BYTES = 256 * 1024 * 1024
+PRUNE_INTERVAL_S = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at);
+"""
+
+_MISSING = object()
+
+
+class SharedCache:
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._init_lock = threading.Lock()
+        self._ready = False
+        self._local = threading.local()
+        self._last_prune = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork (a connection can't cross processes)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._conn().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl_s: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, separators=(",", ":")), now + ttl_s),
+        )
+        if now - self._last_prune > PRUNE_INTERVAL_S:
+            self._last_prune = now
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._conn().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+
+_cache: SharedCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache | None:
+    """Process-wide handle, or None when disabled with an empty SHARED_CACHE_PATH."""
+    global _cache
+    path = os.getenv("SHARED_CACHE_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "skillsphere_shared_cache.sqlite3")
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = SharedCache(path)
+    return _cache
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable key for JSON-serializable parts; long keys (prompts) are hashed."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return raw if len(raw) <= 200 else hashlib.sha256(raw.encode()).hexdigest()
+
+
+def shared_cached(
+    namespace: str,
+    ttl_s: float,
+    key: Callable[..., Any] | None = None,
+    cache_if: Callable[[Any], bool] = lambda value: value is not None,
+):
+    """
+    Memoizes a function in the shared cache. `key` maps the call's arguments to the cached identity
+    (default: all positional arguments); only results passing `cache_if` are stored, so failures
+    (None, []) are retried by the next caller. Cache errors fall through to the function.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_shared_cache()
+            if cache is None:
+                return fn(*args, **kwargs)
+            k = cache_key(key(*args, **kwargs) if key else args)
+            try:
+                value = cache.get(namespace, k, _MISSING)
+                if value is not _MISSING:
+                    return value
+            except Exception as e:
+                print(f"Shared cache read failed ({namespace}): {e}")
+            value = fn(*args, **kwargs)
+            if cache_if(value):
+                try:
+                    cache.set(namespace, k, value, ttl_s)
+                except Exception as e:
+                    print(f"Shared cache write failed ({namespace}): {e}")
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,104 @@
+"""
+Finds known skill names in free text with one compiled pattern.
+
+The vocabulary is every name in the skills table plus the curated catalog and aliases in
+learning_path.py. Each name is indexed under its lowercased form, and names that normalize_skill folds
+together ("React", "React.js", "ReactJS") report one display name, the first skills-table spelling.
+Forms are tried longest first so "react native" wins over "react". Names of one or two characters
+("C", "R", "Go", "JS") only match as written or in capitals, since lowercase they are ordinary words.
+"""
+import os
+import re
+import threading
+import time
+from typing import Iterable
+
+from api.utils.learning_path import RESOURCE_CATALOG, SKILL_ALIASES, normalize_skill
+
+VOCAB_REFRESH_S = float(os.getenv("SKILL_VOCAB_REFRESH_SECONDS", "3600"))
+# Longer rows in the skills table are descriptions, not skill names
+MAX_NAME_CHARS = 40
+_SHORT_FORM_CHARS = 2
+# Aliases that are everyday words in resume prose ("next steps")
+_AMBIGUOUS = {"next"}
+
+
+def _boundary_pattern(forms: Iterable[str], flags: int = 0) -> re.Pattern | None:
+    alternation = "|".join(re.escape(f) for f in sorted(set(forms), key=len, reverse=True))
+    if not alternation:
+        return None
+    return re.compile(rf"(?<![A-Za-z0-9+#])(?:{alternation})(?![A-Za-z0-9+#])", flags)
+
+
+class SkillMatcher:
+    def __init__(self, names: Iterable[str]):
+        self.display: dict[str, str] = {}  # canonical -> display name
+        self._canonical: dict[str, str] = {}  # matched form -> canonical
+        self.names: list[str] = []  # accepted names, in input order
+        short_forms: set[str] = set()
+        for name in names:
+            name = " ".join(str(name).split())
+            if not name or len(name) > MAX_NAME_CHARS or not re.search(r"[A-Za-z0-9]", name):
+                continue
+            if name.lower() in _AMBIGUOUS:
+                continue
+            canonical = normalize_skill(name)
+            self.display.setdefault(canonical, name)
+            self.names.append(name)
+            if len(name) <= _SHORT_FORM_CHARS:
+                for form in (name, name.upper()):
+                    short_forms.add(form)
+                    self._canonical.setdefault(form, canonical)
+            else:
+                self._canonical.setdefault(name.lower(), canonical)
+        self._pattern = _boundary_pattern([f for f in self._canonical if f not in short_forms], re.IGNORECASE)
+        self._short_pattern = _boundary_pattern(short_forms)
+
+    def __len__(self) -> int:
+        return len(self.display)
+
+    def canonical_in(self, text: str) -> list[str]:
+        """Canonical names of the skills mentioned in text, in order of first mention."""
+        text = " ".join(text.split())
+        hits: list[tuple[int, str]] = []
+        if self._pattern:
+            hits += [(m.start(), self._canonical[m.group(0).lower()]) for m in self._pattern.finditer(text)]
+        if self._short_pattern:
+            hits += [(m.start(), self._canonical[m.group(0)]) for m in self._short_pattern.finditer(text)]
+        return list(dict.fromkeys(canonical for _, canonical in sorted(hits)))
+
+    def find(self, text: str) -> list[str]:
+        """Display names of the skills mentioned in text, in order of first mention."""
+        return [self.display[c] for c in self.canonical_in(text)]
+
+
+_matcher: SkillMatcher | None = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def _table_skill_names() -> list[str]:
+    from api.utils.storage import get_storage
+
+    storage = get_storage()
+    if not storage:
+        return []
+    try:
+        return storage.skill_names()
+    except Exception as e:
+        print(f"Skill vocabulary: skills table unavailable ({e}); using the built-in catalog only")
+        return []
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Process-wide matcher over the skills table and catalog, rebuilt every VOCAB_REFRESH_S."""
+    global _matcher, _built_at
+    if _matcher is not None and time.monotonic() - _built_at < VOCAB_REFRESH_S:
+        return _matcher
+    with _lock:
+        if _matcher is None or time.monotonic() - _built_at >= VOCAB_REFRESH_S:
+            # Table spellings first so they become the display names
+            names = [*_table_skill_names(), *RESOURCE_CATALOG, *SKILL_ALIASES]
+            _matcher = SkillMatcher(names)
+            _built_at = time.monotonic()
+    return _matcher
@@ -0,0 +1,720 @@
+"""
+Repository layer between the route handlers and the database.
+
+Handlers call get_storage() and use the methods below instead of building Supabase queries inline.
+Two backends implement them:
+
+- SupabaseStorage: the production Postgres tables (STORAGE_BACKEND=supabase, the default).
+- SQLiteStorage: the same tables in a local SQLite file (STORAGE_BACKEND=sqlite, STORAGE_SQLITE_PATH),
+  for offline development and tests without a Supabase project.
+
+Either backend is wrapped in CachedStorage, a per-user read-through cache for the small, hot reads
+(latest assessment, learning progress, job applications and their summary). Writes made through this
+layer invalidate the user's entries right away in every worker process: each entry remembers the
+user's version stamp in the shared cache (shared_cache.py) it was loaded under, writes replace the
+stamp, and a hit whose stamp no longer matches is reloaded. Rows written elsewhere (the Next.js
+server actions insert assessments directly) show up within STORAGE_CACHE_SECONDS.
+"""
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any
+
+from api.utils.shared_cache import cache_key, get_shared_cache
+from api.utils.supabase_client import get_supabase
+
+CACHE_TTL_S = float(os.getenv("STORAGE_CACHE_SECONDS", "30"))
+CACHE_MAX_USERS = 5000
+
+JOB_APPLICATION_FIELDS = (
+    "company", "role", "applied_at", "status", "optimal_follow_up_at", "follow_up_sent",
+    "notes", "job_url", "recruiter_email", "last_follow_up_at",
+)
+# Statuses that mean the company answered; the first move into one sets responded_at
+RESPONSE_STATUSES = ("interview_called", "shortlisted", "interviewing", "offer", "rejected")
+FOLLOW_UP_DUE_SOON_DAYS = 2
+FOLLOW_UP_OVERDUE_DAYS = 3
+# Follow-ups listed per bucket in the summary's "due" (fixed at 20 in migration 006 too)
+FOLLOW_UP_DUE_LIMIT = 20
+# What CachedStorage caches per user; each has its own version stamp in the shared cache
+CACHED_KINDS = ("assessment", "progress", "applications", "summary")
+_STAMP_NAMESPACE = "storage_stamp"
+
+
+class Storage(ABC):
+    """Operations the API needs from the database; a backend missing any of them can't be constructed."""
+
+    @abstractmethod
+    def latest_assessment(self, user_id: str) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_assessments(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def assessments_since(self, created_after: str, limit: int = 100) -> list[dict[str, Any]]:
+        """Assessments created after an ISO timestamp, oldest first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def popular_roles(self, limit: int) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def learning_progress(self, user_id: str) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_milestone(self, user_id: str, milestone_title: str, completed: bool) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_profile(self, profile: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def replace_user_skills(self, user_id: str, skill_names: list[str]) -> None:
+        """Makes the user's skills exactly skill_names, creating missing rows in the skills table."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def skill_names(self) -> list[str]:
+        """Every name in the skills table (the vocabulary for local skill matching)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def job_applications(self, user_id: str) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_job_application(self, row: dict[str, Any]) -> dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_job_application(self, user_id: str, application_id: str, fields: dict[str, Any]) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_job_application(self, user_id: str, application_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def job_application_summary(self, user_id: str) -> dict[str, Any]:
+        """
+        {"total", "by_status", "follow_ups", "due", "response_time"}, aggregated by the database. "due"
+        lists the pending follow-ups in the "now" and "soon" buckets (id, company, role,
+        optimal_follow_up_at, recruiter_email), soonest first, so the dashboard needs no full list.
+        """
+        raise NotImplementedError
+
+
+class SupabaseStorage(Storage):
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    def latest_assessment(self, user_id):
+        res = self.supabase.table('user_assessments')\
+            .select('*')\
+            .eq('user_id', user_id)\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+        return res.data[0] if res.data else None
+
+    def insert_assessments(self, rows):
+        return self.supabase.table('user_assessments').insert(rows).execute().data or []
+
+    def assessments_since(self, created_after, limit=100):
+        res = self.supabase.table('user_assessments')\
+            .select('target_role, feedback, created_at')\
+            .gt('created_at', created_after)\
+            .order('created_at')\
+            .limit(limit)\
+            .execute()
+        return res.data or []
+
+    def popular_roles(self, limit):
+        # role_assessment_counts is maintained by the trigger in migration 005
+        res = self.supabase.table('role_assessment_counts')\
+            .select('target_role')\
+            .order('assessments', desc=True)\
+            .limit(limit)\
+            .execute()
+        return [r['target_role'] for r in res.data or [] if r.get('target_role')]
+
+    def learning_progress(self, user_id):
+        res = self.supabase.table('user_learning_progress')\
+            .select('milestone_title, completed')\
+            .eq('user_id', user_id)\
+            .execute()
+        return res.data or []
+
+    def set_milestone(self, user_id, milestone_title, completed):
+        if completed:
+            self.supabase.table('user_learning_progress').upsert({
+                "user_id": user_id,
+                "milestone_title": milestone_title,
+                "completed": True
+            }).execute()
+        else:
+            self.supabase.table('user_learning_progress')\
+                .delete()\
+                .eq('user_id', user_id)\
+                .eq('milestone_title', milestone_title)\
+                .execute()
+
+    def upsert_profile(self, profile):
+        self.supabase.table('profiles').upsert(profile).execute()
+
+    def replace_user_skills(self, user_id, skill_names):
+        skill_ids = []
+        for skill_name in skill_names:
+            existing = self.supabase.table('skills').select('id').eq('name', skill_name).execute()
+            if existing.data:
+                skill_ids.append(existing.data[0]['id'])
+            else:
+                new_skill = self.supabase.table('skills').insert({"name": skill_name}).execute()
+                if new_skill.data:
+                    skill_ids.append(new_skill.data[0]['id'])
+
+        # Full sync: delete the user's skills and re-insert
+        self.supabase.table('user_skills').delete().eq('user_id', user_id).execute()
+        user_skills_data = [{"user_id": user_id, "skill_id": sid, "proficiency": 3} for sid in skill_ids]
+        if user_skills_data:
+            self.supabase.table('user_skills').insert(user_skills_data).execute()
+
+    def skill_names(self):
+        res = self.supabase.table('skills').select('name').execute()
+        return [r['name'] for r in res.data or [] if r.get('name')]
+
+    def job_applications(self, user_id):
+        res = self.supabase.table('job_applications')\
+            .select('*')\
+            .eq('user_id', user_id)\
+            .order('applied_at', desc=True)\
+            .execute()
+        return res.data or []
+
+    def create_job_application(self, row):
+        res = self.supabase.table('job_applications').insert(row).execute()
+        return res.data[0] if res.data else row
+
+    def update_job_application(self, user_id, application_id, fields):
+        res = self.supabase.table('job_applications')\
+            .update(fields)\
+            .eq('id', application_id)\
+            .eq('user_id', user_id)\
+            .execute()
+        return res.data[0] if res.data else None
+
+    def delete_job_application(self, user_id, application_id):
+        self.supabase.table('job_applications')\
+            .delete()\
+            .eq('id', application_id)\
+            .eq('user_id', user_id)\
+            .execute()
+
+    def job_application_summary(self, user_id):
+        # Postgres function from migration 006
+        res = self.supabase.rpc('job_application_summary', {
+            "p_user_id": user_id,
+            "p_due_soon_days": FOLLOW_UP_DUE_SOON_DAYS,
+            "p_overdue_days": FOLLOW_UP_OVERDUE_DAYS,
+        }).execute()
+        return res.data
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_assessments (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    target_role TEXT,
+    resume_text TEXT,
+    score INTEGER,
+    feedback TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_user ON user_assessments(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_created ON user_assessments(created_at);
+CREATE TABLE IF NOT EXISTS user_learning_progress (
+    user_id TEXT NOT NULL,
+    milestone_title TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (user_id, milestone_title)
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skills (
+    id TEXT PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_skills (
+    user_id TEXT NOT NULL,
+    skill_id TEXT NOT NULL REFERENCES skills(id) ON DELETE CASCADE,
+    proficiency INTEGER,
+    PRIMARY KEY (user_id, skill_id)
+);
+CREATE TABLE IF NOT EXISTS job_applications (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    company TEXT NOT NULL,
+    role TEXT NOT NULL,
+    applied_at TEXT NOT NULL,
+    status TEXT DEFAULT 'applied',
+    optimal_follow_up_at TEXT,
+    follow_up_sent INTEGER DEFAULT 0,
+    notes TEXT,
+    job_url TEXT,
+    recruiter_email TEXT,
+    last_follow_up_at TEXT,
+    responded_at TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_applications_user ON job_applications(user_id, applied_at);
+"""
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _resolve_now(row: dict[str, Any]) -> dict[str, Any]:
+    """Handlers send the Postgres literal "now()" for timestamps; SQLite needs a value."""
+    return {k: _now_iso() if v == "now()" else v for k, v in row.items()}
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(_SQLITE_SCHEMA)
+                    columns = {r["name"] for r in conn.execute("PRAGMA table_info(job_applications)")}
+                    if "responded_at" not in columns:
+                        conn.execute("ALTER TABLE job_applications ADD COLUMN responded_at TEXT")
+                    self._ready = True
+        return conn
+
+    def _query(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _assessment(row: sqlite3.Row) -> dict[str, Any]:
+        out = dict(row)
+        if "feedback" in out:
+            out["feedback"] = json.loads(out["feedback"]) if out["feedback"] else None
+        return out
+
+    @staticmethod
+    def _application(row: sqlite3.Row) -> dict[str, Any]:
+        out = dict(row)
+        out["follow_up_sent"] = bool(out.get("follow_up_sent"))
+        return out
+
+    def latest_assessment(self, user_id):
+        rows = self._query(
+            "SELECT * FROM user_assessments WHERE user_id = ? ORDER BY created_at DESC LIMIT 1", (user_id,)
+        )
+        return self._assessment(rows[0]) if rows else None
+
+    def insert_assessments(self, rows):
+        out = []
+        conn = self._connect()
+        try:
+            with conn:
+                for row in rows:
+                    row = {"id": str(uuid.uuid4()), "created_at": _now_iso(), **_resolve_now(row)}
+                    conn.execute(
+                        """
+                        INSERT INTO user_assessments (id, user_id, target_role, resume_text, score, feedback, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (row["id"], row["user_id"], row.get("target_role"), row.get("resume_text"),
+                         row.get("score"), json.dumps(row.get("feedback")), row["created_at"]),
+                    )
+                    out.append(row)
+        finally:
+            conn.close()
+        return out
+
+    def assessments_since(self, created_after, limit=100):
+        rows = self._query(
+            """
+            SELECT target_role, feedback, created_at FROM user_assessments
+            WHERE created_at > ? ORDER BY created_at LIMIT ?
+            """,
+            (created_after, limit),
+        )
+        return [self._assessment(r) for r in rows]
+
+    def popular_roles(self, limit):
+        rows = self._query(
+            """
+            SELECT lower(trim(target_role)) AS role FROM user_assessments
+            WHERE coalesce(trim(target_role), '') <> ''
+            GROUP BY role ORDER BY count(*) DESC LIMIT ?
+            """,
+            (limit,),
+        )
+        return [r["role"] for r in rows]
+
+    def learning_progress(self, user_id):
+        rows = self._query(
+            "SELECT milestone_title, completed FROM user_learning_progress WHERE user_id = ?", (user_id,)
+        )
+        return [{"milestone_title": r["milestone_title"], "completed": bool(r["completed"])} for r in rows]
+
+    def set_milestone(self, user_id, milestone_title, completed):
+        conn = self._connect()
+        try:
+            with conn:
+                if completed:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO user_learning_progress (user_id, milestone_title, completed) VALUES (?, ?, 1)",
+                        (user_id, milestone_title),
+                    )
+                else:
+                    conn.execute(
+                        "DELETE FROM user_learning_progress WHERE user_id = ? AND milestone_title = ?",
+                        (user_id, milestone_title),
+                    )
+        finally:
+            conn.close()
+
+    def upsert_profile(self, profile):
+        profile = _resolve_now(profile)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO profiles (user_id, data, updated_at) VALUES (?, ?, ?)",
+                    (profile["user_id"], json.dumps(profile), profile.get("updated_at") or _now_iso()),
+                )
+        finally:
+            conn.close()
+
+    def replace_user_skills(self, user_id, skill_names):
+        conn = self._connect()
+        try:
+            with conn:
+                skill_ids = []
+                for name in skill_names:
+                    conn.execute("INSERT OR IGNORE INTO skills (id, name) VALUES (?, ?)", (str(uuid.uuid4()), name))
+                    skill_ids.append(conn.execute("SELECT id FROM skills WHERE name = ?", (name,)).fetchone()["id"])
+                conn.execute("DELETE FROM user_skills WHERE user_id = ?", (user_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO user_skills (user_id, skill_id, proficiency) VALUES (?, ?, 3)",
+                    [(user_id, sid) for sid in skill_ids],
+                )
+        finally:
+            conn.close()
+
+    def skill_names(self):
+        return [r["name"] for r in self._query("SELECT name FROM skills ORDER BY name")]
+
+    def job_applications(self, user_id):
+        rows = self._query("SELECT * FROM job_applications WHERE user_id = ? ORDER BY applied_at DESC", (user_id,))
+        return [self._application(r) for r in rows]
+
+    def create_job_application(self, row):
+        now = _now_iso()
+        row = {"status": "applied", "follow_up_sent": False, **_resolve_now(row),
+               "id": str(uuid.uuid4()), "created_at": now, "updated_at": now}
+        columns = ["id", "user_id", *JOB_APPLICATION_FIELDS, "created_at", "updated_at"]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO job_applications ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [row.get(c) for c in columns],
+                )
+        finally:
+            conn.close()
+        return {c: row.get(c) for c in columns}
+
+    def update_job_application(self, user_id, application_id, fields):
+        fields = {k: v for k, v in _resolve_now(fields).items() if k in JOB_APPLICATION_FIELDS}
+        if not fields:
+            return None
+        now = _now_iso()
+        responded = fields.get("status") in RESPONSE_STATUSES
+        conn = self._connect()
+        try:
+            with conn:
+                # Same bookkeeping as the job_applications_touch trigger in migration 006
+                cur = conn.execute(
+                    f"UPDATE job_applications SET {', '.join(f'{k} = ?' for k in fields)}, updated_at = ?, "
+                    "responded_at = CASE WHEN responded_at IS NULL AND ? AND status IS NOT ? THEN ? "
+                    "ELSE responded_at END "
+                    "WHERE id = ? AND user_id = ?",
+                    [*fields.values(), now, responded, fields.get("status"), now, application_id, user_id],
+                )
+                if not cur.rowcount:
+                    return None
+                row = conn.execute("SELECT * FROM job_applications WHERE id = ?", (application_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._application(row)
+
+    def delete_job_application(self, user_id, application_id):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM job_applications WHERE id = ? AND user_id = ?", (application_id, user_id))
+        finally:
+            conn.close()
+
+    def job_application_summary(self, user_id):
+        now = _now_iso()
+        pending = (
+            "optimal_follow_up_at IS NOT NULL AND NOT coalesce(follow_up_sent, 0) AND "
+            "(last_follow_up_at IS NULL OR julianday(last_follow_up_at) < julianday(optimal_follow_up_at))"
+        )
+        due = "julianday(optimal_follow_up_at) - julianday(:now)"
+        params = {"user_id": user_id, "now": now,
+                  "soon": FOLLOW_UP_DUE_SOON_DAYS, "overdue": FOLLOW_UP_OVERDUE_DAYS}
+        conn = self._connect()
+        try:
+            by_status = conn.execute(
+                """
+                SELECT coalesce(status, 'applied') AS status, count(*) AS n FROM job_applications
+                WHERE user_id = :user_id GROUP BY 1
+                """,
+                params,
+            ).fetchall()
+            follow_ups = conn.execute(
+                f"""
+                SELECT
+                    count(*) FILTER (WHERE {pending} AND {due} <= 0) AS due_now,
+                    count(*) FILTER (WHERE {pending} AND {due} <= -:overdue) AS overdue,
+                    count(*) FILTER (WHERE {pending} AND {due} > 0 AND {due} <= :soon) AS due_soon,
+                    (SELECT optimal_follow_up_at FROM job_applications
+                     WHERE user_id = :user_id AND {pending} AND {due} > 0
+                     ORDER BY julianday(optimal_follow_up_at) LIMIT 1) AS next_due_at
+                FROM job_applications WHERE user_id = :user_id
+                """,
+                params,
+            ).fetchone()
+            due_rows = conn.execute(
+                f"""
+                SELECT id, company, role, optimal_follow_up_at, recruiter_email, {due} <= 0 AS is_now
+                FROM job_applications
+                WHERE user_id = :user_id AND {pending} AND {due} <= :soon
+                ORDER BY julianday(optimal_follow_up_at), id
+                """,
+                params,
+            ).fetchall()
+            responses = "FROM job_applications WHERE user_id = :user_id AND responded_at IS NOT NULL"
+            days = "julianday(responded_at) - julianday(applied_at)"
+            responded, avg_days = conn.execute(f"SELECT count(*), avg({days}) {responses}", params).fetchone()
+            # Middle one or two values for the median
+            middle = conn.execute(
+                f"SELECT {days} AS d {responses} ORDER BY d LIMIT :n OFFSET :skip",
+                {**params, "n": 2 - responded % 2, "skip": (responded - 1) // 2},
+            ).fetchall() if responded else []
+        finally:
+            conn.close()
+        return {
+            "total": sum(r["n"] for r in by_status),
+            "by_status": {r["status"]: r["n"] for r in by_status},
+            "follow_ups": dict(follow_ups),
+            "due": {
+                bucket: [
+                    {k: r[k] for k in ("id", "company", "role", "optimal_follow_up_at", "recruiter_email")}
+                    for r in due_rows if bool(r["is_now"]) == is_now
+                ][:FOLLOW_UP_DUE_LIMIT]
+                for bucket, is_now in (("now", True), ("soon", False))
+            },
+            "response_time": {
+                "responded": responded,
+                "avg_days": round(avg_days, 1) if avg_days is not None else None,
+                "median_days": round(sum(r["d"] for r in middle) / len(middle), 1) if middle else None,
+            },
+        }
+
+
+class _UserEntry:
+    __slots__ = ("values", "generation")
+
+    def __init__(self):
+        self.values: dict[str, tuple[float, Any, Any]] = {}  # kind -> (loaded at, stamp, value)
+        self.generation = 0
+
+
+class CachedStorage(Storage):
+    """Per-user read-through cache in front of a backend; other operations pass straight through."""
+
+    def __init__(self, backend: Storage, ttl_s: float = CACHE_TTL_S, max_users: int = CACHE_MAX_USERS):
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        self._users: OrderedDict[str, _UserEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, user_id: str) -> _UserEntry:
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = _UserEntry()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+        return entry
+
+    @staticmethod
+    def _stamp(user_id: str, kind: str) -> Any:
+        """The user's shared version stamp for kind; None if never written, a fresh object on errors."""
+        cache = get_shared_cache()
+        if cache is None:
+            return None
+        try:
+            return cache.get(_STAMP_NAMESPACE, cache_key(user_id, kind))
+        except Exception as e:
+            print(f"Storage stamp read failed: {e}")
+            return object()  # matches nothing, so the read goes to the backend
+
+    def _cached(self, user_id: str, kind: str, load) -> Any:
+        now = time.monotonic()
+        # Read before loading: a write in another worker during the load then leaves a newer stamp
+        stamp = self._stamp(user_id, kind)
+        with self._lock:
+            entry = self._entry(user_id)
+            cached = entry.values.get(kind)
+            if cached and now - cached[0] < self.ttl_s and cached[1] == stamp:
+                self.hits += 1
+                return copy.deepcopy(cached[2])
+            generation = entry.generation
+            self.misses += 1
+        value = load()
+        if value is not None:
+            with self._lock:
+                entry = self._entry(user_id)
+                # A write that landed while loading makes this value stale
+                if entry.generation == generation:
+                    entry.values[kind] = (now, stamp, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, user_id: str, *kinds: str) -> None:
+        kinds = kinds or CACHED_KINDS
+        with self._lock:
+            entry = self._entry(user_id)
+            entry.generation += 1
+            for kind in kinds:
+                entry.values.pop(kind, None)
+        cache = get_shared_cache()
+        if cache is None:
+            return
+        stamp = uuid.uuid4().hex
+        try:
+            for kind in kinds:
+                # Outlives any entry loaded under the previous stamp
+                cache.set(_STAMP_NAMESPACE, cache_key(user_id, kind), stamp, 2 * self.ttl_s)
+        except Exception as e:
+            print(f"Storage stamp write failed; other workers may serve {user_id} for {self.ttl_s:.0f}s: {e}")
+
+    def assessments_since(self, created_after, limit=100):
+        return self.backend.assessments_since(created_after, limit)
+
+    def popular_roles(self, limit):
+        return self.backend.popular_roles(limit)
+
+    def upsert_profile(self, profile):
+        self.backend.upsert_profile(profile)
+
+    def replace_user_skills(self, user_id, skill_names):
+        self.backend.replace_user_skills(user_id, skill_names)
+
+    def skill_names(self):
+        return self.backend.skill_names()
+
+    def latest_assessment(self, user_id):
+        # "No assessment yet" is not cached: the first one is often inserted by the frontend directly
+        return self._cached(user_id, "assessment", lambda: self.backend.latest_assessment(user_id))
+
+    def insert_assessments(self, rows):
+        try:
+            return self.backend.insert_assessments(rows)
+        finally:
+            for user_id in {r.get("user_id") for r in rows}:
+                self.invalidate(user_id, "assessment")
+
+    def learning_progress(self, user_id):
+        return self._cached(user_id, "progress", lambda: self.backend.learning_progress(user_id))
+
+    def set_milestone(self, user_id, milestone_title, completed):
+        try:
+            self.backend.set_milestone(user_id, milestone_title, completed)
+        finally:
+            self.invalidate(user_id, "progress")
+
+    def job_applications(self, user_id):
+        return self._cached(user_id, "applications", lambda: self.backend.job_applications(user_id))
+
+    def job_application_summary(self, user_id):
+        return self._cached(user_id, "summary", lambda: self.backend.job_application_summary(user_id))
+
+    def create_job_application(self, row):
+        try:
+            return self.backend.create_job_application(row)
+        finally:
+            self.invalidate(row.get("user_id"), "applications", "summary")
+
+    def update_job_application(self, user_id, application_id, fields):
+        try:
+            return self.backend.update_job_application(user_id, application_id, fields)
+        finally:
+            self.invalidate(user_id, "applications", "summary")
+
+    def delete_job_application(self, user_id, application_id):
+        try:
+            self.backend.delete_job_application(user_id, application_id)
+        finally:
+            self.invalidate(user_id, "applications", "summary")
+
+
+_storage: CachedStorage | None = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> CachedStorage | None:
+    """Process-wide storage for STORAGE_BACKEND, or None when the Supabase backend has no credentials."""
+    global _storage
+    if _storage is not None:
+        return _storage
+    with _storage_lock:
+        if _storage is None:
+            if os.getenv("STORAGE_BACKEND", "supabase").lower() == "sqlite":
+                path = os.getenv("STORAGE_SQLITE_PATH") or os.path.join(tempfile.gettempdir(), "skillsphere.sqlite3")
+                _storage = CachedStorage(SQLiteStorage(path))
+            else:
+                supabase = get_supabase()
+                if supabase:
+                    _storage = CachedStorage(SupabaseStorage(supabase))
+    return _storage
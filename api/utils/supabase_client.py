@@ -0,0 +1,33 @@
+"""
+Lazily-built Supabase client shared by every route.
+
+Importing `supabase` and creating the client costs a few hundred milliseconds, so it is
+deferred until the first handler that actually talks to the database asks for it.
+"""
+import os
+import threading
+from typing import Any
+
+_client: Any = None
+_initialized = False
+_lock = threading.Lock()
+
+
+def get_supabase() -> Any:
+    """Returns the process-wide Supabase client, or None when credentials are missing."""
+    global _client, _initialized
+    if _initialized:
+        return _client
+    with _lock:
+        if _initialized:
+            return _client
+        url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+        key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+        if url and key:
+            from supabase import create_client
+
+            _client = create_client(url, key)
+        else:
+            print(f"Warning: Supabase credentials not found. URL: {url}, Key: {key}")
+        _initialized = True
+    return _client
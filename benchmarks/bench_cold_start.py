@@ -0,0 +1,82 @@
+"""
+Cold-start benchmark for the serverless API entry point.
+
+Each route is measured in a fresh interpreter: time to `import api.index`, latency of the
+first request through Flask's test client, and which heavy dependencies that request pulled in.
+
+    python benchmarks/bench_cold_start.py [--runs 3]
+
+Routes run against whatever credentials are in the environment; without them the Supabase
+routes return 500 early, which still shows the import cost the route would otherwise pay.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["google.genai", "supabase", "fitz", "requests", "api.utils.learning_path"]
+
+ROUTES = [
+    ("GET", "/api/job-applications?user_id=bench-user", None),
+    ("POST", "/api/progress", {"user_id": "bench-user", "milestone_title": "Week 1", "completed": True}),
+    ("GET", "/api/roadmap?target_role=Frontend%20Developer", None),
+    ("GET", "/api/learning-path?user_id=bench-user", None),
+    ("POST", "/api/career-assessment", {"user_id": "bench-user", "target_role": "Data Analyst", "resume_text": "SQL"}),
+    ("POST", "/api/job-openings", {"target_role": "Backend Developer", "skills": ["Python"]}),
+]
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from api.index import app
+t1 = time.perf_counter()
+client = app.test_client()
+method, path, body = json.loads(sys.argv[1])
+resp = client.open(path, method=method, json=body)
+t2 = time.perf_counter()
+heavy = [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_request_ms": (t2 - t1) * 1000,
+                  "status": resp.status_code, "loaded": heavy}))
+"""
+
+
+def _measure(route: tuple, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, json.dumps(route), json.dumps(HEAVY_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "first_request_ms": statistics.median(s["first_request_ms"] for s in samples),
+        "status": samples[-1]["status"],
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per route (median is reported)")
+    args = parser.parse_args()
+
+    print(f"{'route':<48} {'import':>9} {'first req':>10} {'status':>6}  heavy modules loaded")
+    for route in ROUTES:
+        r = _measure(route, args.runs)
+        label = f"{route[0]} {route[1].split('?')[0]}"
+        print(
+            f"{label:<48} {r['import_ms']:>7.1f}ms {r['first_request_ms']:>8.1f}ms {r['status']:>6}  "
+            f"{', '.join(r['loaded']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
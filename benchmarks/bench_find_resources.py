@@ -0,0 +1,41 @@
+"""
+Resource lookup benchmark: per-skill find_resources() calls vs one find_resources_batch() call.
+
+    python benchmarks/bench_find_resources.py [--skills 120] [--repeat 200]
+
+The skill list mixes catalog hits, aliases ("JS", "ReactJS", "Postgres") and unknown skills,
+the way /api/learning-path sees them from assessments.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.utils.learning_path import RESOURCE_CATALOG, SKILL_ALIASES, find_resources, find_resources_batch
+
+ROLE = "Full Stack Developer"
+
+
+def _skills(n: int) -> list[str]:
+    pool = list(RESOURCE_CATALOG) + [a.upper() for a in SKILL_ALIASES] + [f"Niche Tool {i}" for i in range(40)]
+    return [pool[i % len(pool)] for i in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skills", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    skills = _skills(args.skills)
+    per_skill = timeit.timeit(lambda: {s: find_resources(s, ROLE) for s in skills}, number=args.repeat)
+    batch = timeit.timeit(lambda: find_resources_batch(skills, ROLE), number=args.repeat)
+    print(f"{len(skills)} skills, {args.repeat} runs")
+    print(f"  per-skill find_resources : {per_skill / args.repeat * 1e6:8.1f} us/request")
+    print(f"  find_resources_batch     : {batch / args.repeat * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
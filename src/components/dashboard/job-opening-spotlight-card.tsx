@@ -11,6 +11,8 @@ export type JobOpeningDisplay = {
   snippet?: string;
   portal?: string;
   match_score?: number;
+  /** Every portal carrying this posting (duplicates merged server-side), primary listing first */
+  portals?: { portal?: string; portal_key?: string; url: string }[];
 };
 
 const PORTAL_PILL: Record<
@@ -101,6 +103,7 @@ export function JobOpeningSpotlightCard({
   const glowColor = portalToGlowColor(job.portal);
   const pill = getPortalPill(job.portal);
   const score = typeof job.match_score === "number" ? job.match_score : 0;
+  const alsoOn = (job.portals ?? []).filter((p) => p.url && p.url !== job.url);
 
   return (
     <GlowCard
@@ -156,6 +159,23 @@ export function JobOpeningSpotlightCard({
             <ArrowUpRight className="h-4 w-4" />
           </a>
         ) : null}
+        {alsoOn.length > 0 ? (
+          <div className="-mt-2 flex flex-wrap items-center justify-center gap-x-3 gap-y-1 text-xs text-muted-foreground">
+            <span>Also on</span>
+            {alsoOn.map((p) => (
+              <a
+                key={p.url}
+                href={p.url}
+                target="_blank"
+                rel="noopener noreferrer"
+                className="inline-flex items-center gap-0.5 font-medium underline-offset-2 hover:text-primary hover:underline"
+              >
+                {p.portal || getPortalPill(p.portal_key).label}
+                <ArrowUpRight className="h-3 w-3" />
+              </a>
+            ))}
+          </div>
+        ) : null}
       </div>
     </GlowCard>
   );
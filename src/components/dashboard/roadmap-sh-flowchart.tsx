@@ -14,6 +14,7 @@ import {
   type NodeProps,
 } from "@xyflow/react";
 import "@xyflow/react/dist/style.css";
+import type { RoadmapGraph } from "@/lib/api";
 
 // Roadmap.sh node types: title, topic, subtopic, paragraph, vertical
 interface RoadmapShNodeData {
@@ -87,54 +88,49 @@ const nodeTypes = {
   vertical: VerticalNode,
 };
 
-function transformRoadmapShToReactFlow(
-  raw: { nodes: any[]; edges: any[] }
+function transformRoadmapGraphToReactFlow(
+  graph: RoadmapGraph
 ): { nodes: Node[]; edges: Edge[] } {
-  const nodes: Node[] = raw.nodes.map((n) => {
-    const pos = n.position || { x: 0, y: 0 };
-    const width = n.width ?? 150;
-    const height = n.height ?? 40;
-    const nodeType = n.type || "default";
+  const nodes: Node[] = graph.nodes.map(([type, label, x, y, width, height], i) => {
+    const nodeType = graph.node_types[type] || "default";
     return {
-      id: n.id,
+      id: String(i),
       type: nodeType in nodeTypes ? nodeType : "paragraph",
-      position: { x: pos.x, y: pos.y },
-      data: { label: n.data?.label ?? "" },
-      style: { width, height },
+      position: { x, y },
+      data: { label: graph.labels[label] ?? "" },
+      style: { width: width ?? 150, height: height ?? 40 },
       draggable: false,
     };
   });
 
-  const edges: Edge[] = raw.edges.map((e, i) => ({
-    id: e.id || `edge-${i}`,
-    source: e.source,
-    target: e.target,
-    type: e.type === "step" ? "step" : "smoothstep",
-    animated: false,
-    style: {
-      stroke: e.style?.stroke || "hsl(var(--primary))",
-      strokeWidth: e.style?.strokeWidth || 2,
-      strokeDasharray: e.data?.edgeStyle === "dashed" ? "5 5" : undefined,
-    },
-  }));
+  const edges: Edge[] = graph.edges.map(([source, target, styleIndex], i) => {
+    const [type, stroke, strokeWidth, dashed] = graph.edge_styles[styleIndex];
+    return {
+      id: `edge-${i}`,
+      source: String(source),
+      target: String(target),
+      type,
+      animated: false,
+      style: {
+        stroke: stroke || "hsl(var(--primary))",
+        strokeWidth: strokeWidth || 2,
+        strokeDasharray: dashed ? "5 5" : undefined,
+      },
+    };
+  });
 
   return { nodes, edges };
 }
 
 interface RoadmapShFlowchartProps {
-  nodes: any[];
-  edges: any[];
+  graph: RoadmapGraph;
   height?: number;
 }
 
-export function RoadmapShFlowchart({
-  nodes: rawNodes,
-  edges: rawEdges,
-  height = 600,
-}: RoadmapShFlowchartProps) {
+export function RoadmapShFlowchart({ graph, height = 600 }: RoadmapShFlowchartProps) {
   const { nodes: initialNodes, edges: initialEdges } = useMemo(
-    () => transformRoadmapShToReactFlow({ nodes: rawNodes, edges: rawEdges }),
-    [rawNodes, rawEdges]
+    () => transformRoadmapGraphToReactFlow(graph),
+    [graph]
   );
 
   const [nodes, setNodes, onNodesChange] = useNodesState(initialNodes);
@@ -145,7 +141,7 @@ export function RoadmapShFlowchart({
     setEdges(initialEdges);
   }, [initialNodes, initialEdges, setNodes, setEdges]);
 
-  if (rawNodes.length === 0 && rawEdges.length === 0) {
+  if (graph.nodes.length === 0 && graph.edges.length === 0) {
     return (
       <div className="rounded-lg border bg-muted/20 p-8 text-center text-muted-foreground text-sm">
         No roadmap data available.
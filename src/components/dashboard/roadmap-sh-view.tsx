@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { ExternalLink, Loader2, Map } from "lucide-react";
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card";
-import { getRoadmap, updateRoadmapProgress } from "@/lib/api";
+import { getRoadmap, getRoadmapGraph, updateRoadmapProgress, type RoadmapGraph } from "@/lib/api";
 import { RoadmapFlowchart } from "@/components/dashboard/roadmap-flowchart";
 import { RoadmapShFlowchart } from "@/components/dashboard/roadmap-sh-flowchart";
 import { toast } from "sonner";
@@ -20,7 +20,7 @@ interface RoadmapData {
   roadmap: Milestone[];
   roadmap_sh_url: string | null;
   roadmap_sh_id: string | null;
-  roadmap_sh_raw?: { nodes: any[]; edges: any[] } | null;
+  roadmap_sh_graph_url?: string | null;
 }
 
 export function RoadmapShView({
@@ -35,6 +35,7 @@ export function RoadmapShView({
   const [data, setData] = useState<RoadmapData | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [graph, setGraph] = useState<RoadmapGraph | null>(null);
   const [flowchartHeight, setFlowchartHeight] = useState(720);
 
   useEffect(() => {
@@ -80,6 +81,23 @@ export function RoadmapShView({
       .finally(() => setLoading(false));
   }, [userId, targetRole, onLoad]);
 
+  const roadmapShId = data?.roadmap_sh_id;
+  useEffect(() => {
+    setGraph(null);
+    if (!roadmapShId) return;
+    let cancelled = false;
+    getRoadmapGraph(roadmapShId)
+      .then((result) => {
+        if (!cancelled) setGraph(result);
+      })
+      .catch(() => {
+        // Fall back to the milestone flowchart
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [roadmapShId]);
+
   if (loading) {
     return (
       <Card className="border-2 border-dashed">
@@ -101,8 +119,8 @@ export function RoadmapShView({
     );
   }
 
-  const { roadmap, roadmap_sh_url, roadmap_sh_id, roadmap_sh_raw } = data;
-  const useRoadmapSh = roadmap_sh_raw && roadmap_sh_raw.nodes?.length > 0;
+  const { roadmap, roadmap_sh_url } = data;
+  const useRoadmapSh = graph !== null && graph.nodes.length > 0;
   const completedCount = roadmap.filter((m) => m.completed).length;
   const progressPercent = roadmap.length ? (completedCount / roadmap.length) * 100 : 0;
 
@@ -147,11 +165,7 @@ export function RoadmapShView({
       </CardHeader>
       <CardContent className="p-3 sm:p-4 flex-1 min-h-0">
         {useRoadmapSh ? (
-          <RoadmapShFlowchart
-            nodes={roadmap_sh_raw!.nodes}
-            edges={roadmap_sh_raw!.edges}
-            height={flowchartHeight}
-          />
+          <RoadmapShFlowchart graph={graph!} height={flowchartHeight} />
         ) : (
           <RoadmapFlowchart
             milestones={roadmap}
@@ -12,6 +12,8 @@ import {
   Bell,
   Loader2,
   Pencil,
+  ChevronDown,
+  ChevronUp,
 } from "lucide-react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -27,10 +29,12 @@ import {
 } from "@/components/ui/select";
 import {
   getJobApplications,
+  getJobApplicationSummary,
   createJobApplication,
   updateJobApplication,
   deleteJobApplication,
 } from "@/lib/api";
+import type { FollowUpItem, JobApplicationSummary } from "@/lib/api";
 import { toast } from "sonner";
 import { FollowUpButton } from "@/components/dashboard/follow-up-button";
 
@@ -185,8 +189,12 @@ function formatRelative(iso: string) {
 }
 
 export function SmartFollowUp({ userId }: { userId: string }) {
-  const [applications, setApplications] = useState<JobApplication[]>([]);
+  const [applications, setApplications] = useState<JobApplication[] | null>(null);
+  const [summary, setSummary] = useState<JobApplicationSummary | null>(null);
   const [loading, setLoading] = useState(true);
+  // The full list is only downloaded when the user opens it; the follow-up cards come from the summary
+  const [showAll, setShowAll] = useState(false);
+  const [loadingList, setLoadingList] = useState(false);
   const [showForm, setShowForm] = useState(false);
   const [submitting, setSubmitting] = useState(false);
   const [form, setForm] = useState({
@@ -199,21 +207,51 @@ export function SmartFollowUp({ userId }: { userId: string }) {
     recruiter_email: "",
   });
 
-  const fetchApplications = async () => {
+  const fetchList = async () => {
+    setLoadingList(true);
+    try {
+      setApplications(await getJobApplications(userId));
+    } catch (err: any) {
+      toast.error(err.message);
+    } finally {
+      setLoadingList(false);
+    }
+  };
+
+  const fetchSummary = async () => {
     try {
-      const data = await getJobApplications(userId);
-      setApplications(data);
+      setSummary(await getJobApplicationSummary(userId));
     } catch (err: any) {
+      // Without the summary the list is the only view left, so open it
       toast.error(err.message);
+      setSummary(null);
+      setShowAll(true);
     } finally {
       setLoading(false);
     }
   };
 
+  // After a change: the summary always, the list only once it has been opened
+  const fetchApplications = async () => {
+    await fetchSummary();
+    if (applications !== null) {
+      fetchList();
+    }
+  };
+
   useEffect(() => {
-    fetchApplications();
+    setApplications(null);
+    setShowAll(false);
+    setLoading(true);
+    fetchSummary();
   }, [userId]);
 
+  useEffect(() => {
+    if (showAll && applications === null && !loadingList) {
+      fetchList();
+    }
+  }, [showAll]);
+
   const handleAdd = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!form.company.trim() || !form.role.trim()) {
@@ -242,7 +280,7 @@ export function SmartFollowUp({ userId }: { userId: string }) {
     }
   };
 
-  const handleMarkFollowUpSent = async (app: JobApplication) => {
+  const handleMarkFollowUpSent = async (app: { id: string; company: string }) => {
     try {
       await updateJobApplication(userId, app.id, { follow_up_sent: true });
       toast.success(`Marked follow-up sent for ${app.company}`);
@@ -273,12 +311,9 @@ export function SmartFollowUp({ userId }: { userId: string }) {
     }
   };
 
-  const dueNow = applications.filter(
-    (a) => getFollowUpStatus(a.optimal_follow_up_at, a.follow_up_sent) === "now"
-  );
-  const dueSoon = applications.filter(
-    (a) => getFollowUpStatus(a.optimal_follow_up_at, a.follow_up_sent) === "soon"
-  );
+  const dueNow: FollowUpItem[] = summary?.due.now ?? [];
+  const dueSoon: FollowUpItem[] = summary?.due.soon ?? [];
+  const total = summary?.total ?? applications?.length ?? 0;
 
   if (loading) {
     return (
@@ -400,6 +435,26 @@ export function SmartFollowUp({ userId }: { userId: string }) {
         </Card>
       )}
 
+      {summary && summary.total > 0 && (
+        <div className="flex flex-wrap items-center gap-2 text-sm">
+          {Object.entries(summary.by_status).map(([status, count]) => (
+            <Badge key={status} variant="outline" className={getStatusStyle(status).badge}>
+              {getStatusLabel(status)}: {count}
+            </Badge>
+          ))}
+          {summary.follow_ups.overdue > 0 && (
+            <Badge variant="outline" className="bg-red-500/20 text-red-700 border-red-500/30">
+              {summary.follow_ups.overdue} follow-up{summary.follow_ups.overdue === 1 ? "" : "s"} overdue
+            </Badge>
+          )}
+          {summary.response_time.median_days !== null && (
+            <span className="text-muted-foreground">
+              Median response: {summary.response_time.median_days} days
+            </span>
+          )}
+        </div>
+      )}
+
       {(dueNow.length > 0 || dueSoon.length > 0) && (
         <div className="grid gap-4 sm:grid-cols-2">
           {dueNow.length > 0 && (
@@ -437,6 +492,11 @@ export function SmartFollowUp({ userId }: { userId: string }) {
                     </div>
                   </div>
                 ))}
+                {summary && summary.follow_ups.due_now > dueNow.length && (
+                  <p className="text-xs text-muted-foreground">
+                    +{summary.follow_ups.due_now - dueNow.length} more in All Applications
+                  </p>
+                )}
               </CardContent>
             </Card>
           )}
@@ -467,16 +527,24 @@ export function SmartFollowUp({ userId }: { userId: string }) {
       )}
 
       <Card>
-        <CardHeader>
-          <CardTitle className="text-base">All Applications</CardTitle>
-          <CardDescription>
-            {applications.length === 0
-              ? "No applications yet. Add one to start tracking."
-              : `${applications.length} application${applications.length === 1 ? "" : "s"} tracked`}
-          </CardDescription>
+        <CardHeader className="flex flex-row items-start justify-between gap-4">
+          <div>
+            <CardTitle className="text-base">All Applications</CardTitle>
+            <CardDescription>
+              {total === 0
+                ? "No applications yet. Add one to start tracking."
+                : `${total} application${total === 1 ? "" : "s"} tracked`}
+            </CardDescription>
+          </div>
+          {total > 0 && (
+            <Button size="sm" variant="ghost" className="shrink-0" onClick={() => setShowAll(!showAll)}>
+              {showAll ? <ChevronUp className="w-4 h-4 mr-1" /> : <ChevronDown className="w-4 h-4 mr-1" />}
+              {showAll ? "Hide" : "Show all"}
+            </Button>
+          )}
         </CardHeader>
         <CardContent>
-          {applications.length === 0 ? (
+          {total === 0 && !applications?.length ? (
             <div className="text-center py-12 border-2 border-dashed rounded-xl">
               <Briefcase className="w-12 h-12 mx-auto text-muted-foreground mb-3" />
               <p className="text-muted-foreground mb-4">Track your job applications and never miss a follow-up.</p>
@@ -485,6 +553,10 @@ export function SmartFollowUp({ userId }: { userId: string }) {
                 Add Your First Application
               </Button>
             </div>
+          ) : !showAll ? null : applications === null ? (
+            <div className="flex items-center justify-center py-8">
+              <Loader2 className="h-6 w-6 animate-spin text-primary" />
+            </div>
           ) : (
             <div className="space-y-3">
               {applications.map((app) => {
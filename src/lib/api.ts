@@ -1,4 +1,7 @@
 function friendlySchemaError(message: string): string | null {
+  if (message.includes("job_application_summary")) {
+    return "Database is missing the application summary function. In Supabase → SQL Editor, run the SQL in supabase/migrations/006_job_application_summary.sql, then try again.";
+  }
   if (
     message.includes("recruiter_email") ||
     message.includes("last_follow_up_at") ||
@@ -26,7 +29,8 @@ export async function parseResume(file: File) {
     const formData = new FormData();
     formData.append("file", file);
 
-    const response = await fetch("/api/parse-resume", {
+    // raw_text is only returned on request; the upload form stores it and sends it to the assessment
+    const response = await fetch("/api/parse-resume?include_text=1", {
         method: "POST",
         body: formData,
     });
@@ -78,6 +82,30 @@ export async function getRoadmap(userId: string, targetRole?: string) {
     return response.json();
 }
 
+/** Compact roadmap.sh flowchart (see api/utils/roadmap_graph.py); node id = index into `nodes`. */
+export interface RoadmapGraph {
+    v: number;
+    roadmap_id: string;
+    labels: string[];
+    node_types: string[];
+    /** [type, label, x, y, width, height] */
+    nodes: [number, number, number, number, number | null, number | null][];
+    /** [type, stroke, strokeWidth, dashed] */
+    edge_styles: [string, string | null, number | null, boolean][];
+    /** [source, target, style] */
+    edges: [number, number, number][];
+}
+
+export async function getRoadmapGraph(roadmapId: string): Promise<RoadmapGraph | null> {
+    // Served with an ETag, so repeat views revalidate through the browser cache (304)
+    const response = await fetch(`/api/roadmap-graph/${encodeURIComponent(roadmapId)}`);
+    if (response.status === 404) return null;
+    if (!response.ok) {
+        throw new Error(await parseErrorResponse(response, "Failed to fetch roadmap graph"));
+    }
+    return response.json();
+}
+
 export async function getJobApplications(userId: string) {
     const response = await fetch(`/api/job-applications?user_id=${userId}`);
     if (!response.ok) {
@@ -86,6 +114,31 @@ export async function getJobApplications(userId: string) {
     return response.json();
 }
 
+export interface FollowUpItem {
+    id: string;
+    company: string;
+    role: string;
+    optimal_follow_up_at: string;
+    recruiter_email: string | null;
+}
+
+export interface JobApplicationSummary {
+    total: number;
+    by_status: Record<string, number>;
+    follow_ups: { due_now: number; due_soon: number; overdue: number; next_due_at: string | null };
+    // Up to 20 pending follow-ups per bucket, soonest first
+    due: { now: FollowUpItem[]; soon: FollowUpItem[] };
+    response_time: { responded: number; avg_days: number | null; median_days: number | null };
+}
+
+export async function getJobApplicationSummary(userId: string): Promise<JobApplicationSummary> {
+    const response = await fetch(`/api/job-applications/summary?user_id=${userId}`);
+    if (!response.ok) {
+        throw new Error(await parseErrorResponse(response, "Failed to fetch application summary"));
+    }
+    return response.json();
+}
+
 export async function createJobApplication(userId: string, data: { company: string; role: string; applied_at?: string; optimal_follow_up_at?: string; notes?: string; job_url?: string; status?: string; recruiter_email?: string }) {
     const response = await fetch("/api/job-applications", {
         method: "POST",
@@ -134,6 +187,7 @@ export async function getJobOpeningsCrew(targetRole: string, skills: string[]) {
             snippet?: string;
             portal?: string;
             match_score?: number;
+            portals?: Array<{ portal?: string; portal_key?: string; url: string }>;
         }>;
         summary?: string | null;
         crew_output?: string | null;
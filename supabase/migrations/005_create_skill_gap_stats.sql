@@ -0,0 +1,99 @@
+-- Cohort skill-gap aggregates, maintained incrementally from user_assessments inserts.
+-- Roles and skills are stored lowercased/trimmed; alias folding ("JS" -> "javascript") happens in the API.
+CREATE TABLE IF NOT EXISTS public.role_assessment_counts (
+  target_role TEXT PRIMARY KEY,
+  assessments BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS public.skill_gap_stats (
+  target_role TEXT NOT NULL,
+  skill TEXT NOT NULL,
+  missing_count BIGINT NOT NULL DEFAULT 0,
+  -- gap_hist[n] = number of assessments that rated this skill gap_score n (1-10)
+  gap_hist BIGINT[] NOT NULL DEFAULT array_fill(0::BIGINT, ARRAY[10]),
+  PRIMARY KEY (target_role, skill)
+);
+
+ALTER TABLE public.role_assessment_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.skill_gap_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view role assessment counts" ON public.role_assessment_counts
+  FOR SELECT USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Authenticated users can view skill gap stats" ON public.skill_gap_stats
+  FOR SELECT USING (auth.role() = 'authenticated');
+
+-- Folds one assessment's feedback JSON into the aggregates
+CREATE OR REPLACE FUNCTION public.accumulate_skill_gap_stats(p_target_role TEXT, p_feedback JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  role_key TEXT := lower(btrim(coalesce(p_target_role, '')));
+  missing JSONB := p_feedback -> 'keywords' -> 'missing';
+  gaps JSONB := p_feedback -> 'skill_gaps';
+  skill_name TEXT;
+  gap JSONB;
+  bucket INT;
+BEGIN
+  IF role_key = '' OR p_feedback IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO role_assessment_counts (target_role, assessments) VALUES (role_key, 1)
+  ON CONFLICT (target_role) DO UPDATE SET assessments = role_assessment_counts.assessments + 1;
+
+  IF jsonb_typeof(missing) = 'array' THEN
+    FOR skill_name IN SELECT DISTINCT lower(btrim(value)) FROM jsonb_array_elements_text(missing) LOOP
+      CONTINUE WHEN skill_name = '';
+      INSERT INTO skill_gap_stats (target_role, skill, missing_count) VALUES (role_key, skill_name, 1)
+      ON CONFLICT (target_role, skill) DO UPDATE SET missing_count = skill_gap_stats.missing_count + 1;
+    END LOOP;
+  END IF;
+
+  IF jsonb_typeof(gaps) = 'array' THEN
+    FOR gap IN SELECT value FROM jsonb_array_elements(gaps) LOOP
+      CONTINUE WHEN jsonb_typeof(gap) <> 'object' OR coalesce(jsonb_typeof(gap -> 'gap_score'), '') <> 'number';
+      skill_name := lower(btrim(coalesce(gap ->> 'skill', '')));
+      CONTINUE WHEN skill_name = '';
+      bucket := least(10, greatest(1, round((gap ->> 'gap_score')::NUMERIC)::INT));
+      INSERT INTO skill_gap_stats (target_role, skill) VALUES (role_key, skill_name)
+      ON CONFLICT (target_role, skill) DO NOTHING;
+      UPDATE skill_gap_stats SET gap_hist[bucket] = gap_hist[bucket] + 1
+      WHERE target_role = role_key AND skill = skill_name;
+    END LOOP;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.user_assessments_skill_gap_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  PERFORM accumulate_skill_gap_stats(NEW.target_role, NEW.feedback);
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_assessments_skill_gap_stats ON public.user_assessments;
+CREATE TRIGGER user_assessments_skill_gap_stats
+  AFTER INSERT ON public.user_assessments
+  FOR EACH ROW EXECUTE FUNCTION public.user_assessments_skill_gap_trigger();
+
+-- Backfill from existing assessments (tables are new, so this runs exactly once)
+DO $$
+DECLARE
+  r RECORD;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM role_assessment_counts) THEN
+    FOR r IN SELECT target_role, feedback FROM public.user_assessments LOOP
+      PERFORM accumulate_skill_gap_stats(r.target_role, r.feedback);
+    END LOOP;
+  END IF;
+END;
+$$;
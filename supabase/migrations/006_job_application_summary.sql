@@ -0,0 +1,109 @@
+-- Per-user job application summary (status counts, follow-ups due, response times), computed in the database
+-- so the tracker dashboard gets a constant-size payload however many applications a user has.
+
+-- When the application first moved to a status that means the company answered
+ALTER TABLE public.job_applications
+  ADD COLUMN IF NOT EXISTS responded_at TIMESTAMP WITH TIME ZONE;
+
+CREATE OR REPLACE FUNCTION public.job_applications_touch()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  NEW.updated_at := timezone('utc'::text, now());
+  IF NEW.responded_at IS NULL
+     AND NEW.status IS DISTINCT FROM OLD.status
+     AND NEW.status IN ('interview_called', 'shortlisted', 'interviewing', 'offer', 'rejected') THEN
+    NEW.responded_at := NEW.updated_at;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS job_applications_touch ON public.job_applications;
+CREATE TRIGGER job_applications_touch
+  BEFORE UPDATE ON public.job_applications
+  FOR EACH ROW EXECUTE FUNCTION public.job_applications_touch();
+
+CREATE INDEX IF NOT EXISTS idx_job_applications_user_status ON public.job_applications(user_id, status);
+
+-- A follow-up is pending until follow_up_sent is set or one was sent (last_follow_up_at) after the
+-- optimal time. "due_now" matches the dashboard's "Follow Up Now" card, "due_soon" its "soon" window.
+-- "due" lists those follow-ups for the "Follow Up Now" / "Coming Up" cards, so the tracker renders them
+-- without downloading every application; at most 20 items per bucket, soonest first.
+CREATE OR REPLACE FUNCTION public.job_application_summary(
+  p_user_id UUID,
+  p_due_soon_days INT DEFAULT 2,
+  p_overdue_days INT DEFAULT 3
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH apps AS (
+    SELECT
+      id,
+      company,
+      role,
+      recruiter_email,
+      coalesce(status, 'applied') AS status,
+      optimal_follow_up_at,
+      optimal_follow_up_at IS NOT NULL
+        AND NOT coalesce(follow_up_sent, FALSE)
+        AND (last_follow_up_at IS NULL OR last_follow_up_at < optimal_follow_up_at) AS pending,
+      extract(epoch FROM responded_at - applied_at) / 86400.0 AS response_days
+    FROM job_applications
+    WHERE user_id = p_user_id
+  ),
+  by_status AS (
+    SELECT status, count(*) AS n FROM apps GROUP BY status
+  ),
+  due AS (
+    SELECT
+      optimal_follow_up_at <= now() AS is_now,
+      optimal_follow_up_at,
+      row_number() OVER (PARTITION BY optimal_follow_up_at <= now() ORDER BY optimal_follow_up_at, id) AS rank,
+      jsonb_build_object(
+        'id', id,
+        'company', company,
+        'role', role,
+        'optimal_follow_up_at', optimal_follow_up_at,
+        'recruiter_email', recruiter_email
+      ) AS item
+    FROM apps
+    WHERE pending AND optimal_follow_up_at <= now() + make_interval(days => p_due_soon_days)
+  )
+  SELECT jsonb_build_object(
+    'total', (SELECT count(*) FROM apps),
+    'by_status', coalesce((SELECT jsonb_object_agg(status, n) FROM by_status), '{}'::jsonb),
+    'follow_ups', (
+      SELECT jsonb_build_object(
+        'due_now', count(*) FILTER (WHERE pending AND optimal_follow_up_at <= now()),
+        'overdue', count(*) FILTER (
+          WHERE pending AND optimal_follow_up_at <= now() - make_interval(days => p_overdue_days)),
+        'due_soon', count(*) FILTER (
+          WHERE pending AND optimal_follow_up_at > now()
+            AND optimal_follow_up_at <= now() + make_interval(days => p_due_soon_days)),
+        'next_due_at', min(optimal_follow_up_at) FILTER (WHERE pending AND optimal_follow_up_at > now())
+      )
+      FROM apps
+    ),
+    'due', jsonb_build_object(
+      'now', coalesce(
+        (SELECT jsonb_agg(item ORDER BY rank) FROM due WHERE is_now AND rank <= 20), '[]'::jsonb),
+      'soon', coalesce(
+        (SELECT jsonb_agg(item ORDER BY rank) FROM due WHERE NOT is_now AND rank <= 20), '[]'::jsonb)
+    ),
+    'response_time', (
+      SELECT jsonb_build_object(
+        'responded', count(*),
+        'avg_days', round(avg(response_days)::NUMERIC, 1),
+        'median_days', round((percentile_cont(0.5) WITHIN GROUP (ORDER BY response_days))::NUMERIC, 1)
+      )
+      FROM apps
+      WHERE response_days IS NOT NULL
+    )
+  );
+$$;
@@ -0,0 +1,55 @@
+-- Count the skill names the API stored in feedback.skill_keys (normalize_skill folding, one entry per skill,
+-- gap_score already bucketed), so the aggregates match the API's in-memory index. Rows without skill_keys
+-- (inserted before this migration or outside the API) keep the lower/btrim fallback.
+CREATE OR REPLACE FUNCTION public.accumulate_skill_gap_stats(p_target_role TEXT, p_feedback JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  role_key TEXT := lower(btrim(coalesce(p_target_role, '')));
+  has_keys BOOLEAN := jsonb_typeof(p_feedback -> 'skill_keys') = 'object';
+  missing JSONB;
+  gaps JSONB;
+  skill_name TEXT;
+  gap JSONB;
+  bucket INT;
+BEGIN
+  IF role_key = '' OR p_feedback IS NULL THEN
+    RETURN;
+  END IF;
+
+  IF has_keys THEN
+    missing := p_feedback -> 'skill_keys' -> 'missing';
+    gaps := p_feedback -> 'skill_keys' -> 'gaps';
+  ELSE
+    missing := p_feedback -> 'keywords' -> 'missing';
+    gaps := p_feedback -> 'skill_gaps';
+  END IF;
+
+  INSERT INTO role_assessment_counts (target_role, assessments) VALUES (role_key, 1)
+  ON CONFLICT (target_role) DO UPDATE SET assessments = role_assessment_counts.assessments + 1;
+
+  IF jsonb_typeof(missing) = 'array' THEN
+    FOR skill_name IN SELECT DISTINCT lower(btrim(value)) FROM jsonb_array_elements_text(missing) LOOP
+      CONTINUE WHEN skill_name = '';
+      INSERT INTO skill_gap_stats (target_role, skill, missing_count) VALUES (role_key, skill_name, 1)
+      ON CONFLICT (target_role, skill) DO UPDATE SET missing_count = skill_gap_stats.missing_count + 1;
+    END LOOP;
+  END IF;
+
+  IF jsonb_typeof(gaps) = 'array' THEN
+    FOR gap IN SELECT value FROM jsonb_array_elements(gaps) LOOP
+      CONTINUE WHEN jsonb_typeof(gap) <> 'object' OR coalesce(jsonb_typeof(gap -> 'gap_score'), '') <> 'number';
+      skill_name := lower(btrim(coalesce(gap ->> 'skill', '')));
+      CONTINUE WHEN skill_name = '';
+      bucket := least(10, greatest(1, round((gap ->> 'gap_score')::NUMERIC)::INT));
+      INSERT INTO skill_gap_stats (target_role, skill) VALUES (role_key, skill_name)
+      ON CONFLICT (target_role, skill) DO NOTHING;
+      UPDATE skill_gap_stats SET gap_hist[bucket] = gap_hist[bucket] + 1
+      WHERE target_role = role_key AND skill = skill_name;
+    END LOOP;
+  END IF;
+END;
+$$;
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The API is imported as the `api` package from the repository root, as `flask --app api/index` does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pytest
+
+from api.utils import admission
+from api.utils.admission import AdmissionController, Rejected, gemini_slot
+from api.utils.deadline import Deadline
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    give_up_at = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < give_up_at, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(capacity=1, rate_per_s=1.0, burst=1.0, max_wait_s=5.0)
+    monkeypatch.setattr(admission, "_controller", controller)
+    monkeypatch.setattr(admission, "ENABLED", True)
+    return controller
+
+
+def test_charge_spends_the_burst_then_rejects_with_retry_after(clock):
+    controller = AdmissionController(capacity=4, rate_per_s=0.1, burst=2.0)
+    controller.charge("u")
+    controller.charge("u")
+    with pytest.raises(Rejected) as e:
+        controller.charge("u")
+    assert e.value.reason == "rate"
+    assert e.value.retry_after == 10
+    assert controller.snapshot()["rejected"] == 1
+
+
+def test_charge_refills_at_the_rate_and_keeps_users_apart(clock):
+    controller = AdmissionController(capacity=4, rate_per_s=0.1, burst=1.0)
+    controller.charge("u")
+    controller.charge("other")
+    with pytest.raises(Rejected):
+        controller.charge("u")
+    clock[0] += 10
+    controller.charge("u")
+
+
+def test_acquire_rejects_busy_after_max_wait():
+    controller = AdmissionController(capacity=1, rate_per_s=1.0, burst=1.0, max_wait_s=0.05)
+    controller.acquire("a")
+    with pytest.raises(Rejected) as e:
+        controller.acquire("b")
+    assert e.value.reason == "busy"
+    snapshot = controller.snapshot()
+    assert (snapshot["in_flight"], snapshot["queued"], snapshot["waiting_users"]) == (1, 0, 0)
+
+
+def test_acquire_caps_each_users_queue():
+    controller = AdmissionController(capacity=1, rate_per_s=1.0, burst=1.0, max_wait_s=5.0, max_queued_per_user=1)
+    controller.acquire("a")
+    waiter = threading.Thread(target=controller.acquire, args=("a",))
+    waiter.start()
+    _wait_for(lambda: controller.queued == 1)
+    with pytest.raises(Rejected):
+        controller.acquire("a")
+    controller.release(0.1)
+    waiter.join()
+
+
+def test_release_hands_slots_to_waiting_users_round_robin():
+    controller = AdmissionController(capacity=1, rate_per_s=1.0, burst=1.0, max_wait_s=5.0)
+    controller.acquire("a")
+    order: list[str] = []
+    threads = []
+    for user in ("a", "a", "b"):
+        thread = threading.Thread(target=lambda u=user: (controller.acquire(u), order.append(u)))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda: controller.queued == len(threads))
+    for n in range(len(threads)):
+        controller.release(0.1)
+        _wait_for(lambda: len(order) == n + 1)
+    controller.release(0.1)
+    for thread in threads:
+        thread.join()
+    # a's second request waits behind b's first
+    assert order == ["a", "b", "a"]
+    assert controller.snapshot()["in_flight"] == 0
+
+
+def test_gemini_slot_takes_no_slot_outside_an_admitted_request(controller):
+    with gemini_slot():
+        assert controller.in_flight == 0
+
+
+def test_gemini_slot_is_held_once_for_nested_calls(controller):
+    with gemini_slot("u"):
+        assert controller.in_flight == 1
+        with gemini_slot("u"):
+            assert controller.in_flight == 1
+    assert controller.in_flight == 0
+
+
+def test_gemini_slot_retries_busy_rejections_until_the_deadline(controller, monkeypatch):
+    controller.max_wait_s = 0.01
+    monkeypatch.setattr(admission, "_BUSY_POLL_S", 0.02)
+    controller.acquire("a")
+    threading.Timer(0.1, controller.release, args=(0.1,)).start()
+    with gemini_slot("b", Deadline(2.0)):
+        assert controller.in_flight == 1
+    controller.acquire("a")
+    with pytest.raises(Rejected):
+        with gemini_slot("b", Deadline(0.05)):
+            pass
+
+
+@pytest.fixture
+def app(controller):
+    from flask import Flask
+
+    app = Flask(__name__)
+
+    @app.post("/assess")
+    @admission.admission_controlled
+    def assess():
+        return {"client": admission.admitted_user()}
+
+    return app
+
+
+def test_clients_cant_rotate_user_ids_or_forwarded_hops_for_fresh_buckets(app, monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_HOPS", 0)
+    client = app.test_client()
+    first = client.post("/assess", json={"user_id": "u1"}, headers={"X-Forwarded-For": "1.1.1.1"})
+    assert first.json == {"client": "ip:127.0.0.1"}
+    second = client.post("/assess", json={"user_id": "u2"}, headers={"X-Forwarded-For": "2.2.2.2"})
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+
+
+def test_client_key_is_the_hop_the_trusted_proxy_added(app, monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_HOPS", 1)
+    client = app.test_client()
+    response = client.post("/assess", headers={"X-Forwarded-For": "6.6.6.6, 203.0.113.7"})
+    assert response.json == {"client": "ip:203.0.113.7"}
+
+
+def test_too_many_requests_sets_retry_after(app):
+    with app.app_context():
+        response = admission.too_many_requests({"error": "over", "type": "budget", "retry_after": 120})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "120"
@@ -0,0 +1,54 @@
+import pytest
+
+from api.utils import capstone_store
+from api.utils.capstone_store import CapstoneStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(capstone_store.time, "time", tick)
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return CapstoneStore(str(tmp_path / "capstones.sqlite3"), threshold=0.75, max_entries=3)
+
+
+def test_find_matches_alias_folded_sets_exactly(store):
+    store.put(["Docker", "Kubernetes", "JS"], {"title": "Deploy a JS app"})
+    assert store.find(["javascript", " kubernetes ", "docker"]) == ({"title": "Deploy a JS app"}, 1.0)
+
+
+def test_find_returns_the_most_similar_set_above_the_threshold(store):
+    store.put(["docker", "kubernetes", "aws", "terraform"], {"title": "infra"})
+    store.put(["docker", "kubernetes", "aws", "terraform", "go", "grpc"], {"title": "platform"})
+    assert store.find(["docker", "kubernetes", "aws"]) == ({"title": "infra"}, 0.75)
+    assert store.find(["docker", "python"]) is None
+    assert store.find([]) is None
+
+
+def test_put_evicts_the_least_recently_used(store):
+    store.put(["a1", "a2"], {"title": "a"})
+    store.put(["b1", "b2"], {"title": "b"})
+    store.put(["c1", "c2"], {"title": "c"})
+    assert store.find(["a1", "a2"])  # a is now more recent than b
+    store.put(["d1", "d2"], {"title": "d"})
+    assert len(store) == 3
+    assert store.find(["b1", "b2"]) is None
+    assert store.find(["a1", "a2"])[0] == {"title": "a"}
+
+
+def test_another_processes_writes_and_evictions_show_up(store):
+    other = CapstoneStore(store.path, threshold=store.threshold, max_entries=1)
+    store.put(["a1", "a2"], {"title": "a"})
+    assert store.find(["a1", "a2"])
+    other.put(["b1", "b2"], {"title": "b"})  # evicts a
+    assert store.find(["b1", "b2"])[0] == {"title": "b"}
+    assert store.find(["a1", "a2"]) is None
+    assert len(store) == 1
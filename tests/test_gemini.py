@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from api.utils import gemini
+from api.utils.gemini import PromptTemplate, _generate
+
+
+class FakeClient:
+    def __init__(self, fail_create: bool = False):
+        self.created = []
+        self.calls = []
+        self.fail_create = fail_create
+        self.caches = SimpleNamespace(create=self._create)
+        self.models = SimpleNamespace(generate_content=self._generate)
+
+    def _create(self, model, config):
+        if self.fail_create:
+            raise ValueError("Cached content is too small")
+        self.created.append(config.contents)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+    def _generate(self, model, contents, config=None):
+        self.calls.append((contents, getattr(config, "cached_content", None)))
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(gemini, "_prefix_caches", gemini._PrefixCaches())
+    monkeypatch.setattr(gemini, "get_shared_cache", lambda: None)
+    monkeypatch.setattr(gemini, "PREFIX_CACHE_MIN_TOKENS", 10)
+
+
+def test_long_prefix_is_registered_once_and_sent_by_handle():
+    prompt = PromptTemplate("t", "instructions " * 10, "{x}")
+    client = FakeClient()
+    assert _generate(client, "key", "model", prompt.render(x="a"))[1]
+    assert _generate(client, "key", "model", prompt.render(x="b"))[1]
+    assert client.created == [[prompt.prefix]]
+    assert client.calls == [("a", "cachedContents/1"), ("b", "cachedContents/1")]
+
+
+def test_short_prefix_is_sent_inline():
+    prompt = PromptTemplate("t", "short ", "{x}")
+    client = FakeClient()
+    assert not _generate(client, "key", "model", prompt.render(x="a"))[1]
+    assert client.created == []
+    assert client.calls == [("short a", None)]
+
+
+def test_refused_registration_falls_back_to_inline_without_retrying():
+    prompt = PromptTemplate("t", "instructions " * 10, "{x}")
+    client = FakeClient(fail_create=True)
+    _generate(client, "key", "model", prompt.render(x="a"))
+    _generate(client, "key", "model", prompt.render(x="b"))
+    assert [handle for _, handle in client.calls] == [None, None]
+    assert gemini.prefix_cache_stats()["register_failures"] == 1
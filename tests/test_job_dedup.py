@@ -0,0 +1,51 @@
+from api.utils.job_dedup import collapse_duplicates
+from api.utils.job_store import canonicalize_url
+
+
+def test_canonicalize_url_drops_tracking_params_and_normalizes_the_rest():
+    assert canonicalize_url(
+        "HTTPS://WWW.LinkedIn.com/jobs/view/123/?utm_source=x&b=2&refId=9&a=1&trk=abc#apply"
+    ) == "https://linkedin.com/jobs/view/123?a=1&b=2"
+
+
+def test_canonicalize_url_defaults_scheme_and_root_path():
+    assert canonicalize_url("  //example.com  ") == "https://example.com/"
+    assert canonicalize_url("https://example.com/jobs?q=") == "https://example.com/jobs?q="
+
+
+def _job(title: str, url: str, portal: str, snippet: str = "") -> dict:
+    return {"title": title, "url": url, "portal": portal, "portal_key": portal.lower(), "snippet": snippet}
+
+
+def test_collapse_duplicates_merges_same_url_listings():
+    jobs = [
+        _job("Data Analyst", "https://example.com/job/1?utm_source=feed", "Example"),
+        _job("Data Analyst", "https://www.example.com/job/1/", "Example", snippet="longer snippet here"),
+    ]
+    [merged] = collapse_duplicates(jobs)
+    assert merged["url"] == jobs[0]["url"]
+    assert merged["snippet"] == "longer snippet here"
+    assert [p["url"] for p in merged["portals"]] == [jobs[0]["url"]]
+
+
+def test_collapse_duplicates_merges_syndicated_postings_and_keeps_order():
+    snippet = "Acme Corp is hiring a senior python backend engineer to build payment APIs in Bangalore"
+    jobs = [
+        _job("Senior Python Backend Engineer - Acme", "https://linkedin.com/jobs/view/1", "LinkedIn", snippet),
+        _job("Frontend Developer - Globex", "https://naukri.com/job/2", "Naukri", "React and TypeScript role"),
+        _job("Senior Python Backend Engineer | Acme", "https://glassdoor.com/job/3", "Glassdoor",
+             f"{snippet}. Apply now"),
+        _job("", "", "Nowhere"),
+    ]
+    collapsed = collapse_duplicates(jobs)
+    assert [j["title"] for j in collapsed] == [jobs[0]["title"], jobs[1]["title"]]
+    assert [p["portal"] for p in collapsed[0]["portals"]] == ["LinkedIn", "Glassdoor"]
+    assert [p["portal"] for p in collapsed[1]["portals"]] == ["Naukri"]
+
+
+def test_collapse_duplicates_keeps_distinct_postings_apart():
+    jobs = [
+        _job("Python Developer", "https://example.com/1", "Example", "Django REST APIs for a fintech startup"),
+        _job("Python Developer", "https://example.com/2", "Example", "Data pipelines with Airflow and Spark"),
+    ]
+    assert len(collapse_duplicates(jobs, threshold=0.9)) == 2
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from api.utils import provider_router
+from api.utils.deadline import Deadline
+from api.utils.provider_router import FAILURE_THRESHOLD, Provider, ProviderHealth, ProviderRouter
+
+
+def _provider(name: str, search, paged: bool = True) -> Provider:
+    return Provider(name, search, lambda: True, paged=paged)
+
+
+def _rows(name: str):
+    def search(query, page=0, deadline=None):
+        return [{"provider": name, "page": page}]
+    return search
+
+
+def _failing(query, page=0, deadline=None):
+    raise RuntimeError("down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(provider_router.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_circuit_opens_after_consecutive_failures_and_lets_one_probe_through(clock):
+    health = ProviderHealth("p")
+    for _ in range(FAILURE_THRESHOLD - 1):
+        health.record(0.1, False)
+    assert health.acquire()
+    health.record(0.1, False)
+    assert not health.acquire()
+    assert health.snapshot()["circuit"] == "open"
+
+    clock[0] += provider_router.COOLDOWN_S
+    assert health.acquire()
+    assert not health.acquire()  # the probe is already out
+    health.record(0.1, True)
+    assert health.acquire()
+    assert health.snapshot()["circuit"] == "closed"
+
+
+def test_hedge_delay_is_the_clamped_p95():
+    provider = _provider("p", _rows("p"))
+    assert provider.hedge_delay() == provider_router.HEDGE_DEFAULT_S
+    for _ in range(provider_router.MIN_SAMPLES_FOR_P95):
+        provider.health.record(0.01, True)
+    assert provider.hedge_delay() == provider_router.HEDGE_MIN_S
+    for _ in range(provider_router.WINDOW_SIZE):
+        provider.health.record(60.0, True)
+    assert provider.hedge_delay() == provider_router.HEDGE_MAX_S
+
+
+def test_run_falls_through_to_the_next_provider_on_failure():
+    router = ProviderRouter([_provider("a", _failing), _provider("b", _rows("b"))])
+    assert router.run("python") == [{"provider": "b", "page": 0}]
+    assert router.snapshot()["a"]["error_rate"] == 1.0
+
+
+def test_run_hedges_a_provider_past_its_p95(monkeypatch):
+    monkeypatch.setattr(provider_router, "HEDGE_DEFAULT_S", 0.05)
+    release = threading.Event()
+
+    def slow(query, page=0, deadline=None):
+        release.wait(5)
+        return [{"provider": "slow"}]
+
+    router = ProviderRouter([_provider("slow", slow), _provider("fast", _rows("fast"))])
+    start = time.monotonic()
+    try:
+        assert router.run("python") == [{"provider": "fast", "page": 0}]
+        assert time.monotonic() - start < 1.0
+    finally:
+        release.set()
+
+
+def test_run_skips_open_circuits_but_tries_the_least_bad_when_all_are_open():
+    a, b = _provider("a", _failing), _provider("b", _rows("b"))
+    router = ProviderRouter([a, b])
+    for _ in range(FAILURE_THRESHOLD):
+        b.health.record(0.1, False)
+    assert router.run("python") == []  # a fails, b's circuit is open
+
+    a.health.record(0.1, False)
+    a.health.record(0.1, False)
+    for _ in range(10):
+        b.health.record(0.1, True)
+    for _ in range(FAILURE_THRESHOLD):
+        b.health.record(0.1, False)
+    assert not a.health.acquire() and not b.health.acquire()
+    assert router.run("python") == [{"provider": "b", "page": 0}]
+
+
+def test_unpaged_providers_only_serve_the_first_page():
+    calls = []
+
+    def unpaged(query, page=0, deadline=None):
+        calls.append(page)
+        return [{"provider": "unpaged"}]
+
+    router = ProviderRouter([_provider("unpaged", unpaged, paged=False), _provider("paged", _rows("paged"))])
+    assert router.run("python", page=0) == [{"provider": "unpaged"}]
+    assert router.run("python", page=1) == [{"provider": "paged", "page": 1}]
+    assert calls == [0]
+    assert router.supports_pages()
+    assert not ProviderRouter([_provider("unpaged", unpaged, paged=False)]).supports_pages()
+
+
+def test_providers_get_the_request_deadline():
+    seen = []
+
+    def search(query, page=0, deadline=None):
+        seen.append(deadline.timeout(45))
+        return [{"provider": "p"}]
+
+    router = ProviderRouter([_provider("p", search)])
+    router.run("python", Deadline(5.0))
+    router.run("python")
+    assert 0 < seen[0] <= 5.0
+    assert seen[1] == 45
@@ -0,0 +1,75 @@
+from api.utils.resume_local import parse_education, parse_experience, split_sections
+
+RESUME = """JANE DOE
+jane@example.com
+
+S K I L L S
+Python, SQL
+
+Work Experience:
+Data Analyst Intern | Acme Corp
+Jan 2023 - Present
+Built dashboards in Tableau.
+Automated weekly reports.
+Research Assistant, Globex Labs (Jun 2021 - Dec 2022)
+Cleaned survey data.
+
+EDUCATION
+B.Tech in Computer Science
+Indian Institute of Technology Delhi
+2019 - 2023
+Higher Secondary (CBSE)
+Delhi Public School, 2019
+
+Experience & Projects are listed above
+"""
+
+
+def test_split_sections_recognizes_spaced_and_punctuated_headings():
+    header, sections = split_sections(RESUME)
+    assert header == "JANE DOE\njane@example.com"
+    assert list(sections) == ["skills", "experience", "education"]
+    assert sections["skills"] == "Python, SQL"
+    assert sections["education"].endswith("Experience & Projects are listed above")
+
+
+def test_split_sections_appends_a_repeated_section():
+    _, sections = split_sections("Skills\nPython\nProjects\nA chatbot\nTechnical Skills\nSQL")
+    assert sections["skills"] == "Python\nSQL"
+
+
+def test_parse_experience_splits_entries_at_date_ranges():
+    _, sections = split_sections(RESUME)
+    assert parse_experience(sections["experience"]) == [
+        {
+            "role": "Data Analyst Intern | Acme Corp",
+            "company": "",
+            "duration": "Jan 2023 - Present",
+            "description": "Built dashboards in Tableau. Automated weekly reports.",
+        },
+        {
+            "role": "Research Assistant, Globex Labs",
+            "company": "",
+            "duration": "Jun 2021 - Dec 2022",
+            "description": "Cleaned survey data.",
+        },
+    ]
+
+
+def test_parse_education_splits_entries_at_degree_and_institution_lines():
+    _, sections = split_sections(RESUME)
+    assert parse_education(sections["education"]) == [
+        {
+            "degree": "B.Tech in Computer Science",
+            "institution": "Indian Institute of Technology Delhi",
+            "year": "2023",
+        },
+        {"degree": "Higher Secondary (CBSE)", "institution": "Delhi Public School, 2019", "year": "2019"},
+    ]
+
+
+def test_parse_education_starts_a_new_entry_at_a_second_institution():
+    assert parse_education("Stanford University\nBoston College, 2018") == [
+        {"degree": "", "institution": "Stanford University", "year": ""},
+        {"degree": "", "institution": "Boston College, 2018", "year": "2018"},
+    ]
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from api.utils import gemini
+from api.utils.resume_parser import extract_resume_fields
+
+RESUME = """Jane Doe
+jane@example.com
+
+Skills
+Python, SQL, Looker Studio
+
+Experience
+Data Analyst, Acme Corp
+Jan 2023 - Present
+Built dashboards.
+
+Education
+B.Sc Statistics
+Delhi University, 2022
+"""
+
+
+@pytest.fixture
+def answer(monkeypatch):
+    prompts = []
+
+    def call(prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return json.dumps({
+            "full_name": "Jane Doe",
+            "skills": ["python", "Looker Studio"],
+            "experience": [{"role": "Data Analyst", "company": "Acme Corp", "duration": "Jan 2023 - Present"}],
+        })
+
+    monkeypatch.setattr(gemini, "call_gemini_with_retry", call)
+    return prompts
+
+
+def test_targeted_parse_keeps_the_models_extra_skills(answer):
+    result = extract_resume_fields(RESUME)
+    assert "SKILLS\nPython, SQL, Looker Studio" in answer[0].suffix
+    assert result["extraction"] == "local+llm"
+    # Matched skills first, then the model's skills the local vocabulary doesn't know
+    assert [s.lower() for s in result["skills"]] == ["python", "sql", "looker studio"]
+    assert result["education"] == [{"degree": "B.Sc Statistics", "institution": "Delhi University, 2022", "year": "2022"}]
+
+
+def _pdf(text: str) -> bytes:
+    import fitz
+
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+        return doc.tobytes()
+
+
+def test_raw_text_is_returned_only_on_request(answer):
+    from api.utils.resume_parser import parse_resume_pdf
+
+    pdf = _pdf("Jane Doe\njane@example.com\nPython developer")
+    assert "raw_text" not in parse_resume_pdf(pdf)
+    assert "Python developer" in parse_resume_pdf(pdf, include_text=True)["raw_text"]
+
+
+def test_waiting_for_an_extraction_slot_stops_at_the_deadline(monkeypatch):
+    import threading
+    import time
+
+    from api.utils import resume_parser
+    from api.utils.deadline import Deadline
+
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(resume_parser, "_extraction_slots", slots)
+    start = time.monotonic()
+    result = resume_parser.parse_resume_pdf(_pdf("text"), Deadline(0.1))
+    assert result["type"] == "deadline"
+    assert time.monotonic() - start < 1.0
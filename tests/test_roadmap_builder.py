@@ -0,0 +1,54 @@
+import pytest
+
+from api.utils import roadmap_builder
+from api.utils.roadmap_builder import WEEKS, build_prerequisite_roadmap
+from api.utils.roadmap_graph import RoadmapGraph
+
+TOPICS = ["Internet", "HTML", "CSS", "JavaScript", "Git", "npm", "React", "TypeScript"]
+
+
+def _graph() -> RoadmapGraph:
+    nodes = [{"id": "title", "type": "title", "position": {"x": 0, "y": 0}, "data": {"label": "Frontend"}}]
+    nodes += [
+        {"id": label, "type": "topic", "position": {"x": 0, "y": 100 * (i + 1)}, "data": {"label": label}}
+        for i, label in enumerate(TOPICS)
+    ]
+    chain = ["title", *TOPICS]
+    edges = [{"source": s, "target": t} for s, t in zip(chain, chain[1:])]
+    return RoadmapGraph("frontend", {"nodes": nodes, "edges": edges})
+
+
+@pytest.fixture(autouse=True)
+def graph(monkeypatch):
+    graph = _graph()
+    monkeypatch.setattr(roadmap_builder, "get_roadmap_graph", lambda roadmap_id, deadline=None: graph)
+    return graph
+
+
+def test_roadmap_places_skills_after_their_prerequisites():
+    roadmap = build_prerequisite_roadmap("Frontend Developer", ["React", "TypeScript"], known_skills=["Internet"])
+    assert len(roadmap) == WEEKS
+    assert [t for week in roadmap for t in week["topics"]] == ["Git", "npm", "React", "TypeScript"]
+    assert [s for week in roadmap for s in week["skills"]] == ["React", "TypeScript"]
+
+
+def test_too_few_topics_for_four_weeks_give_none():
+    # Git is known, so only npm is pulled in ahead of React and TypeScript
+    assert build_prerequisite_roadmap("Frontend Developer", ["React", "TypeScript"], known_skills=["Git"]) is None
+
+
+def test_mostly_unplaceable_skills_fall_back_to_the_llm():
+    missing = ["React", "npm", "Docker", "Kubernetes", "GraphQL", "TypeScript", "AWS"]
+    assert build_prerequisite_roadmap("Frontend Developer", missing) is None
+
+
+def test_unplaced_skills_go_to_the_last_week():
+    roadmap = build_prerequisite_roadmap("Frontend Developer", ["React", "npm", "TypeScript", "Docker"])
+    assert roadmap is not None
+    assert "Docker" in roadmap[-1]["topics"]
+    assert "Docker" in roadmap[-1]["skills"]
+    assert sorted(s for week in roadmap for s in week["skills"]) == ["Docker", "React", "TypeScript", "npm"]
+
+
+def test_roles_without_a_roadmap_get_none():
+    assert build_prerequisite_roadmap("Underwater Basket Weaver", ["React"]) is None
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+import pytest
+
+from api.utils import roadmap_graph
+from api.utils.roadmap_graph import RoadmapGraph
+
+RAW = {
+    "nodes": [
+        {"id": "b", "type": "topic", "position": {"x": 0, "y": 200}, "data": {"label": "Python"}},
+        {"id": "a", "type": "title", "position": {"x": 0, "y": 0}, "data": {"label": " Backend "}},
+        {"id": "c", "type": "topic", "position": {"x": 100, "y": 100.4}, "data": {"label": "Internet"}},
+        {"type": "topic", "data": {"label": "no id"}},
+    ],
+    "edges": [
+        {"source": "a", "target": "c", "style": {"stroke": "#2b78e4", "strokeWidth": 3.5}},
+        {"source": "c", "target": "b", "type": "step", "data": {"edgeStyle": "dashed"}},
+        {"source": "a", "target": "missing"},
+        {"source": "b", "target": "b"},
+    ],
+}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fetch(roadmap_id, deadline=None):
+        calls.append(roadmap_id)
+        return RAW
+
+    monkeypatch.setattr(roadmap_graph, "fetch_roadmapsh_raw", fetch)
+    monkeypatch.setattr(roadmap_graph, "_graphs", {})
+    return calls
+
+
+@pytest.fixture
+def client():
+    from api.index import app
+
+    return app.test_client()
+
+
+def test_graph_orders_nodes_topologically_and_interns_labels():
+    graph = RoadmapGraph("backend", RAW)
+    assert [graph.label(i) for i in range(len(graph.nodes))] == ["Backend", "Internet", "Python"]
+    assert graph.node_type(0) == "title"
+    assert graph.nodes[1][2:4] == [100, 100]
+    assert graph.edges == [(0, 1, 0), (1, 2, 1)]
+    assert graph.edge_styles == [("smoothstep", "#2b78e4", 3.5, False), ("step", None, None, True)]
+    assert graph.parents == [[], [0], [1]]
+    assert json.loads(graph.body) == graph.payload()
+    assert gzip.decompress(graph.gzipped) == graph.body
+
+
+def test_etag_depends_only_on_the_content():
+    assert RoadmapGraph("backend", RAW).etag == RoadmapGraph("backend", json.loads(json.dumps(RAW))).etag
+    assert RoadmapGraph("backend", RAW).etag != RoadmapGraph("frontend", RAW).etag
+
+
+def test_route_serves_gzip_and_revalidates_with_304(fetches, client):
+    response = client.get("/api/roadmap-graph/backend", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["roadmap_id"] == "backend"
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(
+        "/api/roadmap-graph/backend", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == etag
+    assert fetches == ["backend"]
+
+
+def test_route_keeps_separate_etags_per_encoding(fetches, client):
+    gzipped = client.get("/api/roadmap-graph/backend", headers={"Accept-Encoding": "gzip"})
+    plain = client.get(
+        "/api/roadmap-graph/backend", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["ETag"]}
+    )
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+    assert json.loads(plain.data)["roadmap_id"] == "backend"
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+
+
+def test_route_rejects_unknown_roadmap_ids_without_fetching(fetches, client):
+    assert client.get("/api/roadmap-graph/not-a-roadmap").status_code == 404
+    assert fetches == []
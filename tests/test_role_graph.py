@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from api.utils import role_graph
+from api.utils.learning_path import ROADMAP_ID_MAP, get_roadmapsh_id
+from api.utils.role_graph import ROLE_TITLES, RoleGraph, _cosine, build_graph
+
+ROLES = {"frontend": "Frontend Developer", "react": "React Developer", "backend": "Backend Developer"}
+TOPICS = {
+    "frontend": ["HTML", "CSS", "JavaScript", "React", "Git"],
+    "react": ["JavaScript", "React", "React.js", "Redux", "Next.js"],
+    "backend": ["Go", "PostgreSQL", "Docker", "Git", "Redis"],
+}
+
+
+def test_cosine():
+    assert _cosine(0b1011, 0b1011) == 1.0
+    assert _cosine(0b0011, 0b1100) == 0.0
+    assert _cosine(0, 0b1) == 0.0
+    assert math.isclose(_cosine(0b0011, 0b0110), 0.5)
+
+
+def test_build_graph_folds_spellings_into_one_topic():
+    doc = build_graph({**ROLES, "empty": "Nobody"}, TOPICS)
+    assert [r["id"] for r in doc["roles"]] == ["frontend", "react", "backend"]
+    names = [t["name"] for t in doc["topics"]]
+    assert len(names) == len(set(names))
+    react = next(t for t in doc["topics"] if "react.js" in t["forms"])
+    assert "react" in react["forms"]
+    # "React" and "React.js" are one topic, so the react roadmap has four
+    assert len(doc["roles"][1]["topics"]) == 4
+
+
+def test_build_graph_ranks_similar_roles():
+    doc = build_graph(ROLES, TOPICS)
+    frontend_similar = doc["similar"][0]
+    assert [j for j, _ in frontend_similar] == [1, 2]
+    assert frontend_similar[0][1] > frontend_similar[1][1] > 0
+    assert math.isclose(frontend_similar[0][1], 2 / math.sqrt(5 * 4), abs_tol=1e-4)
+
+
+@pytest.fixture
+def graph():
+    return RoleGraph(build_graph(ROLES, TOPICS))
+
+
+def test_suggest_pivots_ranks_by_coverage_and_similarity(graph):
+    resume = "Built SPAs in JavaScript with React and Redux, deployed with Git."
+    pivots = graph.suggest_pivots("Frontend Developer", resume)
+    assert [p["role"] for p in pivots] == ["React Developer", "Backend Developer"]
+    assert pivots[0]["match"] > pivots[1]["match"]
+
+
+def test_suggest_pivots_ignores_short_names_in_prose(graph):
+    # "go" and "next" are ordinary words here, not Go or Next.js
+    assert graph.present_mask("I am ready to go to the next level") == 0
+    assert graph.present_mask("Services in Go") != 0
+    assert graph.suggest_pivots("React Developer", "I am ready to go to the next level") == [
+        {"role": "Frontend Developer", "match": round(100 * 0.4 * graph.similar[1][0])}
+    ]
+
+
+def test_role_titles_round_trip_to_their_roadmaps():
+    assert set(ROLE_TITLES) == set(ROADMAP_ID_MAP.values()) - {"system-design"}
+    for roadmap_id, title in ROLE_TITLES.items():
+        assert get_roadmapsh_id(title) == roadmap_id
+
+
+def test_lazy_build_keeps_the_graph_off_the_filesystem(monkeypatch, tmp_path):
+    path = tmp_path / "role_graph.json"
+    monkeypatch.setattr(role_graph, "ROLE_GRAPH_PATH", str(path))
+    monkeypatch.setattr(role_graph, "collect_topics", lambda: (ROLES, TOPICS))
+    monkeypatch.setattr(role_graph, "get_shared_cache", lambda: None)
+    monkeypatch.setattr(role_graph, "_graph", None)
+    role_graph._lazy_build()
+    assert role_graph._graph is not None
+    assert not path.exists()